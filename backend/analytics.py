@@ -0,0 +1,203 @@
+"""
+Motore analitico colonnare in memoria.
+
+I risultati (~26k righe) vengono caricati una volta in array NumPy (raceId, driverId,
+constructorId, grid, positionOrder, points, year, ...) e classifiche, carriere e leaderboard
+si calcolano con group-by vettoriali invece che con aggregazioni MongoDB.
+Ogni aggregato si attiva singolarmente con Config.ANALYTICS_ENGINE; NumPy è opzionale:
+se manca, tutto resta su MongoDB.
+
+La parità con MongoDB è verificata da tests/test_analytics.py.
+"""
+import threading
+from typing import List, Optional
+from config import Config
+from database import Database
+import versions
+
+try:
+    import numpy as np
+except ImportError:  # dipendenza opzionale
+    np = None
+
+AGGREGATES = ('driver_standing', 'constructor_standing', 'driver_career', 'driver_leaderboard')
+LEADERBOARD_METRICS = ('points', 'wins', 'podiums', 'races', 'poles')
+
+
+class AnalyticsEngine:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(AnalyticsEngine, cls).__new__(cls)
+            cls._instance._columns = None
+            cls._instance._generation = 0
+            cls._instance._loaded_generation = -1
+            cls._instance._loaded_stamp = None
+            cls._instance._lock = threading.Lock()
+        return cls._instance
+
+    @property
+    def available(self) -> bool:
+        return np is not None
+
+    def enabled(self, aggregate: str) -> bool:
+        """True when the given aggregate is configured to run on the engine instead of MongoDB."""
+        settings = {s.strip() for s in Config.ANALYTICS_ENGINE.split(',') if s.strip()}
+        return self.available and ('all' in settings or aggregate in settings)
+
+    def load(self) -> None:
+        """(Re)load the result columns with a single scan of 'results'."""
+        generation = self._generation
+        stamp = versions.stamp(('results',))
+        docs = list(Database().get_collection('results').find({}, {
+            '_id': 0, 'raceId': 1, 'driverId': 1, 'constructorId': 1, 'grid': 1,
+            'positionOrder': 1, 'positionText': 1, 'points': 1, 'year': 1
+        }))
+        count = len(docs)
+
+        def column(field, dtype, default=0):
+            return np.fromiter((d.get(field) or default for d in docs), dtype=dtype, count=count)
+
+        columns = {
+            'raceId': column('raceId', np.int64),
+            'driverId': column('driverId', np.int64),
+            'constructorId': column('constructorId', np.int64),
+            'grid': column('grid', np.int64),
+            'positionOrder': column('positionOrder', np.int64),
+            'points': column('points', np.float64, 0.0),
+            'year': column('year', np.int64),
+            'win': np.fromiter((d.get('positionText') == '1' for d in docs), dtype=bool, count=count),
+            'podium': np.fromiter((d.get('positionText') in ('1', '2', '3') for d in docs), dtype=bool, count=count),
+        }
+
+        with self._lock:
+            self._columns = columns
+            self._loaded_generation = generation
+            self._loaded_stamp = stamp
+
+    def invalidate(self) -> None:
+        """Called on every result write: the columns are reloaded on the next query."""
+        with self._lock:
+            self._generation += 1
+
+    def _get_columns(self) -> dict:
+        # Anche le scritture degli altri worker: la versione di 'results' è cambiata
+        if (self._columns is None or self._loaded_generation != self._generation
+                or self._loaded_stamp != versions.stamp(('results',))):
+            self.load()
+        return self._columns
+
+    @staticmethod
+    def _group(*keys):
+        """Group rows by one or more key columns: returns the unique keys and the group index of each row."""
+        if len(keys) == 1:
+            unique, inverse = np.unique(keys[0], return_inverse=True)
+        else:
+            unique, inverse = np.unique(np.stack(keys, axis=1), axis=0, return_inverse=True)
+        return unique, inverse.ravel()
+
+    def driver_standing(self, year: int) -> List[dict]:
+        """Same rows as the 'driver_standings' collection for one season, sorted by points."""
+        c = self._get_columns()
+        mask = c['year'] == year
+        if not mask.any():
+            return []
+
+        unique, inverse = self._group(c['driverId'][mask], c['constructorId'][mask])
+        size = len(unique)
+        points = np.bincount(inverse, weights=c['points'][mask], minlength=size)
+        races = np.bincount(inverse, minlength=size)
+        wins = np.bincount(inverse, weights=c['win'][mask], minlength=size)
+
+        return [
+            {
+                'year': year,
+                'driverId': int(unique[i, 0]),
+                'constructorId': int(unique[i, 1]),
+                'totalPoints': float(points[i]),
+                'racesCount': int(races[i]),
+                'wins': int(wins[i])
+            }
+            for i in np.argsort(-points, kind='stable')
+        ]
+
+    def constructor_standing(self, year: int) -> List[dict]:
+        """Same rows as the 'constructor_standings' collection for one season, sorted by points."""
+        c = self._get_columns()
+        mask = c['year'] == year
+        if not mask.any():
+            return []
+
+        unique, inverse = self._group(c['constructorId'][mask])
+        size = len(unique)
+        points = np.bincount(inverse, weights=c['points'][mask], minlength=size)
+        wins = np.bincount(inverse, weights=c['win'][mask], minlength=size)
+        podiums = np.bincount(inverse, weights=c['podium'][mask], minlength=size)
+        best = np.full(size, np.iinfo(np.int64).max)
+        np.minimum.at(best, inverse, c['positionOrder'][mask])
+
+        return [
+            {
+                'year': year,
+                'constructorId': int(unique[i]),
+                'points': float(points[i]),
+                'wins': int(wins[i]),
+                'podiums': int(podiums[i]),
+                'bestFinish': int(best[i])
+            }
+            for i in np.argsort(-points, kind='stable')
+        ]
+
+    def driver_career(self, driver_id: int) -> dict:
+        """Career totals of a driver."""
+        c = self._get_columns()
+        mask = c['driverId'] == int(driver_id)
+        races = int(mask.sum())
+        return {
+            'driverId': int(driver_id),
+            'races': races,
+            'wins': int(c['win'][mask].sum()),
+            'podiums': int(c['podium'][mask].sum()),
+            'points': float(c['points'][mask].sum()),
+            'poles': int((c['grid'][mask] == 1).sum()),
+            'bestFinish': int(c['positionOrder'][mask].min()) if races else None,
+            'seasons': int(len(np.unique(c['year'][mask])))
+        }
+
+    def driver_leaderboard(self, metric: str = 'points', limit: int = 10,
+                           from_year: Optional[int] = None, to_year: Optional[int] = None) -> List[dict]:
+        """Top drivers by career metric, optionally within a range of seasons."""
+        c = self._get_columns()
+        mask = np.ones(len(c['driverId']), dtype=bool)
+        if from_year is not None:
+            mask &= c['year'] >= from_year
+        if to_year is not None:
+            mask &= c['year'] <= to_year
+        if not mask.any():
+            return []
+
+        unique, inverse = self._group(c['driverId'][mask])
+        size = len(unique)
+        totals = {
+            'races': np.bincount(inverse, minlength=size),
+            'wins': np.bincount(inverse, weights=c['win'][mask], minlength=size),
+            'podiums': np.bincount(inverse, weights=c['podium'][mask], minlength=size),
+            'points': np.bincount(inverse, weights=c['points'][mask], minlength=size),
+            'poles': np.bincount(inverse, weights=c['grid'][mask] == 1, minlength=size),
+        }
+
+        # A parità di valore vince il driverId più basso (le chiavi di np.unique sono ordinate)
+        order = np.argsort(-totals[metric], kind='stable')[:limit]
+        return [
+            {
+                'driverId': int(unique[i]),
+                'races': int(totals['races'][i]),
+                'wins': int(totals['wins'][i]),
+                'podiums': int(totals['podiums'][i]),
+                'points': float(totals['points'][i]),
+                'poles': int(totals['poles'][i])
+            }
+            for i in order
+        ]
+
@@ -1,7 +1,14 @@
+import json
 from flask import Flask, jsonify
 from flask_cors import CORS
 from config import Config
 from database import Database
+from migrations import apply_migrations, start_background_migrations, background_status
+from analytics import AnalyticsEngine, AGGREGATES
+from cache import service_cache, single_flight
+import metrics
+from slow_queries import slow_query_log
+from sqlite_backend import ReadOnlyStorageError, UnsupportedQueryError
 from routes.driver_routes import driver_bp
 from routes.constructor_routes import constructor_bp
 from routes.race_routes import race_bp
@@ -16,10 +23,29 @@ def create_app():
     # Enable CORS
     CORS(app)
 
-    # Initialize and connect to the database
+    # Request timings, in-flight gauges and Mongo command metrics at /api/metrics
+    metrics.init_app(app)
+
+    # Initialize the database handle (MongoClient connects in the background: no round trip here)
     db = Database()
     db.connect()
 
+    # Load the in-memory analytics columns once, if any aggregate is configured to use them
+    def warm_up():
+        engine = AnalyticsEngine()
+        if any(engine.enabled(aggregate) for aggregate in AGGREGATES):
+            engine.load()
+
+    # Create the declared indexes and run pending schema migrations (the SQLite backend builds its own).
+    # By default this runs in a background thread, followed by the analytics warm-up
+    if db.read_only or Config.MIGRATIONS_ON_STARTUP == 'off':
+        warm_up()
+    elif Config.MIGRATIONS_ON_STARTUP == 'sync':
+        apply_migrations()
+        warm_up()
+    else:
+        start_background_migrations(after=warm_up)
+
     # Register API blueprints with prefixes
     app.register_blueprint(driver_bp, url_prefix='/api/driver')
     app.register_blueprint(constructor_bp, url_prefix='/api/constructor')
@@ -33,14 +59,34 @@ def create_app():
     def health_check():
         return jsonify({
             'status': 'healthy',
-            'message': 'API server is running'
+            'message': 'API server is running',
+            'migrations': background_status()
         }), 200
 
+    # Service cache counters (hits, misses, evictions, ...) and coalesced concurrent misses
+    @app.route('/api/cache/stats')
+    def cache_stats():
+        return jsonify({**service_cache.stats(), 'singleFlight': single_flight.stats()}), 200
+
+    # Latest slow MongoDB queries, with the sampled explain plans (parameters may hold ObjectId/datetime)
+    @app.route('/api/slow-queries')
+    def slow_queries():
+        return app.response_class(json.dumps(slow_query_log.stats(), default=str), mimetype='application/json')
+
     # Handle 404 errors (route not found)
     @app.errorhandler(404)
     def not_found(error):
         return jsonify({'error': 'Endpoint not found'}), 404
 
+    # SQLite backend: writes are not allowed, and a few MongoDB operators are not translated
+    @app.errorhandler(ReadOnlyStorageError)
+    def read_only_storage(error):
+        return jsonify({'error': str(error)}), 405
+
+    @app.errorhandler(UnsupportedQueryError)
+    def unsupported_query(error):
+        return jsonify({'error': str(error)}), 501
+
     # Handle 500 errors (internal server errors)
     @app.errorhandler(500)
     def internal_error(error):
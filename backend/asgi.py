@@ -0,0 +1,64 @@
+"""
+Variante ASGI dell'API (Quart + Motor), in sola lettura.
+
+Espone le stesse route GET dell'app Flask per stagioni, classifiche, piloti, scuderie,
+circuiti, gare e risultati (stream NDJSON compreso); le query indipendenti di una richiesta
+partono insieme con asyncio.gather. Le risposte non hanno ETag. Scritture (rifiutate con 405),
+indici/migrazioni, metriche, statistiche della cache e query lente restano
+sull'app sincrona.
+    pip install -r requirements-async.txt
+    uvicorn asgi:app --workers 4 --port 5001
+"""
+from quart import Quart, jsonify, request
+from quart_cors import cors
+from async_database import AsyncDatabase
+from async_routes.driver_routes import driver_bp
+from async_routes.constructor_routes import constructor_bp
+from async_routes.race_routes import race_bp
+from async_routes.result_routes import result_bp
+from async_routes.circuit_routes import circuit_bp
+from async_routes.season_routes import season_bp
+
+
+def create_app():
+    app = cors(Quart(__name__))
+
+    @app.before_serving
+    async def connect():
+        AsyncDatabase().connect()
+
+    @app.after_serving
+    async def disconnect():
+        AsyncDatabase().close()
+
+    @app.before_request
+    async def reject_writes():
+        if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            return jsonify({'error': "L'API asincrona è in sola lettura: le scritture passano dall'app Flask"}), 405
+
+    app.register_blueprint(driver_bp, url_prefix='/api/driver')
+    app.register_blueprint(constructor_bp, url_prefix='/api/constructor')
+    app.register_blueprint(race_bp, url_prefix='/api/race')
+    app.register_blueprint(result_bp, url_prefix='/api/result')
+    app.register_blueprint(circuit_bp, url_prefix='/api/circuit')
+    app.register_blueprint(season_bp, url_prefix='/api/season')
+
+    @app.route('/api/health')
+    async def health_check():
+        return jsonify({
+            'status': 'healthy',
+            'message': 'API server is running'
+        }), 200
+
+    @app.errorhandler(404)
+    async def not_found(error):
+        return jsonify({'error': 'Endpoint not found'}), 404
+
+    @app.errorhandler(500)
+    async def internal_error(error):
+        return jsonify({'error': 'Internal server error'}), 500
+
+    return app
+
+
+app = create_app()
@@ -0,0 +1,92 @@
+import asyncio
+import time
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+from config import Config
+from database import Database
+from versions import VERSIONS_COLLECTION, version_label
+
+
+class AsyncDatabase:
+    """
+    Counterpart of Database for the ASGI app: one Motor client per process, created
+    inside the event loop that uses it, with the same pool and read preference settings.
+    """
+    _instance = None
+    _client = None
+    _db = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(AsyncDatabase, cls).__new__(cls)
+        return cls._instance
+
+    def connect(self):
+        if self._client is None:
+            self._client = AsyncIOMotorClient(Config.MONGODB_URI, **Database._client_options())
+            self._db = self._client[Config.DATABASE_NAME]
+            print(f"Connesso a MongoDB (Motor): {Config.DATABASE_NAME}")
+        return self._db
+
+    def get_collection(self, collection_name: str) -> AsyncIOMotorCollection:
+        if self._db is None:
+            self.connect()
+        return self._db[collection_name]
+
+    def get_secondary_collection(self, collection_name: str) -> AsyncIOMotorCollection:
+        """Same routing as Database.get_secondary_collection."""
+        return self.get_collection(collection_name).with_options(
+            read_preference=Database._secondary_read_preference()
+        )
+
+    def close(self):
+        if self._client:
+            self._client.close()
+            self._client = None
+            self._db = None
+
+
+class AsyncDimensionCache:
+    """
+    Counterpart of DimensionCache for the async services: id -> document maps of
+    drivers, constructors and circuits, each loaded with one query on first access.
+    The writes go through the Flask app, so a map is reloaded when the version of its
+    collection changes; the versions are re-read at most every VERSION_CHECK_SECONDS.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(AsyncDimensionCache, cls).__new__(cls)
+            cls._instance._records = {}
+            cls._instance._stamps = {}
+            cls._instance._versions = {}
+            cls._instance._versions_expire_at = float('-inf')
+            cls._instance._lock = asyncio.Lock()
+        return cls._instance
+
+    async def _version(self, collection_name: str) -> str:
+        if self._versions_expire_at <= time.monotonic():
+            cursor = AsyncDatabase().get_collection(VERSIONS_COLLECTION).find({})
+            self._versions = {doc['_id']: version_label(doc) async for doc in cursor}
+            self._versions_expire_at = time.monotonic() + Config.VERSION_CHECK_SECONDS
+        return self._versions.get(collection_name, '0')
+
+    async def get_all(self, collection_name: str) -> dict:
+        version = await self._version(collection_name)
+        records = self._records.get(collection_name)
+        if records is None or self._stamps.get(collection_name) != version:
+            async with self._lock:
+                records = self._records.get(collection_name)
+                if records is None or self._stamps.get(collection_name) != version:
+                    cursor = AsyncDatabase().get_collection(collection_name).find()
+                    records = {doc['_id']: doc async for doc in cursor}
+                    self._records[collection_name] = records
+                    self._stamps[collection_name] = version
+        return records
+
+    def invalidate(self, collection_name: str = None) -> None:
+        self._versions_expire_at = float('-inf')
+        if collection_name is None:
+            self._records.clear()
+        else:
+            self._records.pop(collection_name, None)
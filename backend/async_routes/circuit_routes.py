@@ -0,0 +1,27 @@
+from quart import Blueprint, jsonify, request
+from async_service.circuit_service import AsyncCircuitService
+from lazy import LazyService
+
+# Stesse route di routes/circuit_routes.py (sola lettura) sul service asincrono
+circuit_bp = Blueprint('circuit', __name__)
+circuit_service = LazyService(AsyncCircuitService)
+
+@circuit_bp.route('/all', methods=['GET'])
+async def find_all_circuits():
+    country = request.args.get('country', type=str)
+    sort_alpha = request.args.get('sortAlpha', type=str)
+
+    circuits = await circuit_service.find_all(country=country, sort_alpha=sort_alpha)
+    return jsonify([d.to_dict() for d in circuits]), 200
+
+@circuit_bp.route('/find_circuits_by_driverId/<id>', methods=['GET'])
+async def find_circuits_by_driverId(id):
+    circuits = await circuit_service.find_by_driverId(id)
+    return jsonify([d.to_dict() for d in circuits]), 200
+
+@circuit_bp.route('/<id>', methods=['GET'])
+async def find_by_id(id):
+    circuit = await circuit_service.find_by_id(id)
+    if circuit:
+        return jsonify(circuit.to_dict()), 200
+    return jsonify({'error': 'Circuit not found'}), 404
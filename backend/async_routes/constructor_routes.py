@@ -0,0 +1,39 @@
+from quart import Blueprint, jsonify, request
+from async_service.constructor_service import AsyncConstructorService
+from lazy import LazyService
+
+# Stesse route di routes/constructor_routes.py (sola lettura) sul service asincrono
+constructor_bp = Blueprint('constructor', __name__)
+constructor_service = LazyService(AsyncConstructorService)
+
+@constructor_bp.route('/all', methods=['GET'])
+async def find_all_constructors():
+    constructors = await constructor_service.find_all()
+    return jsonify([c.to_dict() for c in constructors]), 200
+
+@constructor_bp.route('/find_costructors_by_driverId/<id>', methods=['GET'])
+async def find_constructors_by_driverId(id):
+    constructors = await constructor_service.find_constructors_by_driverId(id)
+    return jsonify([c.to_dict() for c in constructors]), 200
+
+@constructor_bp.route('/<id>', methods=['GET'])
+async def find_by_constructor_id(id):
+    constructor = await constructor_service.find_by_id(id)
+    if constructor:
+        return jsonify(constructor.to_dict()), 200
+    return jsonify({'error': 'Constructor not found'}), 404
+
+@constructor_bp.route('/find_results/<id>', methods=['GET'])
+async def find_constructor_results(id):
+    year = request.args.get('year', type=int)
+    from_year = request.args.get('from_year', type=int)
+    to_year = request.args.get('to_year', type=int)
+
+    # Validazione: from_year non deve essere maggiore di to_year
+    if from_year is not None and to_year is not None and from_year > to_year:
+        return jsonify({
+            "error": "Invalid year range: from_year must be less than or equal to to_year"
+        }), 400
+
+    result = await constructor_service.find_results(id, year=year, from_year=from_year, to_year=to_year)
+    return jsonify(result.to_dict()), 200
@@ -0,0 +1,74 @@
+from quart import Blueprint, jsonify, request
+from async_service.driver_service import AsyncDriverService
+from lazy import LazyService
+from serialization import dumps
+
+# Stesse route di routes/driver_routes.py (sola lettura) sul service asincrono
+driver_bp = Blueprint('driver', __name__)
+driver_service = LazyService(AsyncDriverService)
+
+@driver_bp.route('/all', methods=['GET'])
+async def find_all_drivers():
+    nationality = request.args.get('nationality', type=str)
+    sort_alpha = request.args.get('sortAlpha', type=str)
+
+    drivers = await driver_service.find_all(nationality=nationality, sort_alpha=sort_alpha)
+    return jsonify([d.to_dict() for d in drivers]), 200
+
+@driver_bp.route('/find_nationalities', methods=['GET'])
+async def find_driver_nationalities():
+    return jsonify(await driver_service.find_all_nationalities()), 200
+
+@driver_bp.route('/<id>', methods=['GET'])
+async def find_by_driver_id(id):
+    driver = await driver_service.find_by_id(id)
+    if driver:
+        return jsonify(driver.to_dict()), 200
+    return jsonify({'error': 'Driver not found'}), 404
+
+@driver_bp.route('/find_results/<id>', methods=['GET'])
+async def find_driver_results(id):
+    year = request.args.get('year', type=int)
+    from_year = request.args.get('from_year', type=int)
+    to_year = request.args.get('to_year', type=int)
+
+    # Validazione: from_year non deve essere maggiore di to_year
+    if from_year is not None and to_year is not None and from_year > to_year:
+        return jsonify({
+            "error": "Invalid year range: from_year must be less than or equal to to_year"
+        }), 400
+
+    result = await driver_service.find_results_document(id, year=year, from_year=from_year, to_year=to_year)
+    if result is None:
+        return jsonify({'error': 'Driver not found'}), 404
+    return dumps(result), 200, {'Content-Type': 'application/json'}
+
+@driver_bp.route('/<id>/profile', methods=['GET'])
+async def find_driver_profile(id):
+    profile = await driver_service.find_profile(id)
+    if profile:
+        return dumps(profile), 200, {'Content-Type': 'application/json'}
+    return jsonify({'error': 'Driver not found'}), 404
+
+@driver_bp.route('/<id>/career', methods=['GET'])
+async def find_driver_career(id):
+    return jsonify(await driver_service.find_career(id)), 200
+
+@driver_bp.route('/leaderboard', methods=['GET'])
+async def find_driver_leaderboard():
+    metric = request.args.get('metric', default='points', type=str)
+    limit = request.args.get('limit', default=10, type=int)
+    from_year = request.args.get('from_year', type=int)
+    to_year = request.args.get('to_year', type=int)
+
+    # Validazione: from_year non deve essere maggiore di to_year
+    if from_year is not None and to_year is not None and from_year > to_year:
+        return jsonify({
+            "error": "Invalid year range: from_year must be less than or equal to to_year"
+        }), 400
+
+    try:
+        leaderboard = await driver_service.find_leaderboard(metric, limit=limit, from_year=from_year, to_year=to_year)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(leaderboard), 200
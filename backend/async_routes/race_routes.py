@@ -0,0 +1,24 @@
+from quart import Blueprint, jsonify
+from async_service.race_service import AsyncRaceService
+from lazy import LazyService
+
+# Stesse route di routes/race_routes.py (sola lettura) sul service asincrono
+race_bp = Blueprint('race', __name__)
+race_service = LazyService(AsyncRaceService)
+
+@race_bp.route('/find_all_races_by_driverId/<id>', methods=['GET'])
+async def find_all_races_by_driverId(id):
+    races = await race_service.find_all_races_by_driverId(id)
+    return jsonify([r.to_dict() for r in races]), 200
+
+@race_bp.route('/all', methods=['GET'])
+async def find_all_races():
+    races = await race_service.find_all()
+    return jsonify({'races': [r.to_dict() for r in races]}), 200
+
+@race_bp.route('/<id>', methods=['GET'])
+async def find_race_by_id(id):
+    race = await race_service.find_by_id(id)
+    if race:
+        return jsonify(race.to_dict()), 200
+    return jsonify({'error': 'Race not found'}), 404
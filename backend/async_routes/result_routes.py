@@ -0,0 +1,53 @@
+from quart import Blueprint, jsonify, request
+from async_service.result_service import AsyncResultService
+from lazy import LazyService
+from service.result_service import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from serialization import dumps
+
+# Stesse route di routes/result_route.py (sola lettura) sul service asincrono
+result_bp = Blueprint('result', __name__)
+result_service = LazyService(AsyncResultService)
+
+@result_bp.route('/all', methods=['GET'])
+async def find_all_results():
+    after = request.args.get('after', type=int)
+    limit = request.args.get('limit', type=int)
+    if after is None and 'after' in request.args:
+        # Cursore non numerico: senza questo controllo verrebbe ignorato, restituendo tutti i risultati
+        return jsonify({'error': 'Invalid cursor'}), 400
+
+    wants_ndjson = (
+        request.args.get('format') == 'ndjson'
+        or request.accept_mimetypes.best == 'application/x-ndjson'
+    )
+    if wants_ndjson:
+        async def generate():
+            async for doc in result_service.iter_raw(after=after, limit=limit):
+                yield dumps(doc) + b'\n'
+        return generate(), 200, {'Content-Type': 'application/x-ndjson'}
+
+    if after is not None or limit is not None:
+        page_size = max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+        results = await result_service.find_page_documents(after=after, limit=page_size)
+        next_after = results[-1]['_id'] if len(results) == page_size else None
+        return dumps({'results': results, 'next_after': next_after}), 200, {'Content-Type': 'application/json'}
+
+    results = await result_service.find_all_documents()
+    return dumps({'results': results}), 200, {'Content-Type': 'application/json'}
+
+@result_bp.route('/<id>', methods=['GET'])
+async def find_result_by_id(id):
+    result = await result_service.find_by_id(id)
+    if result:
+        return jsonify(result.to_dict()), 200
+    return jsonify({'error': 'Result not found'}), 404
+
+@result_bp.route('/standings/<race_id>', methods=['GET'])
+async def get_race_standings(race_id):
+    try:
+        standings = await result_service.get_race_standings(race_id)
+        if not standings:
+            return jsonify({'message': 'No results found for the given raceId'}), 404
+        return jsonify(standings), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,44 @@
+from quart import Blueprint, jsonify, request
+from async_service.season_service import AsyncSeasonService
+from lazy import LazyService
+
+# Stesse route di routes/season_routes.py (sola lettura) sul service asincrono
+season_bp = Blueprint('season', __name__)
+season_service = LazyService(AsyncSeasonService)
+
+@season_bp.route('', methods=['GET'])
+async def find_seasons():
+    year = request.args.get('year', type=int)
+    from_year = request.args.get('from_year', type=int)
+    to_year = request.args.get('to_year', type=int)
+
+    # Validazione: from_year non deve essere maggiore di to_year
+    if from_year is not None and to_year is not None and from_year > to_year:
+        return jsonify({
+            "error": "Invalid year range: from_year must be less than or equal to to_year"
+        }), 400
+
+    seasons = await season_service.find(year=year, from_year=from_year, to_year=to_year)
+
+    if len(seasons) == 1:
+        return jsonify(seasons[0].to_dict()), 200
+    return jsonify([s.to_dict() for s in seasons]), 200
+
+@season_bp.route('/standing', methods=['GET'])
+async def find_driver_standing():
+    year = request.args.get('year', type=int)
+    standing = await season_service.find_driver_standing(year=year)
+    return jsonify(standing), 200
+
+@season_bp.route('/constructor-standing', methods=['GET'])
+async def find_constructor_standing():
+    year = request.args.get('year', type=int)
+    standing = await season_service.find_constructor_standing(year=year)
+    return jsonify(standing), 200
+
+@season_bp.route('/<year>', methods=['GET'])
+async def find_season(year):
+    season = await season_service.find_season(year=int(year))
+    if season:
+        return jsonify(season.to_dict()), 200
+    return jsonify({'message': f'Season {year} non found'}), 404
@@ -0,0 +1,33 @@
+from typing import List, Optional
+from pymongo import ASCENDING, DESCENDING
+from async_database import AsyncDatabase, AsyncDimensionCache
+from models.circuit import CircuitModel
+
+
+class AsyncCircuitService:
+    def __init__(self):
+        self.collection = AsyncDatabase().get_collection('circuits')
+
+    async def find_by_id(self, _id: int) -> Optional[CircuitModel]:
+        data = await self.collection.find_one({'_id': int(_id)})
+        return CircuitModel(**data) if data else None
+
+    async def find_all(self, country=None, sort_alpha=None) -> List[CircuitModel]:
+        query = {}
+        if country:
+            query['country'] = country
+
+        cursor = self.collection.find(query).sort('name', 1)
+
+        if sort_alpha == 'asc':
+            cursor.sort('name', ASCENDING)
+        elif sort_alpha == 'desc':
+            cursor.sort('name', DESCENDING)
+
+        return [CircuitModel(**data) async for data in cursor]
+
+    async def find_by_driverId(self, driver_id) -> List[CircuitModel]:
+        results_collection = AsyncDatabase().get_secondary_collection('results')
+        circuit_ids = await results_collection.distinct('circuitId', {'driverId': int(driver_id)})
+        circuits = await AsyncDimensionCache().get_all('circuits')
+        return [CircuitModel(**circuits[_id]) for _id in circuit_ids if _id in circuits]
@@ -0,0 +1,37 @@
+import asyncio
+from typing import List, Optional
+from async_database import AsyncDatabase, AsyncDimensionCache
+from models.constructor import ConstructorModel
+from models.result import ResultModel
+from service.constructor_service import ConstructorService
+
+
+class AsyncConstructorService:
+    def __init__(self):
+        self.collection = AsyncDatabase().get_collection('constructors')
+
+    async def find_by_id(self, _id: int) -> Optional[ConstructorModel]:
+        data = await self.collection.find_one({'_id': int(_id)})
+        return ConstructorModel(**data) if data else None
+
+    async def find_results(self, id: int, year: Optional[int] = None, from_year: Optional[int] = None,
+                           to_year: Optional[int] = None) -> Optional[ConstructorModel]:
+        """Same payload as ConstructorService.find_results: constructor and results are read concurrently."""
+        query = ConstructorService._results_query(id, year, from_year, to_year)
+        results_collection = AsyncDatabase().get_secondary_collection('results')
+        constructor, results = await asyncio.gather(
+            self.find_by_id(id),
+            results_collection.find(query).to_list(None)
+        )
+        if constructor:
+            constructor.results.extend(ResultModel(**r) for r in results)
+        return constructor
+
+    async def find_all(self) -> List[ConstructorModel]:
+        return [ConstructorModel(**data) async for data in self.collection.find().sort('name', 1)]
+
+    async def find_constructors_by_driverId(self, driver_id: int) -> List[ConstructorModel]:
+        results_collection = AsyncDatabase().get_secondary_collection('results')
+        constructor_ids = await results_collection.distinct('constructorId', {'driverId': int(driver_id)})
+        constructors = await AsyncDimensionCache().get_all('constructors')
+        return [ConstructorModel(**constructors[_id]) for _id in constructor_ids if _id in constructors]
@@ -0,0 +1,113 @@
+import asyncio
+import time
+from typing import List, Optional
+from pymongo import ASCENDING, DESCENDING
+from analytics import AnalyticsEngine
+from async_database import AsyncDatabase, AsyncDimensionCache
+from models.driver import DriverModel
+from serialization import compact, parse_date
+from service.driver_service import DriverService, DRIVER_FIELDS
+from service.result_service import RESULT_FIELDS
+from async_service.race_service import AsyncRaceService
+from async_service.constructor_service import AsyncConstructorService
+from async_service.circuit_service import AsyncCircuitService
+from lazy import LazyService
+
+# Service delle altre sezioni del profilo: creati al primo uso e condivisi da tutte le richieste
+_race_service = LazyService(AsyncRaceService)
+_constructor_service = LazyService(AsyncConstructorService)
+_circuit_service = LazyService(AsyncCircuitService)
+
+
+async def _timed(coroutine):
+    start = time.perf_counter()
+    value = await coroutine
+    return value, round((time.perf_counter() - start) * 1000, 2)
+
+
+class AsyncDriverService:
+    def __init__(self):
+        self.collection = AsyncDatabase().get_collection('drivers')
+        self.results_collection = AsyncDatabase().get_collection('results')
+        self.secondary_results_collection = AsyncDatabase().get_secondary_collection('results')
+
+    async def find_by_id(self, _id: int) -> Optional[DriverModel]:
+        driver_data = await self.collection.find_one({'_id': int(_id)})
+        return DriverModel(**driver_data) if driver_data else None
+
+    async def find_all(self, nationality=None, sort_alpha=None) -> List[DriverModel]:
+        query = {}
+        if nationality:
+            query['nationality'] = nationality
+
+        cursor = self.collection.find(query)
+
+        if sort_alpha == 'asc':
+            cursor.sort('forename', ASCENDING)
+        elif sort_alpha == 'desc':
+            cursor.sort('forename', DESCENDING)
+
+        return [DriverModel(**data) async for data in cursor]
+
+    async def find_all_nationalities(self) -> List[str]:
+        return await self.collection.distinct('nationality')
+
+    async def find_results_document(self, id: int, year: Optional[int] = None, from_year: Optional[int] = None,
+                                    to_year: Optional[int] = None) -> Optional[dict]:
+        """Same payload as DriverService.find_results_document: driver and results are read concurrently."""
+        query = DriverService._results_query(id, year, from_year, to_year)
+        driver, results = await asyncio.gather(
+            self.collection.find_one({'_id': int(id)}, DRIVER_FIELDS),
+            self.secondary_results_collection.find(query, RESULT_FIELDS).to_list(None)
+        )
+        driver = compact(driver)
+        if driver is None:
+            return None
+        if 'dob' in driver:
+            driver['dob'] = parse_date(driver['dob'])
+        driver['results'] = [compact(r) for r in results]
+        return driver
+
+    async def find_profile(self, id: int) -> Optional[dict]:
+        """Same payload as DriverService.find_profile, with the four sections gathered on the event loop."""
+        start = time.perf_counter()
+        names = ('driver', 'races', 'constructors', 'circuits')
+        sections = dict(zip(names, await asyncio.gather(
+            _timed(self.find_results_document(id)),
+            _timed(_race_service.find_all_races_by_driverId(id)),
+            _timed(_constructor_service.find_constructors_by_driverId(id)),
+            _timed(_circuit_service.find_by_driverId(id)),
+        )))
+
+        driver, _ = sections['driver']
+        if driver is None:
+            return None
+
+        timings = {name: elapsed for name, (_, elapsed) in sections.items()}
+        timings['total'] = round((time.perf_counter() - start) * 1000, 2)
+
+        return {
+            'driver': driver,
+            'races': [r.to_dict() for r in sections['races'][0]],
+            'constructors': [c.to_dict() for c in sections['constructors'][0]],
+            'circuits': [c.to_dict() for c in sections['circuits'][0]],
+            'timings': timings
+        }
+
+    async def find_career(self, id: int) -> dict:
+        """Same payload as DriverService.find_career."""
+        if AnalyticsEngine().enabled('driver_career'):
+            return await asyncio.to_thread(AnalyticsEngine().driver_career, int(id))
+        totals = await self.results_collection.aggregate(DriverService.career_pipeline(int(id))).to_list(1)
+        return DriverService.career_row(int(id), totals[0] if totals else None)
+
+    async def find_leaderboard(self, metric: str = 'points', limit: int = 10,
+                               from_year: Optional[int] = None, to_year: Optional[int] = None) -> List[dict]:
+        """Same payload as DriverService.find_leaderboard."""
+        limit = DriverService.leaderboard_limit(metric, limit)
+        if AnalyticsEngine().enabled('driver_leaderboard'):
+            rows = await asyncio.to_thread(AnalyticsEngine().driver_leaderboard, metric, limit, from_year, to_year)
+        else:
+            pipeline = DriverService.leaderboard_pipeline(metric, limit, from_year, to_year)
+            rows = await self.results_collection.aggregate(pipeline).to_list(None)
+        return DriverService.add_driver_names(rows, await AsyncDimensionCache().get_all('drivers'))
@@ -0,0 +1,20 @@
+from typing import List, Optional
+from async_database import AsyncDatabase
+from models.race import RaceModel
+
+
+class AsyncRaceService:
+    def __init__(self):
+        self.collection = AsyncDatabase().get_collection('races')
+
+    async def find_by_id(self, _id: int) -> Optional[RaceModel]:
+        data = await self.collection.find_one({'_id': int(_id)})
+        return RaceModel(**data) if data else None
+
+    async def find_all(self) -> List[RaceModel]:
+        return [RaceModel(**data) async for data in self.collection.find().sort('name', 1)]
+
+    async def find_all_races_by_driverId(self, driver_id: int) -> List[RaceModel]:
+        results_collection = AsyncDatabase().get_secondary_collection('results')
+        race_ids = await results_collection.distinct('raceId', {'driverId': int(driver_id)})
+        return [RaceModel(**race) async for race in self.collection.find({'_id': {'$in': race_ids}})]
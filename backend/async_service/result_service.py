@@ -0,0 +1,41 @@
+import asyncio
+from typing import AsyncIterator, List, Optional
+from async_database import AsyncDatabase, AsyncDimensionCache
+from models.result import ResultModel
+from serialization import compact
+from service.result_service import ResultService, RESULT_FIELDS, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, STREAM_BATCH_SIZE
+
+
+class AsyncResultService:
+    def __init__(self):
+        self.collection = AsyncDatabase().get_collection('results')
+
+    async def find_by_id(self, _id: int) -> Optional[ResultModel]:
+        data = await self.collection.find_one({'_id': int(_id)})
+        return ResultModel(**data) if data else None
+
+    async def find_all_documents(self) -> List[dict]:
+        return [compact(doc) async for doc in self.collection.find({}, RESULT_FIELDS)]
+
+    async def find_page_documents(self, after: Optional[int] = None, limit: int = DEFAULT_PAGE_SIZE) -> List[dict]:
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        cursor = self.collection.find(ResultService.after_query(after), RESULT_FIELDS).sort('_id', 1).limit(limit)
+        return [compact(doc) async for doc in cursor]
+
+    async def iter_raw(self, after: Optional[int] = None, limit: Optional[int] = None) -> AsyncIterator[dict]:
+        """Same stream as ResultService.iter_raw, read from the Motor cursor."""
+        cursor = self.collection.find(ResultService.after_query(after), RESULT_FIELDS)
+        cursor = cursor.sort('_id', 1).batch_size(STREAM_BATCH_SIZE)
+        if limit:
+            cursor = cursor.limit(int(limit))
+        async for doc in cursor:
+            yield compact(doc)
+
+    async def get_race_standings(self, race_id: int) -> List[dict]:
+        dimensions = AsyncDimensionCache()
+        results, drivers, constructors = await asyncio.gather(
+            self.collection.find({'raceId': int(race_id)}, sort=[('positionOrder', 1)]).to_list(None),
+            dimensions.get_all('drivers'),
+            dimensions.get_all('constructors')
+        )
+        return [ResultService.standing_row(result_data, drivers, constructors) for result_data in results]
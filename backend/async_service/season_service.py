@@ -0,0 +1,72 @@
+import asyncio
+from typing import List, Optional
+from analytics import AnalyticsEngine
+from async_database import AsyncDatabase, AsyncDimensionCache
+from models.season import SeasonModel
+from service.season_service import SeasonService
+from service.standing_service import StandingService
+
+
+class AsyncSeasonService:
+    def __init__(self):
+        self.result_collection = AsyncDatabase().get_collection('results')
+        self.race_collection = AsyncDatabase().get_collection('races')
+        self.standing_collection = AsyncDatabase().get_secondary_collection('driver_standings')
+        self.constructor_standing_collection = AsyncDatabase().get_secondary_collection('constructor_standings')
+
+    async def find(self, year: Optional[int] = None, from_year: Optional[int] = None, to_year: Optional[int] = None) -> List[SeasonModel]:
+        pipeline = SeasonService.season_pipeline(year, from_year, to_year)
+        return [
+            SeasonModel(year=data["year"], raceCount=data["raceCount"], races=[])
+            async for data in self.race_collection.aggregate(pipeline)
+        ]
+
+    async def find_driver_standing(self, year: Optional[int]) -> List[dict]:
+        if year is None:
+            return []
+
+        if AnalyticsEngine().enabled('driver_standing'):
+            rows = await asyncio.to_thread(AnalyticsEngine().driver_standing, year)
+            return StandingService.enrich_driver_standing(rows, *await asyncio.gather(
+                AsyncDimensionCache().get_all("drivers"), AsyncDimensionCache().get_all("constructors")
+            ))
+
+        dimensions = AsyncDimensionCache()
+        rows, drivers, constructors = await asyncio.gather(
+            self.standing_collection.find({"year": year}, {"_id": 0}).sort("totalPoints", -1).to_list(None),
+            dimensions.get_all("drivers"),
+            dimensions.get_all("constructors")
+        )
+        return StandingService.enrich_driver_standing(rows, drivers, constructors)
+
+    async def find_constructor_standing(self, year: Optional[int]) -> List[dict]:
+        if year is None:
+            return []
+
+        if AnalyticsEngine().enabled('constructor_standing'):
+            rows = await asyncio.to_thread(AnalyticsEngine().constructor_standing, year)
+            return StandingService.enrich_constructor_standing(rows, await AsyncDimensionCache().get_all("constructors"))
+
+        rows, constructors = await asyncio.gather(
+            self.constructor_standing_collection.find({"year": year}, {"_id": 0}).sort("points", -1).to_list(None),
+            AsyncDimensionCache().get_all("constructors")
+        )
+        return StandingService.enrich_constructor_standing(rows, constructors)
+
+    async def find_season(self, year: int) -> Optional[SeasonModel]:
+        # Gare e nomi sono indipendenti e partono insieme; i vincitori con la stessa query del service sincrono
+        dimensions = AsyncDimensionCache()
+        races_data, circuits, drivers, constructors = await asyncio.gather(
+            self.race_collection.find({"year": year}).to_list(None),
+            dimensions.get_all("circuits"),
+            dimensions.get_all("drivers"),
+            dimensions.get_all("constructors")
+        )
+        if not races_data:
+            return []
+
+        race_ids = [race["_id"] for race in races_data]
+        winners = SeasonService.first_winners(await self.result_collection.find(
+            SeasonService.winners_query(race_ids), {"raceId": 1, "driverId": 1, "constructorId": 1}
+        ).sort("_id", 1).to_list(None))
+        return SeasonService.build_season(year, races_data, winners, circuits, drivers, constructors)
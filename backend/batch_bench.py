@@ -0,0 +1,92 @@
+"""
+Benchmark del salvataggio di risultati in blocco: round trip verso MongoDB e tempo totale di
+ResultService.save_many (un solo bulk_write, controlli di unicità in memoria) a confronto con
+ResultService.save chiamato riga per riga, per batch di 20, 200 e 2000 risultati.
+
+Le misure usano un database separato (F1_DB_bench) ricreato per ogni batch con gare fittizie
+da 20 risultati ciascuna: i dati reali non vengono toccati.
+Uso (dalla cartella backend, con MongoDB in esecuzione):
+    python batch_bench.py
+    python batch_bench.py --sizes 20 200 --repeat 5
+"""
+import argparse
+import statistics
+import time
+from config import Config
+
+# Prima della connessione: tutte le scritture del benchmark vanno nel database di prova
+Config.DATABASE_NAME = f"{Config.DATABASE_NAME}_bench"
+
+from database import Database
+from metrics import mongo_duration
+from models.result import ResultModel
+from service.counter_service import CounterService
+from service.result_service import ResultService
+
+CARS_PER_RACE = 20
+BENCH_YEAR = 2100
+
+
+def prepare(size: int) -> list:
+    """Recreate the scratch database with the races needed by `size` results and return them, unsaved."""
+    db = Database().connect()
+    for name in db.list_collection_names():
+        db.drop_collection(name)
+    CounterService._seeded.clear()
+
+    races = (size + CARS_PER_RACE - 1) // CARS_PER_RACE
+    db['races'].insert_many([
+        {'_id': race_id, 'year': BENCH_YEAR, 'round': race_id, 'circuitId': 1, 'name': f'Bench {race_id}'}
+        for race_id in range(1, races + 1)
+    ])
+    return [
+        ResultModel(
+            raceId=index // CARS_PER_RACE + 1, driverId=index % CARS_PER_RACE + 1, constructorId=1,
+            grid=index % CARS_PER_RACE + 1, positionText=str(index % CARS_PER_RACE + 1),
+            positionOrder=index % CARS_PER_RACE + 1, points=0.0, laps=50, statusId=1
+        )
+        for index in range(size)
+    ]
+
+
+def save_rows(result_service: ResultService, results: list) -> None:
+    for result in results:
+        result_service.save(result)
+
+
+def measure(size: int, mode: str, repeat: int) -> tuple:
+    """Return (round trips, median ms) of saving `size` results with save_many or row by row."""
+    timings = []
+    round_trips = []
+    for _ in range(repeat):
+        results = prepare(size)
+        result_service = ResultService()
+        before = mongo_duration.total()
+        start = time.perf_counter()
+        if mode == 'save_many':
+            result_service.save_many(results)
+        else:
+            save_rows(result_service, results)
+        timings.append((time.perf_counter() - start) * 1000)
+        round_trips.append(mongo_duration.total() - before)
+    return statistics.median(round_trips), statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Round trip e tempo di save_many rispetto a save riga per riga")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[20, 200, 2000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"Database di prova: {Config.DATABASE_NAME}, mediana di {args.repeat} esecuzioni")
+    try:
+        for size in args.sizes:
+            for mode in ('save', 'save_many'):
+                round_trips, elapsed = measure(size, mode, args.repeat)
+                print(f"  {size:>5} risultati  {mode:<9}  round trip {round_trips:>6.0f}  tempo {elapsed:>9.1f} ms")
+    finally:
+        Database().get_client().drop_database(Config.DATABASE_NAME)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Iterable, Optional
+from config import Config
+import versions
+
+
+class ServiceCache:
+    """
+    Cache LRU con TTL per i risultati dei metodi dei service.
+    Ogni voce è etichettata con (collezione, anno): una scrittura su una collezione
+    invalida solo le voci di quell'anno e quelle non legate a un anno specifico.
+    Le scritture degli altri processi si riconoscono dal timbro di versione della voce
+    (versions.stamp delle collezioni lette, per l'anno della voce): se non coincide più la voce è obsoleta.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (value, expires_at, tags, stamp)
+        self._tags = {}  # collection -> {year|None -> set(keys)}
+        self._lock = threading.Lock()
+        # Incrementata a ogni invalidazione: un valore calcolato a cavallo di una scrittura non va salvato
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale = 0
+
+    def get(self, key, stamp=None):
+        """Return (hit, value); an entry stored with a different version stamp is a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            value, expires_at, _, entry_stamp = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+            if entry_stamp != stamp:
+                self._remove(key)
+                self.stale += 1
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, value
+
+    def set(self, key, value, tags: Iterable[tuple], generation: int, stamp=None) -> None:
+        with self._lock:
+            if generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            tags = frozenset(tags)
+            self._entries[key] = (value, time.monotonic() + self.ttl, tags, stamp)
+            for collection, year in tags:
+                self._tags.setdefault(collection, {}).setdefault(year, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key) -> None:
+        _, _, tags, _ = self._entries.pop(key)
+        for collection, year in tags:
+            keys = self._tags.get(collection, {}).get(year)
+            if keys is not None:
+                keys.discard(key)
+
+    def invalidate(self, collection: str, year: Optional[int] = None) -> None:
+        """Evict the entries tagged with the collection: for a given year, that year plus the year-less ones."""
+        with self._lock:
+            self.generation += 1
+            by_year = self._tags.get(collection, {})
+            if year is None:
+                keys = set().union(*by_year.values()) if by_year else set()
+            else:
+                keys = by_year.get(year, set()) | by_year.get(None, set())
+            for key in keys:
+                if key in self._entries:
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'maxEntries': self.max_entries,
+                'ttlSeconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'stale': self.stale
+            }
+
+
+class _Call:
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical computations: while a key is being computed,
+    other callers with the same key wait for it and share its result (or its exception).
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'inFlight': len(self._calls),
+                'computed': self.leaders,
+                'coalesced': self.coalesced
+            }
+
+
+service_cache = ServiceCache(max_entries=Config.CACHE_MAX_ENTRIES, ttl=Config.CACHE_TTL_SECONDS)
+single_flight = SingleFlight()
+
+
+def memoize(*collections: str, year_arg: Optional[str] = None):
+    """
+    Memoize a service method. The entry is tagged with each collection it reads,
+    scoped to the value of the `year_arg` argument when there is one.
+    Concurrent misses on the same key run the method once and share the result.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = tuple((name, value) for name, value in bound.arguments.items() if name != 'self')
+            key = (fn.__qualname__, arguments)
+
+            year = bound.arguments.get(year_arg) if year_arg else None
+            # Versioni lette prima del calcolo: una scrittura concorrente rende obsoleta la voce.
+            # Per un anno contano solo le scritture di quell'anno (o senza anno), come in invalidate
+            stamp = versions.stamp(collections, year) if service_cache.max_entries > 0 else None
+            hit, value = service_cache.get(key, stamp)
+            if hit:
+                return value
+
+            def compute():
+                generation = service_cache.generation
+                value = fn(self, *args, **kwargs)
+                service_cache.set(key, value, {(collection, year) for collection in collections}, generation, stamp)
+                return value
+
+            return single_flight.do(key, compute)
+
+        return wrapper
+
+    return decorator
+
+
+def invalidate(collection: str, *years: Optional[int]) -> None:
+    """Called by the service write paths: evict what the write to `collection` may have changed."""
+    if not years:
+        service_cache.invalidate(collection)
+    for year in years:
+        service_cache.invalidate(collection, year)
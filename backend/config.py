@@ -4,7 +4,55 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class Config:
-    MONGODB_URI = "mongodb://localhost:27017"
+    MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
     #"mongodb://localhost:27017,localhost:27018,localhost:27019/?replicaSet=rs0" 
       
-    DATABASE_NAME = "F1_DB"
\ No newline at end of file
+    DATABASE_NAME = "F1_DB"
+
+    # Storage: "mongo" oppure "sqlite" (sola lettura, costruito da dataset/cleaned; vedi sqlite_backend.py).
+    # SQLITE_PATH vuoto = database in memoria ricostruito a ogni avvio
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mongo")
+    SQLITE_PATH = os.getenv("SQLITE_PATH", "")
+
+    # Pool di connessioni del MongoClient (uno per processo worker, condiviso dai suoi thread)
+    MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 100))
+    MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 0))
+    MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 60000))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", 10000))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", 5000))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000))
+    MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", 30000))
+    # Read preference delle letture pesanti (classifiche, risultati per pilota/scuderia, gare, scuderie
+    # e circuiti di un pilota): con il replica set vanno sui secondari con un ritardo massimo (>= 90 s);
+    # "primary" le riporta tutte sul primario
+    MONGO_SECONDARY_READ_PREFERENCE = os.getenv("MONGO_SECONDARY_READ_PREFERENCE", "secondaryPreferred")
+    MONGO_MAX_STALENESS_SECONDS = int(os.getenv("MONGO_MAX_STALENESS_SECONDS", 90))
+    # Compressione del traffico con MongoDB: es. "zstd,snappy,zlib" (zstd e snappy richiedono i pacchetti). Vuoto = nessuna
+    MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "")
+
+    # Log delle query lente (slow_queries.py): soglia in ms (negativa = disattivato), frazione
+    # delle query lente rieseguite con explain in un thread separato per catturarne il piano
+    # e stampa delle voci su stdout ("off" = solo /api/slow-queries)
+    SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 200))
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", 0.1))
+    SLOW_QUERY_STDOUT = os.getenv("SLOW_QUERY_STDOUT", "on") != "off"
+
+    # Indici e migrazioni all'avvio del server: "background" (thread separato, l'app risponde subito),
+    # "sync" (create_app attende la fine) oppure "off" (solo da riga di comando: python migrations.py apply)
+    MIGRATIONS_ON_STARTUP = os.getenv("MIGRATIONS_ON_STARTUP", "background")
+
+    # Aggregati calcolati dal motore NumPy invece che da MongoDB (vedi analytics.py):
+    # elenco separato da virgole tra driver_standing, constructor_standing, driver_career,
+    # driver_leaderboard, oppure "all". Vuoto = tutto su MongoDB.
+    ANALYTICS_ENGINE = os.getenv("ANALYTICS_ENGINE", "")
+
+    # Cache dei metodi di lettura dei service (cache.py)
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 512))
+    CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", 300))
+
+    # Ogni quanto (secondi) un processo rilegge i contatori di versione per scartare le voci delle
+    # sue cache scritte da un altro worker (versions.snapshot). 0 = a ogni accesso
+    VERSION_CHECK_SECONDS = float(os.getenv("VERSION_CHECK_SECONDS", 1))
+
+    # Header Cache-Control delle risposte con ETag: il client conserva la risposta ma la rivalida
+    HTTP_CACHE_CONTROL = os.getenv("HTTP_CACHE_CONTROL", "no-cache")
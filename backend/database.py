@@ -1,10 +1,22 @@
 from pymongo import MongoClient
+from pymongo.collection import Collection
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
 from config import Config
+from metrics import command_metrics
+from slow_queries import slow_query_log
+
+_READ_PREFERENCES = {
+    'primaryPreferred': PrimaryPreferred,
+    'secondary': Secondary,
+    'secondaryPreferred': SecondaryPreferred,
+    'nearest': Nearest,
+}
 
 class Database:
     _instance = None
     _client = None
     _db = None
+    _supports_transactions = None
     
     def __new__(cls):
         if cls._instance is None:
@@ -13,19 +25,86 @@ class Database:
     
     def connect(self):
         if self._client is None:
-            self._client = MongoClient(Config.MONGODB_URI)
-            self._db = self._client[Config.DATABASE_NAME]
-            print(f"Connesso a MongoDB: {Config.DATABASE_NAME}")
+            if self.read_only:
+                from sqlite_backend import SQLiteDatabase
+                self._client = SQLiteDatabase.open(Config.SQLITE_PATH)
+                self._db = self._client
+                print(f"Database SQLite in sola lettura: {Config.SQLITE_PATH or 'in memoria'}")
+            else:
+                self._client = MongoClient(
+                    Config.MONGODB_URI, event_listeners=[command_metrics, slow_query_log], **self._client_options()
+                )
+                self._db = self._client[Config.DATABASE_NAME]
+                print(f"Connesso a MongoDB: {Config.DATABASE_NAME}")
         return self._db
+
+    @property
+    def read_only(self) -> bool:
+        """True with the SQLite backend: every write raises ReadOnlyStorageError."""
+        return Config.STORAGE_BACKEND == 'sqlite'
     
+    @staticmethod
+    def _client_options() -> dict:
+        options = {
+            'maxPoolSize': Config.MONGO_MAX_POOL_SIZE,
+            'minPoolSize': Config.MONGO_MIN_POOL_SIZE,
+            'maxIdleTimeMS': Config.MONGO_MAX_IDLE_TIME_MS,
+            'waitQueueTimeoutMS': Config.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            'connectTimeoutMS': Config.MONGO_CONNECT_TIMEOUT_MS,
+            'serverSelectionTimeoutMS': Config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            'socketTimeoutMS': Config.MONGO_SOCKET_TIMEOUT_MS,
+        }
+        if Config.MONGO_COMPRESSORS:
+            options['compressors'] = Config.MONGO_COMPRESSORS
+        return options
+
+    def get_client(self) -> MongoClient:
+        if self._client is None:
+            self.connect()
+        return self._client
+
+    def supports_transactions(self) -> bool:
+        """Multi-document transactions require a replica set or a sharded cluster."""
+        if self.read_only:
+            return False
+        if self._supports_transactions is None:
+            hello = self.get_client().admin.command('hello')
+            self._supports_transactions = 'setName' in hello or hello.get('msg') == 'isdbgrid'
+        return self._supports_transactions
+
     def get_collection(self, collection_name=None):
         if self._db is None:
             self.connect()
         collection_name = collection_name or Config.COLLECTION_NAME
         return self._db[collection_name]
     
+    def get_secondary_collection(self, collection_name: str) -> Collection:
+        """
+        Handle for heavy reads that tolerate bounded staleness: with a replica set they are
+        served by a secondary at most MONGO_MAX_STALENESS_SECONDS behind the primary.
+        Writes and reads that must see them stay on get_collection (primary).
+        """
+        return self.get_collection(collection_name).with_options(read_preference=self._secondary_read_preference())
+
+    @staticmethod
+    def _secondary_read_preference():
+        mode = _READ_PREFERENCES.get(Config.MONGO_SECONDARY_READ_PREFERENCE)
+        if mode is None:
+            return Primary()
+        return mode(max_staleness=Config.MONGO_MAX_STALENESS_SECONDS)
+
     def close(self):
         if self._client:
             self._client.close()
             self._client = None
-            self._db = None
\ No newline at end of file
+            self._db = None
+            self._supports_transactions = None
+
+    def reset_after_fork(self):
+        """
+        Forget a client inherited from the parent process without closing it
+        (its sockets belong to the parent): the next call creates a new one.
+        """
+        self._client = None
+        self._db = None
+        self._supports_transactions = None
@@ -0,0 +1,49 @@
+import threading
+from database import Database
+import versions
+
+
+class DimensionCache:
+    """
+    Cache in memoria id -> documento per le tabelle dimensionali (piloti, scuderie, circuiti).
+    Ogni collezione viene caricata per intero con una sola query al primo accesso;
+    i service la invalidano nei loro percorsi di scrittura, e viene ricaricata quando la versione
+    della collezione cambia per una scrittura di un altro processo (versions.snapshot).
+    I documenti restituiti sono condivisi: vanno trattati in sola lettura.
+    """
+    _instance = None
+
+    COLLECTIONS = ('drivers', 'constructors', 'circuits')
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(DimensionCache, cls).__new__(cls)
+            cls._instance._records = {}
+            cls._instance._stamps = {}
+            cls._instance._lock = threading.Lock()
+        return cls._instance
+
+    def get_all(self, collection_name: str) -> dict:
+        """Return the id -> document map of a dimension, loading it in bulk if needed."""
+        stamp = versions.stamp((collection_name,))
+        records = self._records.get(collection_name)
+        if records is None or self._stamps.get(collection_name) != stamp:
+            with self._lock:
+                records = self._records.get(collection_name)
+                if records is None or self._stamps.get(collection_name) != stamp:
+                    cursor = Database().get_collection(collection_name).find()
+                    records = {doc['_id']: doc for doc in cursor}
+                    self._records[collection_name] = records
+                    self._stamps[collection_name] = stamp
+        return records
+
+    def get(self, collection_name: str, _id: int):
+        return self.get_all(collection_name).get(_id)
+
+    def invalidate(self, collection_name: str = None) -> None:
+        """Drop one dimension (or all of them); it is reloaded on next access."""
+        with self._lock:
+            if collection_name is None:
+                self._records.clear()
+            else:
+                self._records.pop(collection_name, None)
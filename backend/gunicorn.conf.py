@@ -0,0 +1,28 @@
+"""
+Configurazione di gunicorn: worker pre-fork, ciascuno con più thread.
+
+Ogni worker importa l'applicazione dopo il fork (preload_app = False), quindi MongoClient,
+service e cache nascono nel processo che li usa. post_fork scarta comunque un client
+eventualmente ereditato dal master, come richiesto da PyMongo.
+Tutti i parametri si possono sovrascrivere con le variabili d'ambiente GUNICORN_*.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+worker_class = "gthread"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+# Riavvia periodicamente i worker per contenere la memoria (con jitter per non riavviarli insieme)
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 1000))
+preload_app = False
+accesslog = os.getenv("GUNICORN_ACCESSLOG", "-") or None
+
+
+def post_fork(server, worker):
+    from database import Database
+    Database().reset_after_fork()
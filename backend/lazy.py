@@ -0,0 +1,23 @@
+import threading
+
+
+class LazyService:
+    """
+    Stand-in for a service instance in the route modules: the service is built on
+    first use instead of at import time, so importing the app does no database work.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def _get(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+        return self._instance
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
@@ -0,0 +1,126 @@
+"""
+Test di carico del server di produzione: richieste al secondo e latenze p50/p99 al variare
+del numero di worker, per l'app sincrona (gunicorn, wsgi:app) e per quella asincrona (uvicorn, asgi:app).
+
+Per ogni server e numero di worker avvia il processo, attende /api/health e lo
+bombarda per qualche secondo con client concorrenti in keep-alive.
+Uso (dalla cartella backend, con MongoDB in esecuzione e gunicorn/uvicorn installati):
+    python loadtest.py --workers 1 2 4 --threads 4 --clients 32 --duration 10 --path /api/season/standing?year=2010
+    python loadtest.py --servers wsgi asgi --workers 2 --no-cache --path /api/season/2010
+"""
+import argparse
+import http.client
+import os
+import subprocess
+import sys
+import threading
+import time
+
+
+def wait_ready(port: int, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/api/health')
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Il server sulla porta {port} non risponde")
+
+
+def percentile(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def hammer(port: int, path: str, clients: int, duration: float) -> tuple:
+    """
+    Return (latencies in ms of the successful requests, errors) of `clients` keep-alive
+    clients running for `duration` seconds.
+    """
+    latencies = [[] for _ in range(clients)]
+    errors = [0] * clients
+    deadline = time.monotonic() + duration
+
+    def client(i):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        while time.monotonic() < deadline:
+            try:
+                start = time.perf_counter()
+                conn.request('GET', path)
+                response = conn.getresponse()
+                response.read()
+                if response.status == 200:
+                    latencies[i].append((time.perf_counter() - start) * 1000)
+                else:
+                    errors[i] += 1
+            except (OSError, http.client.HTTPException):
+                errors[i] += 1
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        conn.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return [latency for per_client in latencies for latency in per_client], sum(errors)
+
+
+def server_command(server: str, workers: int, port: int) -> list:
+    if server == 'asgi':
+        return [sys.executable, '-m', 'uvicorn', 'asgi:app', '--host', '127.0.0.1', '--port', str(port),
+                '--workers', str(workers), '--no-access-log']
+    return [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test di carico di F1 Archive per numero di worker")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--path', default='/api/season/standing?year=2010')
+    parser.add_argument('--servers', nargs='+', choices=['wsgi', 'asgi'], default=['wsgi'])
+    parser.add_argument('--no-cache', action='store_true',
+                        help="disattiva la cache dei service dell'app sincrona (confronto alla pari con asgi)")
+    args = parser.parse_args()
+
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    print(f"GET {args.path}  client={args.clients}  thread/worker={args.threads}  durata={args.duration}s")
+    for server in args.servers:
+        for workers in args.workers:
+            env = {
+                **os.environ,
+                'GUNICORN_BIND': f"127.0.0.1:{args.port}",
+                'GUNICORN_WORKERS': str(workers),
+                'GUNICORN_THREADS': str(args.threads),
+                'GUNICORN_ACCESSLOG': '',
+            }
+            if args.no_cache:
+                env['CACHE_MAX_ENTRIES'] = '0'
+            process = subprocess.Popen(
+                server_command(server, workers, args.port),
+                cwd=backend_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            try:
+                wait_ready(args.port)
+                hammer(args.port, args.path, args.clients, 1)  # riscaldamento: cache e connessioni
+                latencies, errors = hammer(args.port, args.path, args.clients, args.duration)
+                print(
+                    f"  {server:<5} worker={workers:<3} {len(latencies) / args.duration:>10.1f} req/s  "
+                    f"p50 {percentile(latencies, 50):>8.1f} ms  p99 {percentile(latencies, 99):>8.1f} ms  errori={errors}"
+                )
+            finally:
+                process.terminate()
+                process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+"""
+Metriche del server in formato testo Prometheus, esposte su /api/metrics.
+
+- f1_http_request_duration_seconds   istogramma per endpoint (blueprint.funzione), metodo e status
+- f1_http_requests_in_flight         richieste in corso per endpoint
+- f1_mongo_command_duration_seconds  istogramma per comando, collezione e metodo del service
+- f1_mongo_command_failures_total    comandi falliti, con le stesse etichette
+
+I comandi MongoDB sono osservati da un CommandListener registrato sul MongoClient di Database;
+il metodo del service in esecuzione arriva da una contextvar impostata dal decoratore
+di classe @instrumented. I valori sono per processo (un registro per worker).
+"""
+import contextvars
+import inspect
+import threading
+import time
+from functools import wraps
+from typing import Dict, Tuple
+from flask import Response, g, request
+from pymongo import monitoring
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Metodo del service che sta eseguendo la query corrente (es. "SeasonService.find_season")
+current_service_method = contextvars.ContextVar('current_service_method', default='none')
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...], buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self.buckets = buckets
+        self._series: Dict[Tuple, list] = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def total(self) -> int:
+        """Observations across every label set (e.g. MongoDB round trips, for the benchmarks)."""
+        with self._lock:
+            return sum(series[-1] for series in self._series.values())
+
+    def count(self, *labels) -> int:
+        """Observations of one label set."""
+        with self._lock:
+            series = self._series.get(labels)
+            return series[-1] if series else 0
+
+    def render(self) -> list:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                bounds = [*map(str, self.buckets), '+Inf']
+                counts = [*series[:len(self.buckets)], series[-1]]
+                for bound, count in zip(bounds, counts):
+                    le = f'le="{bound}"'
+                    lines.append(f'{self.name}_bucket{_labels(self.label_names, labels, le)} {count}')
+                lines.append(f'{self.name}_sum{_labels(self.label_names, labels)} {series[-2]}')
+                lines.append(f'{self.name}_count{_labels(self.label_names, labels)} {series[-1]}')
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...], kind: str = 'gauge'):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self.kind = kind
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels) -> None:
+        self.inc(*labels, amount=-1)
+
+    def render(self) -> list:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_labels(self.label_names, labels)} {value}')
+        return lines
+
+
+http_duration = Histogram(
+    'f1_http_request_duration_seconds', 'Durata delle richieste HTTP', ('endpoint', 'method', 'status')
+)
+http_in_flight = Gauge('f1_http_requests_in_flight', 'Richieste HTTP in corso', ('endpoint',))
+mongo_duration = Histogram(
+    'f1_mongo_command_duration_seconds', 'Durata dei comandi MongoDB', ('command', 'collection', 'service')
+)
+mongo_failures = Gauge(
+    'f1_mongo_command_failures_total', 'Comandi MongoDB falliti', ('command', 'collection', 'service'), kind='counter'
+)
+REGISTRY = (http_duration, http_in_flight, mongo_duration, mongo_failures)
+
+
+def render() -> str:
+    return '\n'.join(line for metric in REGISTRY for line in metric.render()) + '\n'
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Time every MongoDB command, labelled with its collection and the calling service method."""
+
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _collection(event: monitoring.CommandStartedEvent) -> str:
+        target = event.command.get(event.command_name)
+        if isinstance(target, str):
+            return target
+        return event.command.get('collection', '') if event.command_name == 'getMore' else ''
+
+    def started(self, event):
+        labels = (event.command_name, self._collection(event), current_service_method.get())
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = labels
+
+    def _finish(self, event):
+        with self._lock:
+            return self._pending.pop((event.connection_id, event.request_id), None)
+
+    def succeeded(self, event):
+        labels = self._finish(event)
+        if labels is not None:
+            mongo_duration.observe(event.duration_micros / 1e6, *labels)
+
+    def failed(self, event):
+        labels = self._finish(event)
+        if labels is not None:
+            mongo_duration.observe(event.duration_micros / 1e6, *labels)
+            mongo_failures.inc(*labels)
+
+
+command_metrics = CommandMetrics()
+
+
+def instrumented(cls):
+    """
+    Class decorator for the services: every method call sets current_service_method,
+    so the Mongo commands it issues are labelled with "Class.method".
+    """
+    for name, member in list(vars(cls).items()):
+        if name.startswith('__') or not inspect.isfunction(member):
+            continue
+        setattr(cls, name, _traced(member, f'{cls.__name__}.{name}'))
+    return cls
+
+
+def _traced(fn, label: str):
+    if inspect.isgeneratorfunction(fn):
+        # I generatori (es. ResultService.iter_raw) lavorano a ogni next(): l'etichetta vale per ciascun passo
+        @wraps(fn)
+        def generator_wrapper(*args, **kwargs):
+            iterator = fn(*args, **kwargs)
+            try:
+                while True:
+                    token = current_service_method.set(label)
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                    finally:
+                        current_service_method.reset(token)
+                    yield item
+            finally:
+                iterator.close()
+        return generator_wrapper
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = current_service_method.set(label)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            current_service_method.reset(token)
+    return wrapper
+
+
+def init_app(app) -> None:
+    """Time every request and expose /api/metrics."""
+
+    @app.before_request
+    def start_timer():
+        g.metrics_endpoint = request.endpoint or 'unmatched'
+        g.metrics_start = time.perf_counter()
+        http_in_flight.inc(g.metrics_endpoint)
+
+    @app.after_request
+    def record(response):
+        if 'metrics_start' in g:
+            http_duration.observe(
+                time.perf_counter() - g.metrics_start, g.metrics_endpoint, request.method, response.status_code
+            )
+        return response
+
+    @app.teardown_request
+    def finish(exc):
+        if 'metrics_start' in g:
+            http_in_flight.dec(g.metrics_endpoint)
+
+    @app.route('/api/metrics')
+    def prometheus_metrics():
+        return Response(render(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,287 @@
+"""
+Indici e migrazioni dello schema del database.
+
+Uso da riga di comando (dalla cartella backend):
+    python migrations.py apply     Crea gli indici ed esegue le migrazioni mancanti
+    python migrations.py status    Mostra le migrazioni applicate e quelle in attesa
+    python migrations.py stats     Mostra dimensione e utilizzo ($indexStats) di ogni indice
+
+Più processi (worker gunicorn, setup_db, riga di comando) possono avviare le migrazioni insieme:
+un lease su un documento di 'migration_lock' fa sì che le esegua uno solo alla volta, gli altri
+attendono e trovano poi le versioni già registrate.
+"""
+import argparse
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pymongo import ASCENDING, DESCENDING
+from pymongo.database import Database as MongoDatabase
+from pymongo.errors import DuplicateKeyError
+from database import Database
+import versions
+
+MIGRATIONS_COLLECTION = 'schema_migrations'
+LOCK_COLLECTION = 'migration_lock'
+# Durata del lease: se il processo che lo detiene muore, un altro lo riprende dopo questo tempo
+LOCK_LEASE_SECONDS = 600
+LOCK_POLL_SECONDS = 0.5
+
+# Insieme completo degli indici richiesti dalle query dei service: (chiavi, opzioni)
+INDEXES = {
+    'results': [
+        # Indice di partecipazione: una voce per (driverId, year, raceId, constructorId, circuitId).
+        # Serve le query di carriera per anno e, come query coperte, gare/scuderie/circuiti di un pilota.
+        ([("driverId", ASCENDING), ("year", ASCENDING), ("raceId", ASCENDING),
+          ("constructorId", ASCENDING), ("circuitId", ASCENDING)], {}),
+        ([("constructorId", ASCENDING), ("year", ASCENDING)], {}),
+        ([("raceId", ASCENDING), ("grid", ASCENDING)], {}),
+        ([("raceId", ASCENDING), ("positionOrder", ASCENDING)], {}),
+        ([("raceId", ASCENDING), ("driverId", ASCENDING)], {}),
+    ],
+    'races': [
+        ([("year", ASCENDING), ("round", ASCENDING)], {}),
+        ([("circuitId", ASCENDING)], {}),
+    ],
+    'drivers': [
+        ([("nationality", ASCENDING), ("forename", ASCENDING)], {}),
+    ],
+    'constructors': [
+        ([("name", ASCENDING)], {}),
+    ],
+    'circuits': [
+        ([("country", ASCENDING), ("name", ASCENDING)], {}),
+    ],
+    'driver_standings': [
+        ([("year", ASCENDING), ("driverId", ASCENDING), ("constructorId", ASCENDING)], {"unique": True}),
+        ([("year", ASCENDING), ("totalPoints", DESCENDING)], {}),
+    ],
+    'constructor_standings': [
+        ([("year", ASCENDING), ("constructorId", ASCENDING)], {"unique": True}),
+        ([("year", ASCENDING), ("points", DESCENDING)], {}),
+    ],
+}
+
+# Indici creati da versioni precedenti e ora prefissi di un indice di INDEXES: ogni query che li usava
+# è servita dall'indice più lungo, tenerli costa solo spazio e scritture (migrazione 4)
+SUPERSEDED_INDEXES = {
+    'results': ['driverId_1', 'driverId_1_year_1', 'constructorId_1'],
+}
+
+
+def ensure_indexes(db: MongoDatabase) -> None:
+    """Create every declared index; create_index is a no-op when the index already exists."""
+    for collection_name, indexes in INDEXES.items():
+        for keys, options in indexes:
+            db[collection_name].create_index(keys, **options)
+
+
+def denormalize_race_fields(db: MongoDatabase) -> None:
+    """Copy year, round and circuitId of the race onto every result document."""
+    db['results'].aggregate([
+        {'$lookup': {'from': 'races', 'localField': 'raceId', 'foreignField': '_id', 'as': 'race'}},
+        {'$unwind': '$race'},
+        {'$project': {'_id': 1, 'year': '$race.year', 'round': '$race.round', 'circuitId': '$race.circuitId'}},
+        {'$merge': {'into': 'results', 'on': '_id', 'whenMatched': 'merge', 'whenNotMatched': 'discard'}}
+    ])
+
+
+def materialize_missing_standings(db: MongoDatabase) -> None:
+    """
+    Build driver_standings and constructor_standings for the seasons that have results but no
+    standing rows (data loaded before the materialized collections existed). The read path
+    never builds them: a season without rows is simply empty.
+    """
+    years = set(db['results'].distinct('year')) - {None}
+    missing_drivers = sorted(years - set(db['driver_standings'].distinct('year')))
+    missing_constructors = sorted(years - set(db['constructor_standings'].distinct('year')))
+
+    if missing_drivers:
+        db['results'].aggregate([
+            {'$match': {'year': {'$in': missing_drivers}}},
+            {'$group': {
+                '_id': {'year': '$year', 'driverId': '$driverId', 'constructorId': '$constructorId'},
+                'totalPoints': {'$sum': '$points'},
+                'racesCount': {'$sum': 1},
+                'wins': {'$sum': {'$cond': [{'$eq': ['$positionText', '1']}, 1, 0]}}
+            }},
+            {'$project': {'_id': 0, 'year': '$_id.year', 'driverId': '$_id.driverId',
+                          'constructorId': '$_id.constructorId', 'totalPoints': 1, 'racesCount': 1, 'wins': 1}},
+            {'$merge': {'into': 'driver_standings', 'on': ['year', 'driverId', 'constructorId'],
+                        'whenMatched': 'replace', 'whenNotMatched': 'insert'}}
+        ])
+    if missing_constructors:
+        db['results'].aggregate([
+            {'$match': {'year': {'$in': missing_constructors}}},
+            {'$group': {
+                '_id': {'year': '$year', 'constructorId': '$constructorId'},
+                'points': {'$sum': '$points'},
+                'wins': {'$sum': {'$cond': [{'$eq': ['$positionText', '1']}, 1, 0]}},
+                'podiums': {'$sum': {'$cond': [{'$in': ['$positionText', ['1', '2', '3']]}, 1, 0]}},
+                'bestFinish': {'$min': '$positionOrder'}
+            }},
+            {'$project': {'_id': 0, 'year': '$_id.year', 'constructorId': '$_id.constructorId',
+                          'points': 1, 'wins': 1, 'podiums': 1, 'bestFinish': 1}},
+            {'$merge': {'into': 'constructor_standings', 'on': ['year', 'constructorId'],
+                        'whenMatched': 'replace', 'whenNotMatched': 'insert'}}
+        ])
+    if missing_drivers or missing_constructors:
+        # Nuove righe nelle classifiche: cambiano gli ETag delle route che dipendono dai risultati
+        versions.bump('results', years=set(missing_drivers) | set(missing_constructors), db=db)
+
+
+def drop_superseded_indexes(db: MongoDatabase) -> None:
+    """Drop the SUPERSEDED_INDEXES still present; the longer indexes are created by migration 1."""
+    for collection_name, names in SUPERSEDED_INDEXES.items():
+        existing = db[collection_name].index_information()
+        for name in names:
+            if name in existing:
+                db[collection_name].drop_index(name)
+
+
+# Migrazioni versionate: (versione, descrizione, funzione(db)). Aggiungere sempre in coda.
+MIGRATIONS = [
+    (1, "Indici secondari per le query dei service", ensure_indexes),
+    (2, "Denormalizza year, round e circuitId della gara sui risultati", denormalize_race_fields),
+    (3, "Materializza le classifiche delle stagioni che ne sono prive", materialize_missing_standings),
+    (4, "Elimina gli indici di results sostituiti da indici composti che li estendono", drop_superseded_indexes),
+]
+
+
+def applied_versions(db: MongoDatabase) -> set:
+    return {doc['_id'] for doc in db[MIGRATIONS_COLLECTION].find({}, {'_id': 1})}
+
+
+@contextmanager
+def migration_lock(db: MongoDatabase, lease_seconds: float = LOCK_LEASE_SECONDS,
+                   poll_seconds: float = LOCK_POLL_SECONDS):
+    """
+    Hold the migration lease for the duration of the block, waiting while another process has it.
+    The lease is taken with a single upsert that matches only a missing or expired lock document:
+    when someone else holds it the upsert collides on _id and we poll again.
+    """
+    locks = db[LOCK_COLLECTION]
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    while True:
+        now = datetime.now(timezone.utc)
+        try:
+            locks.find_one_and_update(
+                {'_id': 'migrations', 'expiresAt': {'$lt': now}},
+                {'$set': {'owner': owner, 'acquiredAt': now, 'expiresAt': now + timedelta(seconds=lease_seconds)}},
+                upsert=True
+            )
+            break
+        except DuplicateKeyError:
+            time.sleep(poll_seconds)
+    try:
+        yield owner
+    finally:
+        locks.delete_one({'_id': 'migrations', 'owner': owner})
+
+
+def apply_migrations(db: MongoDatabase = None, reset: bool = False) -> list:
+    """
+    Esegue in ordine le migrazioni non ancora registrate e riallinea gli indici, con il lease
+    di migration_lock: le versioni applicate si leggono solo dopo averlo ottenuto.
+    reset=True dimentica le migrazioni già applicate (da usare dopo un ricaricamento completo dei dati).
+    Restituisce le versioni eseguite.
+    """
+    db = db if db is not None else Database().connect()
+    with migration_lock(db):
+        if reset:
+            db[MIGRATIONS_COLLECTION].delete_many({})
+
+        done = applied_versions(db)
+        executed = []
+        for version, description, migrate in MIGRATIONS:
+            if version in done:
+                continue
+            migrate(db)
+            db[MIGRATIONS_COLLECTION].insert_one({
+                '_id': version,
+                'description': description,
+                'appliedAt': datetime.now(timezone.utc)
+            })
+            executed.append(version)
+
+        # Gli indici dichiarati vengono sempre verificati, anche se nessuna migrazione è in attesa
+        ensure_indexes(db)
+    return executed
+
+
+# Stato dell'ultima esecuzione in background (vedi start_background_migrations)
+_background = {'state': 'idle', 'executed': [], 'error': None}
+
+
+def start_background_migrations(after=None) -> threading.Thread:
+    """
+    Run apply_migrations in a daemon thread so the app starts serving immediately;
+    `after` (optional) runs in the same thread once the migrations are done.
+    """
+    def run():
+        _background.update(state='running', error=None)
+        try:
+            _background['executed'] = apply_migrations()
+            if after is not None:
+                after()
+            _background['state'] = 'done'
+        except Exception as e:
+            _background.update(state='failed', error=str(e))
+            print(f"Migrazioni in background fallite: {e}")
+
+    thread = threading.Thread(target=run, name='migrations', daemon=True)
+    thread.start()
+    return thread
+
+
+def background_status() -> dict:
+    return dict(_background)
+
+
+def index_stats(db: MongoDatabase = None) -> list:
+    """Size and usage of every index of the declared collections."""
+    db = db if db is not None else Database().connect()
+    stats = []
+    for collection_name in INDEXES:
+        collection = db[collection_name]
+        sizes = {}
+        for storage in collection.aggregate([{'$collStats': {'storageStats': {}}}]):
+            sizes.update(storage['storageStats'].get('indexSizes', {}))
+        for usage in collection.aggregate([{'$indexStats': {}}]):
+            stats.append({
+                'collection': collection_name,
+                'index': usage['name'],
+                'size': sizes.get(usage['name'], 0),
+                'ops': usage['accesses']['ops'],
+                'since': usage['accesses']['since']
+            })
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Indici e migrazioni di F1 Archive")
+    parser.add_argument('command', choices=['apply', 'status', 'stats'])
+    args = parser.parse_args()
+    db = Database().connect()
+
+    if args.command == 'apply':
+        executed = apply_migrations(db)
+        print(f"Migrazioni eseguite: {executed if executed else 'nessuna'}")
+    elif args.command == 'status':
+        done = applied_versions(db)
+        for version, description, _ in MIGRATIONS:
+            state = 'applicata' if version in done else 'in attesa'
+            print(f"  {version:>3}  {state:<10} {description}")
+    elif args.command == 'stats':
+        for row in index_stats(db):
+            print(
+                f"  {row['collection']:<22} {row['index']:<40} "
+                f"{row['size'] / 1024:>10.1f} KB  {row['ops']:>10} ops dal {row['since']:%Y-%m-%d %H:%M}"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,319 @@
+"""
+Verifica di regressione dei piani di esecuzione delle query dei service.
+
+Ogni metodo pubblico di lettura dei service (backend/service) viene eseguito contro un MongoDB
+locale caricato da dataset/cleaned: le find/aggregate/count/distinct che emette vengono catturate
+e rieseguite con explain("executionStats"). Il controllo fallisce se:
+- uno stage fa un COLLSCAN (anche dentro un $lookup) in un metodo che non legge per scelta
+  l'intera collezione (i casi marcati full_scan vengono solo riportati);
+- documenti esaminati / documenti restituiti supera il budget (--max-ratio, default 10);
+  per le pipeline il rapporto è quello del $match iniziale, spiegato come find, così non dipende
+  dal motore di query (con SBE l'explain conta le righe dopo il $group);
+- un metodo pubblico di lettura non ha un caso in cases().
+
+La cache dei service e il motore analitico sono disattivati, le tabelle dimensionali vengono
+caricate prima della cattura (sono letture complete per scelta, vedi dimension_cache.py).
+Lo stesso controllo gira in pytest (tests/test_query_plans.py) su un database di prova caricato
+con le stagioni dei test ed eliminato alla fine, saltato senza un server MongoDB.
+
+Uso (dalla cartella backend, con un mongod locale):
+    python plan_check.py --seed      # carica prima dataset/cleaned con dataset/setup_db.py
+    python plan_check.py
+    python plan_check.py --max-ratio 5 --verbose
+"""
+import os
+
+# Prima di importare config: ogni chiamata deve arrivare a MongoDB
+os.environ['CACHE_MAX_ENTRIES'] = '0'
+os.environ['ANALYTICS_ENGINE'] = ''
+
+import argparse
+import inspect
+import subprocess
+import sys
+import threading
+from pymongo import monitoring
+from database import Database
+from dimension_cache import DimensionCache
+import versions
+from slow_queries import MONITORED_COMMANDS, SlowQueryLog, summarize_explain
+from service.circuit_service import CircuitService
+from service.constructor_service import ConstructorService
+from service.driver_service import DriverService
+from service.race_service import RaceService
+from service.result_service import ResultService
+from service.season_service import SeasonService
+from service.standing_service import StandingService
+
+SERVICES = (CircuitService, ConstructorService, DriverService, RaceService, ResultService,
+            SeasonService, StandingService)
+# Metodi che scrivono: fuori dal controllo (CounterService scrive soltanto e non è in SERVICES)
+WRITE_METHODS = {'save', 'save_many', 'delete', 'delete_by_id', 'delete_season', 'apply_results',
+                 'replace_results', 'rebuild', 'delete_year'}
+# Rami del piano che non sono stati eseguiti: un COLLSCAN lì dentro non conta
+_IGNORED_PLAN_KEYS = {'rejectedPlans', 'allPlansExecution'}
+
+
+def samples() -> dict:
+    """Ids and values to call the services with, taken from a 2010 race winner."""
+    db = Database().connect()
+    winner = db['results'].find_one({'year': 2010, 'positionText': '1'})
+    if winner is None:
+        return {}
+    race = db['races'].find_one({'_id': winner['raceId']})
+    driver = db['drivers'].find_one({'_id': winner['driverId']})
+    circuit = db['circuits'].find_one({'_id': race['circuitId']})
+    return {
+        'year': race['year'], 'race': race['_id'], 'result': winner['_id'],
+        'driver': driver['_id'], 'nationality': driver['nationality'],
+        'constructor': winner['constructorId'], 'circuit': circuit['_id'], 'country': circuit['country'],
+    }
+
+
+def cases(s: dict) -> list:
+    """
+    (service, method, kwargs, options) for every public read method.
+    options: full_scan=True when the method reads the whole collection by design,
+    max_ratio to override the examined/returned budget of a single case.
+    """
+    full = {'full_scan': True}
+    year_range = {'from_year': s['year'] - 5, 'to_year': s['year']}
+    return [
+        (CircuitService, 'find_by_id', {'_id': s['circuit']}, {}),
+        (CircuitService, 'find_all', {}, full),
+        (CircuitService, 'find_all', {'country': s['country']}, {}),
+        (CircuitService, 'exists_circuit_id', {'_id': s['circuit']}, {}),
+        (CircuitService, 'count', {}, full),
+        (CircuitService, 'find_by_driverId', {'driver_id': s['driver']}, {}),
+
+        (ConstructorService, 'find_by_id', {'_id': s['constructor']}, {}),
+        (ConstructorService, 'find_all', {}, full),
+        (ConstructorService, 'exists_constructor_id', {'_id': s['constructor']}, {}),
+        (ConstructorService, 'count', {}, full),
+        (ConstructorService, 'find_results', {'id': s['constructor'], 'year': s['year']}, {}),
+        (ConstructorService, 'find_results', {'id': s['constructor'], **year_range}, {}),
+        (ConstructorService, 'find_constructors_by_driverId', {'driver_id': s['driver']}, {}),
+
+        (DriverService, 'find_by_id', {'_id': s['driver']}, {}),
+        (DriverService, 'find_all', {}, full),
+        (DriverService, 'find_all', {'sort_alpha': 'asc'}, full),
+        (DriverService, 'find_all', {'nationality': s['nationality'], 'sort_alpha': 'asc'}, {}),
+        (DriverService, 'exists_driver_id', {'_id': s['driver']}, {}),
+        (DriverService, 'count', {}, full),
+        (DriverService, 'find_results', {'id': s['driver'], 'year': s['year']}, {}),
+        (DriverService, 'find_results_document', {'id': s['driver'], **year_range}, {}),
+        (DriverService, 'find_all_nationalities', {}, {}),
+        (DriverService, 'find_profile', {'id': s['driver']}, {}),
+        (DriverService, 'find_career', {'id': s['driver']}, {}),
+        # Classifiche di tutti i piloti: senza range (o con un range di stagioni, che copre gran parte
+        # dei risultati) leggere l'intera collezione è il piano atteso
+        (DriverService, 'find_leaderboard', {'metric': 'wins'}, full),
+        (DriverService, 'find_leaderboard', {'metric': 'points', **year_range}, full),
+
+        (RaceService, 'find_by_id', {'_id': s['race']}, {}),
+        (RaceService, 'find_all', {}, full),
+        (RaceService, 'exists_race_id', {'_id': s['race']}, {}),
+        (RaceService, 'count', {}, full),
+        (RaceService, 'find_all_races_by_driverId', {'driver_id': s['driver']}, {}),
+
+        (ResultService, 'find_by_id', {'_id': s['result']}, {}),
+        (ResultService, 'find_all_documents', {}, full),
+        (ResultService, 'find_page_documents', {'limit': 50}, {}),
+        (ResultService, 'find_page_documents', {'after': s['result'], 'limit': 50}, {}),
+        (ResultService, 'iter_raw', {'after': s['result'], 'limit': 100}, {}),
+        (ResultService, 'exists_result_id', {'_id': s['result']}, {}),
+        (ResultService, 'count', {}, full),
+        (ResultService, 'get_race_standings', {'race_id': s['race']}, {}),
+
+        (SeasonService, 'find', {}, full),
+        (SeasonService, 'find', {'year': s['year']}, {}),
+        (SeasonService, 'find', year_range, {}),
+        (SeasonService, 'find_driver_standing', {'year': s['year']}, {}),
+        (SeasonService, 'find_constructor_standing', {'year': s['year']}, {}),
+        (SeasonService, 'find_season', {'year': s['year']}, {}),
+
+        (StandingService, 'find_driver_standing', {'year': s['year']}, {}),
+        (StandingService, 'find_constructor_standing', {'year': s['year']}, {}),
+    ]
+
+
+def read_methods(service) -> set:
+    """Public, non-static methods of a service that only read."""
+    return {
+        name for name, member in vars(service).items()
+        if not name.startswith('_') and inspect.isfunction(member) and name not in WRITE_METHODS
+    }
+
+
+class QueryRecorder(monitoring.CommandListener):
+    """Collect the read commands sent while `recording` is set (threads included, e.g. find_profile)."""
+
+    def __init__(self):
+        self.recording = False
+        self.commands = []
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        # I contatori di versione (pochi documenti, riletti dalle cache) non fanno parte del service
+        if (self.recording and event.command_name in MONITORED_COMMANDS
+                and event.command.get(event.command_name) != versions.VERSIONS_COLLECTION):
+            with self._lock:
+                self.commands.append((event.command_name, dict(event.command), event.database_name))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def capture(self, call) -> list:
+        self.commands = []
+        self.recording = True
+        try:
+            call()
+        finally:
+            self.recording = False
+        return self.commands
+
+
+def _walk(node, path=''):
+    """Yield (path, dict) for every executed plan node of an explain document."""
+    if isinstance(node, dict):
+        yield path, node
+        for key, value in node.items():
+            if key not in _IGNORED_PLAN_KEYS:
+                yield from _walk(value, f'{path}.{key}' if path else key)
+    elif isinstance(node, list):
+        for i, value in enumerate(node):
+            yield from _walk(value, f'{path}[{i}]')
+
+
+def collection_scans(explain: dict) -> list:
+    """Where the plan reads a whole collection: COLLSCAN stages, $lookup scans, nested-loop joins."""
+    scans = set()
+    for path, node in _walk(explain):
+        if node.get('stage') == 'COLLSCAN':
+            scans.add('COLLSCAN')
+        if node.get('stage') == 'EQ_LOOKUP' and node.get('strategy') == 'NestedLoopJoin':
+            scans.add(f"$lookup {node.get('foreignCollection', '')} senza indice (NestedLoopJoin)")
+        if '$lookup' in node and node.get('collectionScans'):
+            scans.add(f"$lookup {node['$lookup'].get('from', '')}: {node['collectionScans']} collection scan")
+    return sorted(scans)
+
+
+def match_explain(client, command: dict, database_name: str):
+    """
+    Explain of the leading $match of an aggregate, run as a find: documents examined and
+    returned by the filter alone, whatever query engine executes the rest of the pipeline.
+    None for other commands or pipelines that do not start with $match.
+    """
+    pipeline = command.get('pipeline') or []
+    if 'aggregate' not in command or not pipeline or '$match' not in pipeline[0]:
+        return None
+    find = {'find': command['aggregate'], 'filter': pipeline[0]['$match']}
+    return SlowQueryLog.explain(client, find, database_name)
+
+
+def check(explain: dict, full_scan: bool, max_ratio: float, counts: dict = None) -> tuple:
+    """
+    Return (summary, problems) of one explained command.
+    counts: explain to take examined/returned from instead (see match_explain).
+    """
+    summary = summarize_explain(explain)
+    problems = [] if full_scan else collection_scans(explain)
+    if counts is not None:
+        matched = summarize_explain(counts)
+        summary['docsExamined'], summary['nReturned'] = matched.get('docsExamined'), matched.get('nReturned')
+    examined = summary.get('docsExamined') or 0
+    returned = summary.get('nReturned') or 0
+    ratio = examined / max(returned, 1)
+    summary['ratio'] = ratio
+    if not full_scan and ratio > max_ratio:
+        problems.append(f"esaminati/restituiti {examined}/{returned} = {ratio:.1f} > {max_ratio:g}")
+    return summary, problems
+
+
+def seed() -> None:
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+    subprocess.run([sys.executable, os.path.join('dataset', 'setup_db.py')], cwd=root, check=True)
+
+
+def run(recorder: QueryRecorder, max_ratio: float = 10, verbose: bool = False) -> bool:
+    """
+    Run every case against the connected database and print the plans that fail.
+    The MongoClient must report its commands to `recorder`. Return True when every plan passes.
+    """
+    client = Database().get_client()
+    s = samples()
+    for collection_name in DimensionCache.COLLECTIONS:
+        DimensionCache().get_all(collection_name)
+
+    all_cases = cases(s)
+    covered = {(service, method) for service, method, _, _ in all_cases}
+    missing = sorted(
+        f"{service.__name__}.{method}"
+        for service in SERVICES for method in read_methods(service) if (service, method) not in covered
+    )
+
+    failures = []
+    queries = 0
+    for service, method, kwargs, options in all_cases:
+        label = f"{service.__name__}.{method}({', '.join(f'{k}={v!r}' for k, v in kwargs.items())})"
+        bound = getattr(service(), method)
+        commands = recorder.capture(lambda: list(bound(**kwargs)) if method == 'iter_raw' else bound(**kwargs))
+        if not commands:
+            print(f"  --   {label}: nessuna query")
+            continue
+        for command_name, command, database_name in commands:
+            queries += 1
+            target = f"{command_name} {command.get(command_name)}"
+            try:
+                explain = SlowQueryLog.explain(client, command, database_name)
+                counts = match_explain(client, command, database_name)
+            except Exception as e:
+                failures.append(label)
+                print(f"  FAIL {label} {target}: explain non riuscito ({e})")
+                continue
+            summary, problems = check(explain, options.get('full_scan', False),
+                                      options.get('max_ratio', max_ratio), counts)
+            status = 'FAIL' if problems else ('SCAN' if options.get('full_scan') else 'OK  ')
+            if problems:
+                failures.append(label)
+            if problems or verbose:
+                print(f"  {status} {label} {target}: {summary['plan'] or '-'}  "
+                      f"esaminati {summary.get('docsExamined')} / restituiti {summary.get('nReturned')}")
+            for problem in problems:
+                print(f"         {problem}")
+
+    for method in missing:
+        print(f"  FAIL {method}: metodo di lettura senza caso in cases()")
+    ok = not failures and not missing
+    print(f"Piani {'OK' if ok else 'FALLITI'}: {queries} query da {len(all_cases)} casi, "
+          f"budget esaminati/restituiti {max_ratio:g}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica dei piani di esecuzione delle query dei service")
+    parser.add_argument('--max-ratio', type=float, default=10,
+                        help="budget di documenti esaminati per documento restituito")
+    parser.add_argument('--seed', action='store_true', help="carica prima dataset/cleaned (dataset/setup_db.py)")
+    parser.add_argument('--verbose', action='store_true', help="mostra il piano di ogni query")
+    args = parser.parse_args()
+
+    if args.seed:
+        seed()
+
+    # Registrato prima della creazione del MongoClient: vale per tutti i client del processo
+    recorder = QueryRecorder()
+    monitoring.register(recorder)
+    Database().connect()
+
+    if not samples():
+        print("Database vuoto: caricare dataset/cleaned con python plan_check.py --seed")
+        sys.exit(2)
+    sys.exit(0 if run(recorder, args.max_ratio, args.verbose) else 1)
+
+
+if __name__ == '__main__':
+    main()
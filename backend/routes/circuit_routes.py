@@ -3,13 +3,16 @@ from pydantic import ValidationError
 from bson.errors import InvalidId
 from models.circuit import CircuitModel
 from service.circuit_service import CircuitService
+from lazy import LazyService
+from versions import conditional
 
 # Create a Blueprint for driver-related routes
 circuit_bp = Blueprint('circuit', __name__)
-circuit_service = CircuitService()
+circuit_service = LazyService(CircuitService)
 
 # Route to get all drivers
 @circuit_bp.route('/all', methods=['GET'])
+@conditional('circuits')
 def find_all_circuits():
     country = request.args.get('country', type=str)
     sort_alpha = request.args.get('sortAlpha', type=str)
@@ -3,13 +3,16 @@ from pydantic import ValidationError
 from bson.errors import InvalidId
 from models.constructor import ConstructorModel
 from service.constructor_service import ConstructorService
+from lazy import LazyService
+from versions import conditional
 
 # Create a Blueprint for constructor-related routes
 constructor_bp = Blueprint('constructor', __name__)
-constructor_service = ConstructorService()
+constructor_service = LazyService(ConstructorService)
 
 # Route to retrieve all constructors
 @constructor_bp.route('/all', methods=['GET'])
+@conditional('constructors')
 def find_all_constructors():
     constructors = constructor_service.find_all()
     return jsonify([c.to_dict() for c in constructors]), 200
@@ -3,13 +3,17 @@ from pydantic import ValidationError
 from bson.errors import InvalidId
 from models.driver import DriverModel
 from service.driver_service import DriverService
+from lazy import LazyService
+from versions import conditional
+from serialization import json_response
 
 # Create a Blueprint for driver-related routes
 driver_bp = Blueprint('driver', __name__)
-driver_service = DriverService()
+driver_service = LazyService(DriverService)
 
 # Route to get all drivers
 @driver_bp.route('/all', methods=['GET'])
+@conditional('drivers')
 def find_all_drivers():
     nationality = request.args.get('nationality', type=str)
     sort_alpha = request.args.get('sortAlpha', type=str)
@@ -59,10 +63,46 @@ def find_driver_results(id: int):
             "error": "Invalid year range: from_year must be less than or equal to to_year"
         }), 400
     
-    result = driver_service.find_results(id, year=year, from_year=from_year, to_year=to_year)
-    return jsonify(result.to_dict()), 200
+    result = driver_service.find_results_document(id, year=year, from_year=from_year, to_year=to_year)
+    if result is None:
+        return jsonify({'error': 'Driver not found'}), 404
+    return json_response(result)
+
+# Profilo completo del pilota (risultati, gare, scuderie e circuiti) con i tempi di ogni sezione
+@driver_bp.route('/<id>/profile', methods=['GET'])
+def find_driver_profile(id):
+    profile = driver_service.find_profile(id)
+    if profile:
+        return jsonify(profile), 200
+    return jsonify({'error': 'Driver not found'}), 404
+
+@driver_bp.route('/<id>/career', methods=['GET'])
+def find_driver_career(id):
+    career = driver_service.find_career(id)
+    return jsonify(career), 200
+
+# /leaderboard?metric=wins&limit=10&from_year=2000&to_year=2010
+@driver_bp.route('/leaderboard', methods=['GET'])
+def find_driver_leaderboard():
+    metric = request.args.get('metric', default='points', type=str)
+    limit = request.args.get('limit', default=10, type=int)
+    from_year = request.args.get('from_year', type=int)
+    to_year = request.args.get('to_year', type=int)
+
+    # Validazione: from_year non deve essere maggiore di to_year
+    if from_year is not None and to_year is not None and from_year > to_year:
+        return jsonify({
+            "error": "Invalid year range: from_year must be less than or equal to to_year"
+        }), 400
+
+    try:
+        leaderboard = driver_service.find_leaderboard(metric, limit=limit, from_year=from_year, to_year=to_year)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(leaderboard), 200
 
 @driver_bp.route('/find_nationalities', methods=['GET'])
+@conditional('drivers')
 def find_driver_nationalities():
     result = driver_service.find_all_nationalities()
     return jsonify(result), 200   
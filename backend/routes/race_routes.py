@@ -2,11 +2,12 @@ from flask import Blueprint, jsonify, request
 from pydantic import ValidationError
 from bson.errors import InvalidId
 from service.race_service import RaceService
+from lazy import LazyService
 from models.race import RaceModel
 
 # Create a Blueprint for the 'race' endpoint
 race_bp = Blueprint('race', __name__)
-race_service = RaceService()  # Initialize the RaceService instance
+race_service = LazyService(RaceService)
 
 # Route to get all races
 @race_bp.route('/all', methods=['GET'])
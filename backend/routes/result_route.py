@@ -1,18 +1,44 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 from pydantic import ValidationError
 from bson.errors import InvalidId
-from service.result_service import ResultService
+from service.result_service import ResultService, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from lazy import LazyService
 from models.result import ResultModel
+from serialization import dumps, json_response
 
 # Create a Blueprint for the 'result' endpoint
 result_bp = Blueprint('result', __name__)
-result_service = ResultService()
+result_service = LazyService(ResultService)
 
 # Route to get all results
+# /all                          Tutti i risultati in un'unica risposta JSON
+# /all?limit=100&after=500      Pagina di risultati con _id > 500 (keyset pagination)
+# /all?format=ndjson            Stream di un documento per riga (application/x-ndjson)
 @result_bp.route('/all', methods=['GET'])
 def find_all_results():
-    results = result_service.find_all()
-    return jsonify({'results': [r.to_dict() for r in results]}), 200
+    after = request.args.get('after', type=int)
+    limit = request.args.get('limit', type=int)
+    if after is None and 'after' in request.args:
+        # Cursore non numerico: senza questo controllo verrebbe ignorato, restituendo tutti i risultati
+        return jsonify({'error': 'Invalid cursor'}), 400
+
+    wants_ndjson = (
+        request.args.get('format') == 'ndjson'
+        or request.accept_mimetypes.best == 'application/x-ndjson'
+    )
+    if wants_ndjson:
+        def generate():
+            for doc in result_service.iter_raw(after=after, limit=limit):
+                yield dumps(doc) + b'\n'
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson'), 200
+
+    if after is not None or limit is not None:
+        page_size = max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+        results = result_service.find_page_documents(after=after, limit=page_size)
+        next_after = results[-1]['_id'] if len(results) == page_size else None
+        return json_response({'results': results, 'next_after': next_after})
+
+    return json_response({'results': result_service.find_all_documents()})
 
 # Route to find a result by its ID
 @result_bp.route('/<id>', methods=['GET'])
@@ -65,7 +91,11 @@ def save_results_batch():
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
-    inserted_ids = result_service.save_many(results)
+    try:
+        inserted_ids = result_service.save_many(results)
+    except ValueError as e:
+        # Controlli di unicità e id da aggiornare inesistenti
+        return jsonify({'error': str(e)}), 400
     return jsonify({'message': 'Batch insert successful', 'inserted_ids': inserted_ids}), 201
 
 # Route to get race standings by race ID
@@ -2,11 +2,13 @@ from flask import Blueprint, jsonify, request
 from pydantic import ValidationError
 from bson.errors import InvalidId
 from service.season_service import SeasonService
+from lazy import LazyService
 from models.season import SeasonModel
+from versions import conditional
 
 # Create a Blueprint for the 'season' endpoint
 season_bp = Blueprint('season', __name__)
-season_service = SeasonService()
+season_service = LazyService(SeasonService)
 
 # Route to find all seasons
 
@@ -16,6 +18,7 @@ season_service = SeasonService()
 # /seasons?from_year=2020	Stagioni dal 2020 in poi
 # /seasons?to_year=2020	Stagioni fino 2020 
 @season_bp.route('', methods=['GET'])
+@conditional('races')
 def find_seasons():
     year = request.args.get('year', type=int)
     from_year = request.args.get('from_year', type=int)
@@ -34,12 +37,21 @@ def find_seasons():
     return jsonify([s.to_dict() for s in seasons]), 200
 
 @season_bp.route('/standing', methods=['GET'])
+@conditional('results', 'races', 'drivers', 'constructors')
 def find_driver_standing():
     year = request.args.get('year', type=int)
     standing = season_service.find_driver_standing(year=year)
     return jsonify(standing), 200
 
+@season_bp.route('/constructor-standing', methods=['GET'])
+@conditional('results', 'races', 'constructors')
+def find_constructor_standing():
+    year = request.args.get('year', type=int)
+    standing = season_service.find_constructor_standing(year=year)
+    return jsonify(standing), 200
+
 @season_bp.route('/<year>', methods=['GET'])
+@conditional('races', 'results', 'drivers', 'constructors', 'circuits')
 def find_season(year):
     season = season_service.find_season(year=int(year))
     if season:
@@ -0,0 +1,68 @@
+"""
+Benchmark della pagina stagione: round trip verso MongoDB e latenza di SeasonService.find_season
+al crescere del numero di gare. Con il calendario costruito da una query per le gare e una
+per i vincitori (nomi dalla cache dimensionale) entrambi devono restare costanti.
+
+Per ogni numero di gare presente nel database viene scelta la stagione più recente che lo ha;
+la cache dei service è disattivata, la cache dimensionale viene caricata prima delle misure.
+Uso (dalla cartella backend, con MongoDB in esecuzione):
+    python season_bench.py
+    python season_bench.py --repeat 50 --years 1950 1980 2010 2021
+"""
+import os
+
+# Prima di importare config: ogni chiamata deve arrivare a MongoDB
+os.environ['CACHE_MAX_ENTRIES'] = '0'
+
+import argparse
+import statistics
+import time
+from database import Database
+from dimension_cache import DimensionCache
+from metrics import mongo_duration
+from service.season_service import SeasonService
+
+
+def seasons_by_rounds() -> list:
+    """The latest season for every distinct number of rounds, ordered by rounds."""
+    pipeline = [
+        {'$group': {'_id': '$year', 'rounds': {'$sum': 1}}},
+        {'$sort': {'_id': -1}},
+        {'$group': {'_id': '$rounds', 'year': {'$first': '$_id'}}},
+        {'$sort': {'_id': 1}},
+    ]
+    return [row['year'] for row in Database().get_collection('races').aggregate(pipeline)]
+
+
+def measure(season_service: SeasonService, year: int, repeat: int) -> tuple:
+    """Return (rounds, round trips per call, median ms, p95 ms) of find_season(year)."""
+    season = season_service.find_season(year)  # riscaldamento
+    timings = []
+    round_trips = mongo_duration.total()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        season_service.find_season(year)
+        timings.append((time.perf_counter() - start) * 1000)
+    round_trips = (mongo_duration.total() - round_trips) / repeat
+    timings.sort()
+    return len(season.races) if season else 0, round_trips, statistics.median(timings), timings[int(len(timings) * 0.95)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Round trip e latenza di find_season per numero di gare")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--years', type=int, nargs='+', help="stagioni da misurare (default: una per numero di gare)")
+    args = parser.parse_args()
+
+    for collection_name in DimensionCache.COLLECTIONS:
+        DimensionCache().get_all(collection_name)
+    season_service = SeasonService()
+
+    print(f"find_season, {args.repeat} chiamate per stagione")
+    for year in args.years or seasons_by_rounds():
+        rounds, round_trips, median, p95 = measure(season_service, year, args.repeat)
+        print(f"  {year}  gare {rounds:>3}  round trip {round_trips:>5.1f}  mediana {median:>7.2f} ms  p95 {p95:>7.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Serializzazione JSON veloce per i percorsi di sola lettura.
+
+I documenti letti da MongoDB sono già validi: invece di ricostruire i modelli Pydantic
+(validazione + model_dump) e passare da jsonify, le route di lettura proiettano i campi
+del modello direttamente dalla query e li codificano con orjson (opzionale: se manca si usa json).
+Le date restano nel formato RFC 822 prodotto finora da jsonify.
+Il confronto del costo CPU tra i due percorsi è in serialization_bench.py.
+"""
+import json
+from datetime import date, datetime
+from typing import Optional
+from flask import current_app
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:  # dipendenza opzionale
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return http_date(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(payload, default=_default, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+def json_response(payload, status: int = 200):
+    """Drop-in replacement for jsonify(payload), status on the read paths."""
+    return current_app.response_class(dumps(payload), status=status, mimetype='application/json')
+
+
+def projection(model) -> dict:
+    """Mongo projection of the fields of a Pydantic model (by alias, so 'id' becomes '_id')."""
+    return {(field.alias or name): 1 for name, field in model.model_fields.items()}
+
+
+def compact(doc: Optional[dict]) -> Optional[dict]:
+    """Drop None values, as to_dict() does with exclude_none."""
+    if doc is None:
+        return None
+    return {key: value for key, value in doc.items() if value is not None}
+
+
+def parse_date(value):
+    """Dates loaded from the CSV are strings: parse them as Pydantic would for a datetime field."""
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    return value
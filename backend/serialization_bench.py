@@ -0,0 +1,60 @@
+"""
+Benchmark della serializzazione delle letture: costo CPU per richiesta del percorso con i modelli
+Pydantic e jsonify rispetto a quello con i campi proiettati dalla query e orjson (serialization.py).
+
+Uso (dalla cartella backend, con MongoDB in esecuzione):
+    python serialization_bench.py
+    python serialization_bench.py --repeat 50
+"""
+import argparse
+import time
+from flask import jsonify
+from app import create_app
+from models.result import ResultModel
+from serialization import json_response
+from service.driver_service import DriverService
+from service.result_service import ResultService
+
+
+def benchmark(repeat: int) -> None:
+    """CPU time per request of the model/jsonify path and of the projected/fast path."""
+    app = create_app()
+    result_service = ResultService()
+    driver_service = DriverService()
+    sample = result_service.collection.find_one({}, {'driverId': 1})
+    driver_id = sample['driverId'] if sample else 1
+
+    cases = [
+        ('/api/result/all',
+         lambda: jsonify({'results': [ResultModel(**doc).to_dict() for doc in result_service.collection.find()]}),
+         lambda: json_response({'results': result_service.find_all_documents()})),
+        (f'/api/driver/find_results/{driver_id}',
+         lambda: jsonify(driver_service.find_results(driver_id).to_dict()),
+         lambda: json_response(driver_service.find_results_document(driver_id))),
+    ]
+    with app.test_request_context():
+        for url, model_path, fast_path in cases:
+            timings = {}
+            for label, build in (('model', model_path), ('fast', fast_path)):
+                build()  # riscaldamento
+                start = time.process_time()
+                for _ in range(repeat):
+                    build().get_data()
+                timings[label] = (time.process_time() - start) * 1000 / repeat
+            saved = timings['model'] - timings['fast']
+            print(
+                f"  {url:<34} model {timings['model']:>8.2f} ms  fast {timings['fast']:>8.2f} ms  "
+                f"risparmio {saved:>7.2f} ms/richiesta ({saved / timings['model'] * 100:.0f}%)"
+            )
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Costo CPU per richiesta dei percorsi model/jsonify e proiettato/orjson")
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    benchmark(args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,26 @@
 from typing import Optional, List, Union
 from database import Database
+from dimension_cache import DimensionCache
+from cache import memoize
+from service.counter_service import CounterService
 from models.circuit import CircuitModel
 from models.result import ResultModel
 from pymongo import ASCENDING, DESCENDING
+from metrics import instrumented
 
 
+@instrumented
 class CircuitService:
     def __init__(self):
         self.collection = Database().get_collection('circuits')
+        self.counter_service = CounterService()
 
     def find_by_id(self, _id: int) -> Optional[CircuitModel]:
         """Retrieve a driver by ID."""
         driver_data = self.collection.find_one({'_id': int(_id)})
         return CircuitModel(**driver_data) if driver_data else None
 
+    @memoize('circuits')
     def find_all(self, country = None, sort_alpha = None) -> List[CircuitModel]:
         """Retrieve all circuits."""
         query = {}
@@ -39,58 +46,12 @@ class CircuitService:
 
     def _get_next_id(self) -> int:
         """Get the next available driver ID."""
-        last_doc = self.collection.find_one(sort=[("_id", -1)])
-        return last_doc['_id'] + 1 if last_doc else 1
+        return self.counter_service.next_id('circuits')
     
     def find_by_driverId(self, driver_id) -> List[CircuitModel]:
         """Retrieve all circuits where a given driver has raced."""
-        results_collection = Database().get_collection('results')
-
-        pipeline = [
-            {
-                '$match': {
-                    'driverId': int(driver_id)
-                }
-            },
-            {
-                '$lookup': {
-                    'from': 'races',
-                    'localField': 'raceId',
-                    'foreignField': '_id',
-                    'as': 'race'
-                }
-            },
-            {
-                '$unwind': '$race'
-            },
-            {
-                '$lookup': {
-                    'from': 'circuits',
-                    'localField': 'race.circuitId',
-                    'foreignField': '_id',
-                    'as': 'circuit'
-                }
-            },
-            {
-                '$unwind': '$circuit'
-            },
-            {
-                '$replaceRoot': {
-                    'newRoot': '$circuit'
-                }
-            },
-            {
-                '$group': {
-                    '_id': '$_id',
-                    'doc': {'$first': '$$ROOT'}
-                }
-            },
-            {
-                '$replaceRoot': {
-                    'newRoot': '$doc'
-                }
-            }
-        ]
-
-        circuits_cursor = results_collection.aggregate(pipeline)
-        return [CircuitModel(**data) for data in circuits_cursor]
\ No newline at end of file
+        # circuitId denormalizzato sui risultati: basta l'indice di partecipazione, nomi dalla cache
+        results_collection = Database().get_secondary_collection('results')
+        circuit_ids = results_collection.distinct('circuitId', {'driverId': int(driver_id)})
+        circuits = DimensionCache().get_all('circuits')
+        return [CircuitModel(**circuits[_id]) for _id in circuit_ids if _id in circuits]
@@ -0,0 +1,47 @@
+from pymongo import ReturnDocument
+from database import Database
+from metrics import instrumented
+
+
+@instrumented
+class CounterService:
+    """
+    Allocatore atomico degli _id numerici, condiviso da tutti i service.
+    Ogni collezione ha un documento in 'counters' ({_id: <collezione>, seq: <ultimo id>})
+    incrementato con find_one_and_update + $inc, quindi sicuro con più writer concorrenti.
+    """
+
+    # Collezioni il cui contatore è già stato allineato al massimo _id esistente
+    _seeded = set()
+
+    def __init__(self):
+        self.collection = Database().get_collection('counters')
+
+    def _seed(self, collection_name: str) -> None:
+        """Align the counter with the highest existing _id (idempotent thanks to $max)."""
+        if collection_name in self._seeded:
+            return
+        last_doc = Database().get_collection(collection_name).find_one(sort=[("_id", -1)], projection={"_id": 1})
+        self.collection.update_one(
+            {'_id': collection_name},
+            {'$max': {'seq': last_doc['_id'] if last_doc else 0}},
+            upsert=True
+        )
+        self._seeded.add(collection_name)
+
+    def reserve(self, collection_name: str, count: int = 1) -> int:
+        """Reserve a contiguous block of `count` ids in one round trip and return the first one."""
+        if count < 1:
+            raise ValueError("count must be a positive integer")
+        self._seed(collection_name)
+        counter = self.collection.find_one_and_update(
+            {'_id': collection_name},
+            {'$inc': {'seq': count}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return counter['seq'] - count + 1
+
+    def next_id(self, collection_name: str) -> int:
+        """Allocate a single id."""
+        return self.reserve(collection_name, 1)
@@ -1,14 +1,55 @@
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List, Union
 from database import Database
+from dimension_cache import DimensionCache
+from service.counter_service import CounterService
 from models.driver import DriverModel
 from models.result import ResultModel
+from service.standing_service import StandingService
+from service.race_service import RaceService
+from service.constructor_service import ConstructorService
+from service.circuit_service import CircuitService
+from lazy import LazyService
 from pymongo import ASCENDING, DESCENDING
+from analytics import AnalyticsEngine, LEADERBOARD_METRICS
+from cache import memoize, invalidate
+from serialization import projection, compact, parse_date
+from service.result_service import RESULT_FIELDS
+import versions
+from metrics import instrumented
 
+DRIVER_FIELDS = {field: 1 for field in projection(DriverModel) if field != 'results'}
+MAX_LEADERBOARD_SIZE = 100
 
+# Pool condiviso per le sezioni del profilo pilota, eseguite in parallelo
+_profile_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='driver-profile')
+# Service delle altre sezioni del profilo: creati al primo uso e condivisi da tutte le richieste
+_race_service = LazyService(RaceService)
+_constructor_service = LazyService(ConstructorService)
+_circuit_service = LazyService(CircuitService)
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    value = fn(*args)
+    return value, round((time.perf_counter() - start) * 1000, 2)
+
+
+def _submit_timed(fn, *args):
+    """Run _timed(fn, *args) on the profile pool in a copy of the caller's context (metrics labels included)."""
+    return _profile_executor.submit(contextvars.copy_context().run, _timed, fn, *args)
+
+
+@instrumented
 class DriverService:
     def __init__(self):
         self.collection = Database().get_collection('drivers')
+        self.counter_service = CounterService()
         self.results_collection = Database().get_collection('results')
+        self.secondary_results_collection = Database().get_secondary_collection('results')
+        self.standing_service = StandingService()
 
     def save(self, driver: DriverModel) -> Union[int, None]:
         """Save or update a driver in the database."""
@@ -22,10 +63,16 @@ class DriverService:
         }
         if driver.id:
             result = self.collection.update_one({'_id': driver.id}, {'$set': driver_data})
+            DimensionCache().invalidate('drivers')
+            invalidate('drivers')
+            versions.bump('drivers')
             return result.modified_count
         else:
             driver_data['_id'] = self._get_next_id()
             result = self.collection.insert_one(driver_data)
+            DimensionCache().invalidate('drivers')
+            invalidate('drivers')
+            versions.bump('drivers')
             return result.inserted_id
 
     def find_by_id(self, _id: int) -> Optional[DriverModel]:
@@ -33,6 +80,7 @@ class DriverService:
         driver_data = self.collection.find_one({'_id': int(_id)})
         return DriverModel(**driver_data) if driver_data else None
 
+    @memoize('drivers')
     def find_all(self, nationality = None, sort_alpha = None) -> List[DriverModel]:
         """Retrieve all drivers."""
         query = {}
@@ -53,8 +101,13 @@ class DriverService:
         try:
             result = self.collection.delete_one({'_id': int(_id)})
             if result.deleted_count > 0:
+                DimensionCache().invalidate('drivers')
+                invalidate('drivers')
+                versions.bump('drivers')
                 # Cancella anche tutti i risultati associati
+                driver_results = list(self.results_collection.find({'driverId': int(_id)}))
                 self.results_collection.delete_many({'driverId': int(_id)})
+                self.standing_service.apply_results(driver_results, sign=-1)
                 return True
             return False
         except Exception:
@@ -74,82 +127,195 @@ class DriverService:
 
     def _get_next_id(self) -> int:
         """Get the next available driver ID."""
-        last_doc = self.collection.find_one(sort=[("_id", -1)])
-        return last_doc['_id'] + 1 if last_doc else 1
+        return self.counter_service.next_id('drivers')
 
     def find_results(self, id: int, year: Optional[int] = None, from_year: Optional[int] = None, to_year: Optional[int] = None) -> Optional[DriverModel]:
         """Retrieve race results for a driver, optionally filtered by year or range of years."""
-        pipeline = [
-            { "$match": { "_id": int(id) } },
-            {
-                "$lookup": {
-                    "from": "results",
-                    "localField": "_id",
-                    "foreignField": "driverId",
-                    "as": "race_results"
-                }
-            },
-            { "$unwind": "$race_results" },
-            {
-                "$lookup": {
-                    "from": "races",
-                    "localField": "race_results.raceId",
-                    "foreignField": "_id",
-                    "as": "race_info"
-                }
-            },
-            { "$unwind": "$race_info" }
-        ]
-
-        # Apply year filters
-        if year is not None:
-            pipeline.append({
-                "$match": {
-                    "$expr": { "$eq": ["$race_info.year", year] }
-                }
-            })
-        else:
-            conditions = []
-            if from_year is not None:
-                conditions.append({ "$gte": ["$race_info.year", from_year] })
-            if to_year is not None:
-                conditions.append({ "$lte": ["$race_info.year", to_year] })
-            if conditions:
-                pipeline.append({
-                    "$match": {
-                        "$expr": { "$and": conditions }
-                    }
-                })
-
-        # Group back driver and results
-        pipeline.append({
-            "$group": {
-                "_id": "$_id",
-                "forename": { "$first": "$forename" },
-                "surname": { "$first": "$surname" },
-                "dob": { "$first": "$dob" },
-                "nationality": { "$first": "$nationality" },
-                "url": { "$first": "$url" },
-                "race_results": { "$push": "$race_results" }
-            }
-        })
-
-        # Execute aggregation pipeline
-        result_cursor = self.collection.aggregate(pipeline)
-        result_list = list(result_cursor)
-
-        if not result_list:
-            result_list = []
+        query = self._results_query(id, year, from_year, to_year)
 
         # Construct DriverModel with results
         driver = self.find_by_id(id)
-        if result_list.__len__() > 0:
-            for r in result_list[0].get("race_results", []):
+        if driver:
+            for r in self.secondary_results_collection.find(query):
                 driver.results.append(ResultModel(**r))
 
         return driver
+
+    @staticmethod
+    def _results_query(id: int, year: Optional[int], from_year: Optional[int], to_year: Optional[int]) -> dict:
+        # year è denormalizzato sui risultati: range scan sull'indice (driverId, year), senza $lookup
+        query = {"driverId": int(id)}
+        if year is not None:
+            query["year"] = year
+        elif from_year is not None or to_year is not None:
+            query["year"] = {}
+            if from_year is not None:
+                query["year"]["$gte"] = from_year
+            if to_year is not None:
+                query["year"]["$lte"] = to_year
+        return query
     
+    def find_results_document(self, id: int, year: Optional[int] = None, from_year: Optional[int] = None,
+                              to_year: Optional[int] = None) -> Optional[dict]:
+        """Read path of find_results: the same payload as find_results(...).to_dict(), built from projected documents."""
+        driver = compact(self.collection.find_one({'_id': int(id)}, DRIVER_FIELDS))
+        if driver is None:
+            return None
+        if 'dob' in driver:
+            driver['dob'] = parse_date(driver['dob'])
+        query = self._results_query(id, year, from_year, to_year)
+        driver['results'] = [compact(r) for r in self.secondary_results_collection.find(query, RESULT_FIELDS)]
+        return driver
+
+    @memoize('drivers')
     def find_all_nationalities(self) -> List[str]:
         """Retrieve all distinct nationalities of drivers."""
         return self.collection.distinct('nationality')
 
+    def find_profile(self, id: int) -> Optional[dict]:
+        """
+        Retrieve everything the driver page needs in one call: results, races, constructors and circuits.
+        The four sections run concurrently; `timings` reports the milliseconds spent on each.
+        """
+        start = time.perf_counter()
+        futures = {
+            'driver': _submit_timed(self.find_results, id),
+            'races': _submit_timed(_race_service.find_all_races_by_driverId, id),
+            'constructors': _submit_timed(_constructor_service.find_constructors_by_driverId, id),
+            'circuits': _submit_timed(_circuit_service.find_by_driverId, id),
+        }
+        sections = {name: future.result() for name, future in futures.items()}
+
+        driver, _ = sections['driver']
+        if driver is None:
+            return None
+
+        timings = {name: elapsed for name, (_, elapsed) in sections.items()}
+        timings['total'] = round((time.perf_counter() - start) * 1000, 2)
+
+        return {
+            'driver': driver.to_dict(),
+            'races': [r.to_dict() for r in sections['races'][0]],
+            'constructors': [c.to_dict() for c in sections['constructors'][0]],
+            'circuits': [c.to_dict() for c in sections['circuits'][0]],
+            'timings': timings
+        }
+
+    @memoize('results')
+    def find_career(self, id: int) -> dict:
+        """Career totals of a driver: races, wins, podiums, points, poles, best finish and seasons."""
+        if AnalyticsEngine().enabled('driver_career'):
+            return AnalyticsEngine().driver_career(int(id))
+        return self._mongo_career(int(id))
+
+    def _mongo_career(self, driver_id: int) -> dict:
+        totals = next(self.results_collection.aggregate(self.career_pipeline(driver_id)), None)
+        return self.career_row(driver_id, totals)
+
+    @staticmethod
+    def career_pipeline(driver_id: int) -> list:
+        """Aggregation of the career totals of a driver (shared with the async service)."""
+        return [
+            {"$match": {"driverId": driver_id}},
+            {
+                "$group": {
+                    "_id": None,
+                    "races": {"$sum": 1},
+                    "wins": {"$sum": {"$cond": [{"$eq": ["$positionText", "1"]}, 1, 0]}},
+                    "podiums": {"$sum": {"$cond": [{"$in": ["$positionText", ["1", "2", "3"]]}, 1, 0]}},
+                    "points": {"$sum": "$points"},
+                    "poles": {"$sum": {"$cond": [{"$eq": ["$grid", 1]}, 1, 0]}},
+                    "bestFinish": {"$min": "$positionOrder"},
+                    "seasons": {"$addToSet": "$year"}
+                }
+            }
+        ]
+
+    @staticmethod
+    def career_row(driver_id: int, totals: Optional[dict]) -> dict:
+        """Career payload from the output of career_pipeline (None when the driver has no results)."""
+        if not totals:
+            return {"driverId": driver_id, "races": 0, "wins": 0, "podiums": 0, "points": 0.0,
+                    "poles": 0, "bestFinish": None, "seasons": 0}
+        return {
+            "driverId": driver_id,
+            "races": totals["races"],
+            "wins": totals["wins"],
+            "podiums": totals["podiums"],
+            "points": float(totals["points"]),
+            "poles": totals["poles"],
+            "bestFinish": totals["bestFinish"],
+            "seasons": len(totals["seasons"])
+        }
+
+    @memoize('results', 'drivers')
+    def find_leaderboard(self, metric: str = 'points', limit: int = 10,
+                         from_year: Optional[int] = None, to_year: Optional[int] = None) -> List[dict]:
+        """Top drivers by a career metric (points, wins, podiums, races, poles), optionally within a range of seasons."""
+        limit = self.leaderboard_limit(metric, limit)
+
+        if AnalyticsEngine().enabled('driver_leaderboard'):
+            rows = AnalyticsEngine().driver_leaderboard(metric, limit, from_year, to_year)
+        else:
+            rows = self._mongo_leaderboard(metric, limit, from_year, to_year)
+        return self.add_driver_names(rows, DimensionCache().get_all('drivers'))
+
+    def _mongo_leaderboard(self, metric: str, limit: int,
+                           from_year: Optional[int] = None, to_year: Optional[int] = None) -> List[dict]:
+        return list(self.results_collection.aggregate(self.leaderboard_pipeline(metric, limit, from_year, to_year)))
+
+    @staticmethod
+    def leaderboard_limit(metric: str, limit: int) -> int:
+        """Validate the metric and clamp the limit to 1..MAX_LEADERBOARD_SIZE."""
+        if metric not in LEADERBOARD_METRICS:
+            raise ValueError(f"Invalid metric: must be one of {', '.join(LEADERBOARD_METRICS)}")
+        return max(1, min(int(limit), MAX_LEADERBOARD_SIZE))
+
+    @staticmethod
+    def add_driver_names(rows: List[dict], drivers: dict) -> List[dict]:
+        """Add forename and surname to leaderboard rows."""
+        for row in rows:
+            driver = drivers.get(row['driverId'])
+            row['forename'] = driver['forename'] if driver else None
+            row['surname'] = driver['surname'] if driver else None
+        return rows
+
+    @staticmethod
+    def leaderboard_pipeline(metric: str, limit: int,
+                             from_year: Optional[int] = None, to_year: Optional[int] = None) -> list:
+        """Aggregation of the top drivers by a metric (shared with the async service)."""
+        pipeline = []
+        if from_year is not None or to_year is not None:
+            year_filter = {}
+            if from_year is not None:
+                year_filter["$gte"] = from_year
+            if to_year is not None:
+                year_filter["$lte"] = to_year
+            pipeline.append({"$match": {"year": year_filter}})
+
+        pipeline.extend([
+            {
+                "$group": {
+                    "_id": "$driverId",
+                    "races": {"$sum": 1},
+                    "wins": {"$sum": {"$cond": [{"$eq": ["$positionText", "1"]}, 1, 0]}},
+                    "podiums": {"$sum": {"$cond": [{"$in": ["$positionText", ["1", "2", "3"]]}, 1, 0]}},
+                    "points": {"$sum": "$points"},
+                    "poles": {"$sum": {"$cond": [{"$eq": ["$grid", 1]}, 1, 0]}}
+                }
+            },
+            {"$sort": {metric: -1, "_id": 1}},
+            {"$limit": int(limit)},
+            {
+                "$project": {
+                    "_id": 0,
+                    "driverId": "$_id",
+                    "races": 1,
+                    "wins": 1,
+                    "podiums": 1,
+                    "points": 1,
+                    "poles": 1
+                }
+            }
+        ])
+        return pipeline
@@ -1,11 +1,19 @@
 from typing import Optional, List, Union
 from database import Database
+from service.counter_service import CounterService
 from models.race import RaceModel
+from service.standing_service import StandingService
+from cache import invalidate
+import versions
+from metrics import instrumented
 
 
+@instrumented
 class RaceService:
     def __init__(self):
         self.collection = Database().get_collection('races')
+        self.counter_service = CounterService()
+        self.standing_service = StandingService()
 
     def save(self, race: RaceModel) -> Union[int, None]:
         """Salva o aggiorna un costruttore nel database."""
@@ -19,14 +27,29 @@ class RaceService:
         }
         print(race)
         if race.id:
+            old_data = self.collection.find_one({'_id': race.id}, {'year': 1})
             result = self.collection.update_one(
                 {'_id': race.id},
                 {'$set': race_data}
             )
+            # Propaga i campi denormalizzati sui risultati della gara
+            Database().get_collection('results').update_many(
+                {'raceId': race.id},
+                {'$set': {'year': race.year, 'round': race.round, 'circuitId': race.circuitId}}
+            )
+            # Spostare una gara di stagione cambia la classifica di entrambi gli anni
+            if old_data and old_data.get('year') != race.year:
+                self.standing_service.rebuild(old_data['year'])
+                self.standing_service.rebuild(race.year)
+                invalidate('races', old_data['year'])
+            invalidate('races', race.year)
+            versions.bump('races', 'results', years={race.year, (old_data or {}).get('year', race.year)})
             return result.modified_count
         else:
             race_data['_id'] = self._get_next_id()
             result = self.collection.insert_one(race_data)
+            invalidate('races', race.year)
+            versions.bump('races', years=[race.year])
             return result.inserted_id
 
     def find_by_id(self, _id: int) -> Optional[RaceModel]:
@@ -38,11 +61,15 @@ class RaceService:
 
     def delete_by_id(self, _id: int) -> bool:
         try:
-            result = self.collection.delete_one({'_id': int(_id)})
-            if result.deleted_count > 0:
+            race = self.collection.find_one_and_delete({'_id': int(_id)})
+            if race:
                 # Elimina tutti i risultati associati
                 results_collection = Database().get_collection('results')
+                race_results = list(results_collection.find({'raceId': int(_id)}))
                 results_collection.delete_many({'raceId': int(_id)})
+                self.standing_service.apply_results(race_results, sign=-1, race_years={race['_id']: race['year']})
+                invalidate('races', race['year'])
+                versions.bump('races', years=[race['year']])
                 return True
             return False
         except Exception:
@@ -58,42 +85,12 @@ class RaceService:
         return self.collection.count_documents({})
 
     def _get_next_id(self) -> int:
-        last_doc = self.collection.find_one(sort=[("_id", -1)])
-        return last_doc['_id'] + 1 if last_doc else 1    
+        return self.counter_service.next_id('races')    
 
     def find_all_races_by_driverId(self, driver_id: int) -> List[RaceModel]:
-        pipeline = [
-                        {
-                            "$lookup": {
-                                "from": "results",
-                                "let": {"race_id": "$_id"},
-                                "pipeline": [
-                                    {
-                                        "$match": {
-                                            "$expr": {
-                                                "$and": [
-                                                    {"$eq": ["$raceId", "$$race_id"]},
-                                                    {"$eq": ["$driverId", int(driver_id)]}
-                                                ]
-                                            }
-                                        }
-                                    }
-                                ],
-                                "as": "filtered_results"
-                            }
-                        },
-                        {
-                            "$match": {
-                                "filtered_results.0": {"$exists": True}
-                            }
-                        },
-                        {
-                            "$project": {
-                                "filtered_results": 0  # Esclude il campo results filtrato
-                            }
-                        }
-                    ]
-
-        races = list(self.collection.aggregate(pipeline))
+        # raceId letti dall'indice di partecipazione su 'results' (query coperta, handle secondario
+        # come per circuiti e scuderie del pilota), poi lookup per _id
+        results_collection = Database().get_secondary_collection('results')
+        race_ids = results_collection.distinct('raceId', {'driverId': int(driver_id)})
+        races = self.collection.find({'_id': {'$in': race_ids}})
         return [RaceModel(**race) for race in races]
-
@@ -1,16 +1,25 @@
-from typing import Optional, List, Union
+from typing import Iterator, Optional, List, Union
+from pymongo import InsertOne, UpdateOne
 from database import Database
+from dimension_cache import DimensionCache
+from service.counter_service import CounterService
 from models.result import ResultModel
+from service.standing_service import StandingService
+from serialization import projection, compact
+from metrics import instrumented
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_BATCH_SIZE = 1000
+# Solo i campi del modello: esclude year, round e circuitId denormalizzati
+RESULT_FIELDS = projection(ResultModel)
 
+@instrumented
 class ResultService:
     def __init__(self):
         self.collection = Database().get_collection('results')
-        # Indici per performance e controlli
-        self.collection.create_index([("driverId", 1)])
-        self.collection.create_index([("raceId", 1), ("grid", 1)], unique=False)
-        self.collection.create_index([("raceId", 1), ("positionOrder", 1)], unique=False)
-        self.collection.create_index([("raceId", 1), ("driverId", 1)], unique=False)
+        self.counter_service = CounterService()
+        self.standing_service = StandingService()
 
     def _check_unique_positions(
         self,
@@ -54,17 +63,8 @@ class ResultService:
 
     def save(self, result: ResultModel) -> Union[int, None]:
         """Salva o aggiorna un risultato nel database, con controlli di unicità su grid, positionOrder e driver."""
-        result_data = {
-            "raceId": result.raceId,
-            "driverId": result.driverId,
-            "constructorId": result.constructorId,
-            "grid": result.grid,
-            "positionText": result.positionText,
-            "positionOrder": result.positionOrder,
-            "points": result.points,
-            "laps": result.laps,
-            "statusId": result.statusId
-        }
+        result_data = self._to_document(result)
+        result_data.update(self._race_fields([result.raceId]).get(result.raceId, {}))
 
         exclude_id = result.id if result.id else None
         # Controlli unicità
@@ -72,25 +72,53 @@ class ResultService:
         self._check_unique_driver(result.raceId, result.driverId, exclude_id=exclude_id)
 
         if result.id:
+            old_data = self.collection.find_one({'_id': result.id})
             res = self.collection.update_one({'_id': result.id}, {'$set': result_data})
+            if old_data:
+                self.standing_service.replace_results([old_data], [result_data])
             return res.modified_count
         else:
             next_id = self._get_next_id()
             result_data['_id'] = next_id
             res = self.collection.insert_one(result_data)
+            self.standing_service.apply_results([result_data])
             return res.inserted_id
 
     def find_by_id(self, _id: int) -> Optional[ResultModel]:
         data = self.collection.find_one({'_id': int(_id)})
         return ResultModel(**data) if data else None
 
-    def find_all(self) -> List[ResultModel]:
-        return [ResultModel(**data) for data in self.collection.find()]
+    def find_all_documents(self) -> List[dict]:
+        """All results as projected documents ready for JSON, without building models."""
+        return [compact(doc) for doc in self.collection.find({}, RESULT_FIELDS)]
+
+    @staticmethod
+    def after_query(after: Optional[int]) -> dict:
+        """Keyset filter on _id shared by the paginated and streamed reads."""
+        return {'_id': {'$gt': int(after)}} if after is not None else {}
+
+    def find_page_documents(self, after: Optional[int] = None, limit: int = DEFAULT_PAGE_SIZE) -> List[dict]:
+        """Keyset pagination on _id: up to `limit` projected results with _id greater than `after`."""
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        cursor = self.collection.find(self.after_query(after), RESULT_FIELDS).sort('_id', 1).limit(limit)
+        return [compact(doc) for doc in cursor]
+
+    def iter_raw(self, after: Optional[int] = None, limit: Optional[int] = None) -> Iterator[dict]:
+        """Yield projected result documents in _id order straight from the cursor, without building models."""
+        cursor = self.collection.find(self.after_query(after), RESULT_FIELDS)
+        cursor = cursor.sort('_id', 1).batch_size(STREAM_BATCH_SIZE)
+        if limit:
+            cursor = cursor.limit(int(limit))
+        with cursor:
+            for doc in cursor:
+                yield compact(doc)
 
     def delete_by_id(self, _id: int) -> bool:
         try:
-            result = self.collection.delete_one({'_id': int(_id)})
-            return result.deleted_count > 0
+            deleted = self.collection.find_one_and_delete({'_id': int(_id)})
+            if deleted:
+                self.standing_service.apply_results([deleted], sign=-1)
+            return deleted is not None
         except Exception:
             return False
 
@@ -104,27 +132,76 @@ class ResultService:
         return self.collection.count_documents({})
 
     def _get_next_id(self) -> int:
-        last_doc = self.collection.find_one(sort=[("_id", -1)])
-        return last_doc['_id'] + 1 if last_doc else 1
+        return self.counter_service.next_id('results')
 
-    def save_many(self, results: List[ResultModel]) -> List[int]:
-        """Inserisce o aggiorna molti risultati in un batch con controlli di unicità per ciascuna gara."""
-        if not results:
-            return []
+    def _race_fields(self, race_ids: List[int]) -> dict:
+        """
+        Campi della gara denormalizzati su ogni risultato (year, round, circuitId),
+        così le query di carriera filtrano per anno senza $lookup su 'races'.
+        """
+        races = Database().get_collection('races').find(
+            {'_id': {'$in': list(set(race_ids))}},
+            {'year': 1, 'round': 1, 'circuitId': 1}
+        )
+        return {
+            race['_id']: {'year': race.get('year'), 'round': race.get('round'), 'circuitId': race.get('circuitId')}
+            for race in races
+        }
 
-        inserted_or_updated_ids: List[int] = []
-        next_id = self._get_next_id()
+    @staticmethod
+    def _to_document(result: ResultModel) -> dict:
+        return {
+            "raceId": result.raceId,
+            "driverId": result.driverId,
+            "constructorId": result.constructorId,
+            "grid": result.grid,
+            "positionText": result.positionText,
+            "positionOrder": result.positionOrder,
+            "points": result.points,
+            "laps": result.laps,
+            "statusId": result.statusId
+        }
+
+    @staticmethod
+    def _check_batch(results: List[ResultModel], existing: List[dict]) -> None:
+        """
+        Controlli di unicità in memoria per un batch.
+        `existing` sono le righe già salvate per le gare coinvolte e quelle da aggiornare: un
+        aggiornamento di un id che non esiste è rifiutato, le righe aggiornate dal batch vengono
+        ignorate nei controlli perché i loro valori saranno sostituiti.
+        """
+        update_ids = {r.id for r in results if r.id}
+        unknown_ids = update_ids - {row["_id"] for row in existing}
+        if unknown_ids:
+            raise ValueError(f"Results not found: {', '.join(str(_id) for _id in sorted(unknown_ids))}")
+
+        db_info: dict[int, dict[str, set[int]]] = {}
+        for row in existing:
+            if row["_id"] in update_ids:
+                continue
+            info = db_info.setdefault(row["raceId"], {"grids": set(), "positions": set(), "drivers": set()})
+            info["grids"].add(row.get("grid"))
+            info["positions"].add(row.get("positionOrder"))
+            info["drivers"].add(row.get("driverId"))
+
+        empty = {"grids": set(), "positions": set(), "drivers": set()}
         # Map per tenere traccia di grid/position e driver nel batch per ogni gara
         batch_info: dict[int, dict[str, set[int]]] = {}
 
         for result in results:
             race_id = result.raceId
+            stored = db_info.get(race_id, empty)
             info = batch_info.setdefault(race_id, {"grids": set(), "positions": set(), "drivers": set()})
 
-            exclude_id = result.id if result.id else None
-            # Controlli DB
-            self._check_unique_positions(race_id, result.grid, result.positionOrder, exclude_id=exclude_id)
-            self._check_unique_driver(race_id, result.driverId, exclude_id=exclude_id)
+            # Controlli rispetto alle righe già presenti
+            if result.grid in stored["grids"] or result.positionOrder in stored["positions"]:
+                raise ValueError(
+                    f"For race {race_id}, the starting position ({result.grid}) or finishing position ({result.positionOrder}) is already available."
+                )
+            if result.driverId in stored["drivers"]:
+                raise ValueError(
+                    f"For the race {race_id}, driver {result.driverId} still present"
+                )
 
             # Controlli nel batch
             if result.grid in info["grids"] or result.positionOrder in info["positions"]:
@@ -140,51 +217,87 @@ class ResultService:
             info["positions"].add(result.positionOrder)
             info["drivers"].add(result.driverId)
 
-            # Operazione DB
-            result_data = {
-                "raceId": race_id,
-                "driverId": result.driverId,
-                "constructorId": result.constructorId,
-                "grid": result.grid,
-                "positionText": result.positionText,
-                "positionOrder": result.positionOrder,
-                "points": result.points,
-                "laps": result.laps,
-                "statusId": result.statusId
-            }
-
-            if result.id:
-                self.collection.update_one({'_id': result.id}, {'$set': result_data})
-                inserted_or_updated_ids.append(result.id)
-            else:
-                result_data['_id'] = next_id
-                self.collection.insert_one(result_data)
-                inserted_or_updated_ids.append(next_id)
-                next_id += 1
-
-        return inserted_or_updated_ids
+    def save_many(self, results: List[ResultModel]) -> List[int]:
+        """
+        Inserisce o aggiorna molti risultati con un solo bulk_write.
+        I controlli di unicità leggono una volta sola le righe delle gare coinvolte e vengono
+        eseguiti in memoria; con un replica set lettura e scrittura avvengono in una transazione.
+        """
+        if not results:
+            return []
+
+        race_ids = list({r.raceId for r in results})
+        update_ids = [r.id for r in results if r.id]
+        update_id_set = set(update_ids)
+        new_count = len(results) - len(update_ids)
+        race_fields = self._race_fields(race_ids)
+        written: dict = {}
+
+        def write_batch(session=None):
+            # Una query per le righe esistenti delle gare coinvolte e per i valori precedenti degli aggiornamenti
+            existing = list(self.collection.find(
+                {'$or': [{'raceId': {'$in': race_ids}}, {'_id': {'$in': update_ids}}]},
+                session=session
+            ))
+            self._check_batch(results, existing)
+
+            # Riserva in un solo round trip un blocco contiguo di id per i nuovi risultati.
+            # Il contatore resta fuori dalla transazione: un retry lascia solo un buco negli id.
+            next_id = self.counter_service.reserve('results', new_count) if new_count else None
+
+            operations = []
+            ids: List[int] = []
+            new_results: List[dict] = []
+            for result in results:
+                result_data = self._to_document(result)
+                result_data.update(race_fields.get(result.raceId, {}))
+                if result.id:
+                    operations.append(UpdateOne({'_id': result.id}, {'$set': result_data}))
+                    ids.append(result.id)
+                else:
+                    result_data['_id'] = next_id
+                    operations.append(InsertOne(result_data))
+                    ids.append(next_id)
+                    next_id += 1
+                new_results.append(result_data)
+
+            self.collection.bulk_write(operations, ordered=True, session=session)
+
+            written['ids'] = ids
+            written['old'] = [row for row in existing if row['_id'] in update_id_set]
+            written['new'] = new_results
+
+        database = Database()
+        if database.supports_transactions():
+            with database.get_client().start_session() as session:
+                session.with_transaction(write_batch)
+        else:
+            write_batch()
+
+        self.standing_service.replace_results(written['old'], written['new'])
+        return written['ids']
 
     def get_race_standings(self, race_id: int) -> List[dict]:
         results_cursor = self.collection.find({'raceId': int(race_id)}, sort=[('positionOrder', 1)])
-        drivers_collection = Database().get_collection('drivers')
-        constructors_collection = Database().get_collection('constructors')
-
-        standings: List[dict] = []
-        for result_data in results_cursor:
-            driver = drivers_collection.find_one({'_id': result_data['driverId']})
-            constructor = constructors_collection.find_one({'_id': result_data['constructorId']})
-            result = ResultModel(**result_data)
-
-            enriched_result = {
-                "resultId": result.id,
-                "positionOrder": result.positionOrder,
-                "positionText": result.positionText,
-                "points": result.points,
-                "driverId": result.driverId,
-                "driverName": f"{driver['forename']} {driver['surname']}" if driver else "N/D",
-                "constructorId": result.constructorId,
-                "constructorName": constructor['name'] if constructor else "N/D",
-            }
-            standings.append(enriched_result)
-
-        return standings
+        drivers = DimensionCache().get_all('drivers')
+        constructors = DimensionCache().get_all('constructors')
+
+        return [self.standing_row(result_data, drivers, constructors) for result_data in results_cursor]
+
+    @staticmethod
+    def standing_row(result_data: dict, drivers: dict, constructors: dict) -> dict:
+        """One row of a race classification, with driver and constructor names."""
+        driver = drivers.get(result_data['driverId'])
+        constructor = constructors.get(result_data['constructorId'])
+        result = ResultModel(**result_data)
+
+        return {
+            "resultId": result.id,
+            "positionOrder": result.positionOrder,
+            "positionText": result.positionText,
+            "points": result.points,
+            "driverId": result.driverId,
+            "driverName": f"{driver['forename']} {driver['surname']}" if driver else "N/D",
+            "constructorId": result.constructorId,
+            "constructorName": constructor['name'] if constructor else "N/D",
+        }
@@ -1,15 +1,43 @@
-from typing import Optional, List
+from typing import Iterable, Optional, List
 from models.race import RaceModel
 from database import Database
+from dimension_cache import DimensionCache
+from analytics import AnalyticsEngine
+from cache import memoize, invalidate
+import versions
 from models.season import SeasonModel
+from service.standing_service import StandingService
+from metrics import instrumented
 
 
+@instrumented
 class SeasonService:
     def __init__(self):
         self.result_collection = Database().get_collection('results')
         self.race_collection = Database().get_collection('races')
+        self.standing_service = StandingService()
 
+    @memoize('races', year_arg='year')
     def find(self, year: Optional[int] = None, from_year: Optional[int] = None, to_year: Optional[int] = None) -> List[SeasonModel]:
+        pipeline = self.season_pipeline(year, from_year, to_year)
+        results = list(self.race_collection.aggregate(pipeline))
+
+        # Costruisci gli oggetti SeasonModel, ma solo con year e raceCount
+        seasons = []
+        for data in results:
+            season = SeasonModel(
+                year=data["year"],
+                raceCount=data["raceCount"],
+                driverChampion=None,
+                constructorChampion=None,
+                races=[]
+            )
+            seasons.append(season)
+
+        return seasons
+
+    @staticmethod
+    def season_pipeline(year: Optional[int] = None, from_year: Optional[int] = None, to_year: Optional[int] = None) -> list:
         filter = {}
         if year is not None:
             # Priorità: anno specifico
@@ -45,116 +73,71 @@ class SeasonService:
             }
         ])
 
-        results = list(self.race_collection.aggregate(pipeline))
-
-        # Costruisci gli oggetti SeasonModel, ma solo con year e raceCount
-        seasons = []
-        for data in results:
-            season = SeasonModel(
-                year=data["year"],
-                raceCount=data["raceCount"],
-                driverChampion=None,
-                constructorChampion=None,
-                races=[]
-            )
-            seasons.append(season)
-
-        return seasons
+        return pipeline
 
+    @memoize('results', 'races', 'drivers', 'constructors', year_arg='year')
     def find_driver_standing(self, year: int) -> List[dict]:
-        pipeline = [
-            # Join con 'races' per ottenere l'anno
-            {
-                "$lookup": {
-                    "from": "races",
-                    "localField": "raceId",
-                    "foreignField": "_id",
-                    "as": "race"
-                }
-            },
-            {"$unwind": "$race"},
-
-            # Filtro per anno
-            {"$match": {"race.year": year}},
-
-            # Raggruppa per coppia (driverId, constructorId)
-            {
-                "$group": {
-                    "_id": {
-                        "driverId": "$driverId",
-                        "constructorId": "$constructorId"
-                    },
-                    "totalPoints": {"$sum": "$points"},
-                    "racesCount": {"$sum": 1},
-                    "wins": {
-                        "$sum": {
-                            "$cond": [{"$eq": ["$positionText", "1"]}, 1, 0]
-                        }
-                    }
-                }
-            },
-
-            # Join con 'constructors' per ottenere il nome del team
-            {
-                "$lookup": {
-                    "from": "constructors",
-                    "localField": "_id.constructorId",
-                    "foreignField": "_id",
-                    "as": "constructor"
-                }
-            },
-            {"$unwind": "$constructor"},
-
-            # Join con 'drivers' per ottenere nome e cognome
-            {
-                "$lookup": {
-                    "from": "drivers",
-                    "localField": "_id.driverId",
-                    "foreignField": "_id",
-                    "as": "driver"
-                }
-            },
-            {"$unwind": "$driver"},
-
-            # Proiezione finale
-            {
-                "$project": {
-                    "_id": 0,
-                    "driverId": "$_id.driverId",
-                    "forename": "$driver.forename",
-                    "surname": "$driver.surname",
-                    "constructorId": "$_id.constructorId",
-                    "constructorName": "$constructor.name",
-                    "totalPoints": 1,
-                    "racesCount": 1,
-                    "wins": 1
-                }
-            },
-
-            # Ordina per punti decrescenti
-            {"$sort": {"totalPoints": -1}}
-        ]
-
-        return list(self.result_collection.aggregate(pipeline))
-
+        if year is not None and AnalyticsEngine().enabled('driver_standing'):
+            return self.standing_service.enrich_driver_standing(AnalyticsEngine().driver_standing(year))
+        # Lettura indicizzata dalla classifica materializzata 'driver_standings'
+        return self.standing_service.find_driver_standing(year)
+
+    @memoize('results', 'races', 'constructors', year_arg='year')
+    def find_constructor_standing(self, year: int) -> List[dict]:
+        if year is not None and AnalyticsEngine().enabled('constructor_standing'):
+            return self.standing_service.enrich_constructor_standing(AnalyticsEngine().constructor_standing(year))
+        # Riepilogo precalcolato per (year, constructorId) in 'constructor_standings'
+        return self.standing_service.find_constructor_standing(year)
+
+    @memoize('races', 'results', 'drivers', 'constructors', 'circuits', year_arg='year')
     def find_season(self, year: int) -> Optional[SeasonModel]:
         races_data = list(self.race_collection.find({"year": year}))
         if not races_data:
             return []
 
+        race_ids = [race["_id"] for race in races_data]
+
+        # Nomi di circuiti, piloti e scuderie dalla cache dimensionale: nessun round trip aggiuntivo
+        dimensions = DimensionCache()
+        circuits = dimensions.get_all("circuits")
+        drivers = dimensions.get_all("drivers")
+        constructors = dimensions.get_all("constructors")
+        # positionOrder 1 sfrutta l'indice (raceId, positionOrder): una sola chiave letta per gara
+        winners = self.first_winners(self.result_collection.find(
+            self.winners_query(race_ids), {"raceId": 1, "driverId": 1, "constructorId": 1}
+        ).sort("_id", 1))
+
+        return self.build_season(year, races_data, winners, circuits, drivers, constructors)
+
+    @staticmethod
+    def winners_query(race_ids: List[int]) -> dict:
+        """Filter of the winning results of the given races."""
+        return {"raceId": {"$in": race_ids}, "positionOrder": 1, "positionText": "1"}
+
+    @staticmethod
+    def first_winners(rows: Iterable[dict]) -> dict:
+        """
+        raceId -> winning result, keeping the first row in _id order: in the races with a shared
+        drive (780, 784, 828) it is the one the per-race find_one used to return.
+        """
+        winners = {}
+        for row in rows:
+            winners.setdefault(row["raceId"], row)
+        return winners
+
+    @staticmethod
+    def build_season(year: int, races_data: List[dict], winners: dict, circuits: dict,
+                     drivers: dict, constructors: dict) -> SeasonModel:
+        """Season with its races, each enriched with circuit name, winner and team."""
         enriched_races = []
         for race in races_data:
-            circuit = self.race_collection.database["circuits"].find_one({"_id": race["circuitId"]})
+            circuit = circuits.get(race["circuitId"])
             circuit_name = circuit["name"] if circuit else None
 
-            winner_result = self.result_collection.find_one({
-                "raceId": race["_id"],
-                "positionText": "1"
-            })
-
+            winner_result = winners.get(race["_id"])
             if winner_result:
-                driver = self.result_collection.database["drivers"].find_one({"_id": winner_result["driverId"]})
-                constructor = self.result_collection.database["constructors"].find_one({"_id": winner_result["constructorId"]})
+                driver = drivers.get(winner_result["driverId"])
+                constructor = constructors.get(winner_result["constructorId"])
 
                 winner_driver_name = f"{driver['forename']} {driver['surname']}" if driver else None
                 team_name = constructor["name"] if constructor else None
@@ -195,6 +178,9 @@ class SeasonService:
 
             self.result_collection.delete_many({"raceId": {"$in": race_ids}})
             self.race_collection.delete_many({"_id": {"$in": race_ids}})
+            self.standing_service.delete_year(year)
+            invalidate('races', year)
+            versions.bump('races', 'results', years=[year])
             return True
         except Exception as e:
             print(e)
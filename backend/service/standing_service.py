@@ -0,0 +1,290 @@
+from typing import Iterable, List, Optional
+from pymongo import ReplaceOne, UpdateOne
+from database import Database
+from dimension_cache import DimensionCache
+from analytics import AnalyticsEngine
+from cache import invalidate
+import versions
+from metrics import instrumented
+
+
+@instrumented
+class StandingService:
+    """
+    Classifiche materializzate, aggiornate dai percorsi di scrittura dei risultati.
+    - 'driver_standings': una riga per (year, driverId, constructorId) con totalPoints,
+      racesCount e wins, mantenuta con delta $inc.
+    - 'constructor_standings': una riga per (year, constructorId) con points, wins,
+      podiums e bestFinish, ricalcolata per le sole scuderie coinvolte.
+    """
+
+    def __init__(self):
+        self.collection = Database().get_collection('driver_standings')
+        self.race_collection = Database().get_collection('races')
+        self.result_collection = Database().get_collection('results')
+        self.constructor_collection = Database().get_collection('constructor_standings')
+        # Letture delle classifiche materializzate: sui secondari quando c'è un replica set
+        self.secondary_collection = Database().get_secondary_collection('driver_standings')
+        self.secondary_constructor_collection = Database().get_secondary_collection('constructor_standings')
+
+    def _race_years(self, results: List[dict]) -> dict:
+        """Map raceId -> year, using the denormalized year and querying 'races' only for the missing ones."""
+        years = {r["raceId"]: r["year"] for r in results if r.get("year") is not None}
+        missing = list({r["raceId"] for r in results} - set(years))
+        if missing:
+            cursor = self.race_collection.find({"_id": {"$in": missing}}, {"year": 1})
+            years.update({race["_id"]: race["year"] for race in cursor})
+        return years
+
+    def apply_results(self, results: List[dict], sign: int = 1, race_years: Optional[dict] = None) -> None:
+        """
+        Applica alle classifiche il contributo dei risultati indicati:
+        sign=1 per risultati inseriti, sign=-1 per risultati già rimossi.
+        race_years (raceId -> year) evita la lookup quando la gara è già stata eliminata.
+        """
+        if not results:
+            return
+        years = race_years if race_years is not None else self._race_years(results)
+        self._apply_driver_deltas(results, years, sign)
+        self._refresh_constructors(self._constructor_keys(results, years))
+        self._invalidate(set(years.values()))
+        # Nuovo ETag solo a classifiche scritte: prima un client avrebbe ricevuto il nuovo ETag con il vecchio body
+        versions.bump('results', years=set(years.values()))
+
+    def replace_results(self, old_results: List[dict], new_results: List[dict]) -> None:
+        """Sostituisce il contributo di risultati aggiornati con quello dei nuovi valori."""
+        if not old_results and not new_results:
+            return
+        years = self._race_years(old_results + new_results)
+        self._apply_driver_deltas(old_results, years, -1)
+        self._apply_driver_deltas(new_results, years, 1)
+        self._refresh_constructors(self._constructor_keys(old_results + new_results, years))
+        self._invalidate(set(years.values()))
+        versions.bump('results', years=set(years.values()))
+
+    @staticmethod
+    def _invalidate(years: Iterable[int]) -> None:
+        """
+        Drop the cached aggregates of the given seasons. Called only after every materialized
+        write: a read that runs during the writes may cache old rows, and is evicted here.
+        """
+        AnalyticsEngine().invalidate()
+        invalidate('results', *years)
+
+    def _apply_driver_deltas(self, results: List[dict], years: dict, sign: int) -> None:
+        # Somma i delta in memoria così da inviare un solo update per chiave
+        deltas: dict = {}
+        for r in results:
+            year = years.get(r["raceId"])
+            if year is None:
+                continue
+            key = (year, r["driverId"], r["constructorId"])
+            delta = deltas.setdefault(key, {"totalPoints": 0.0, "racesCount": 0, "wins": 0})
+            delta["totalPoints"] += sign * (r.get("points") or 0)
+            delta["racesCount"] += sign
+            delta["wins"] += sign if r.get("positionText") == "1" else 0
+
+        if not deltas:
+            return
+
+        operations = [
+            UpdateOne(
+                {"year": year, "driverId": driver_id, "constructorId": constructor_id},
+                {"$inc": delta},
+                upsert=True
+            )
+            for (year, driver_id, constructor_id), delta in deltas.items()
+        ]
+        self.collection.bulk_write(operations, ordered=False)
+
+        # Rimuove le coppie pilota/scuderia rimaste senza gare
+        affected_years = list({year for year, _, _ in deltas})
+        self.collection.delete_many({"year": {"$in": affected_years}, "racesCount": {"$lte": 0}})
+
+    @staticmethod
+    def _constructor_keys(results: List[dict], years: dict) -> dict:
+        """Group the affected constructorIds by season."""
+        keys: dict = {}
+        for r in results:
+            year = years.get(r["raceId"])
+            if year is not None:
+                keys.setdefault(year, set()).add(r["constructorId"])
+        return keys
+
+    def _constructor_rows(self, year: int, constructor_ids: Optional[Iterable[int]] = None) -> List[dict]:
+        """Aggregate points, wins, podiums and best finish per constructor for a season."""
+        race_ids = [race["_id"] for race in self.race_collection.find({"year": year}, {"_id": 1})]
+        if not race_ids:
+            return []
+
+        match = {"raceId": {"$in": race_ids}}
+        if constructor_ids is not None:
+            match["constructorId"] = {"$in": list(constructor_ids)}
+
+        pipeline = [
+            {"$match": match},
+            {
+                "$group": {
+                    "_id": "$constructorId",
+                    "points": {"$sum": "$points"},
+                    "wins": {
+                        "$sum": {"$cond": [{"$eq": ["$positionText", "1"]}, 1, 0]}
+                    },
+                    "podiums": {
+                        "$sum": {"$cond": [{"$in": ["$positionText", ["1", "2", "3"]]}, 1, 0]}
+                    },
+                    "bestFinish": {"$min": "$positionOrder"}
+                }
+            }
+        ]
+
+        return [
+            {
+                "year": year,
+                "constructorId": data["_id"],
+                "points": data["points"],
+                "wins": data["wins"],
+                "podiums": data["podiums"],
+                "bestFinish": data["bestFinish"]
+            }
+            for data in self.result_collection.aggregate(pipeline)
+        ]
+
+    def _refresh_constructors(self, keys: dict) -> None:
+        """
+        Ricalcola il riepilogo delle sole scuderie toccate da una scrittura.
+        Il miglior piazzamento non si può aggiornare con un delta, quindi la riga viene rigenerata.
+        """
+        for year, constructor_ids in keys.items():
+            rows = self._constructor_rows(year, constructor_ids)
+            operations = [
+                ReplaceOne({"year": year, "constructorId": row["constructorId"]}, row, upsert=True)
+                for row in rows
+            ]
+            if operations:
+                self.constructor_collection.bulk_write(operations, ordered=False)
+
+            # Scuderie che non hanno più risultati nella stagione
+            stale_ids = set(constructor_ids) - {row["constructorId"] for row in rows}
+            if stale_ids:
+                self.constructor_collection.delete_many({"year": year, "constructorId": {"$in": list(stale_ids)}})
+
+    def rebuild(self, year: int) -> None:
+        """Ricalcola da zero le classifiche materializzate di una stagione."""
+        pipeline = [
+            {"$match": {"year": year}},
+            {
+                "$lookup": {
+                    "from": "results",
+                    "localField": "_id",
+                    "foreignField": "raceId",
+                    "as": "result"
+                }
+            },
+            {"$unwind": "$result"},
+            {
+                "$group": {
+                    "_id": {
+                        "driverId": "$result.driverId",
+                        "constructorId": "$result.constructorId"
+                    },
+                    "totalPoints": {"$sum": "$result.points"},
+                    "racesCount": {"$sum": 1},
+                    "wins": {
+                        "$sum": {
+                            "$cond": [{"$eq": ["$result.positionText", "1"]}, 1, 0]
+                        }
+                    }
+                }
+            }
+        ]
+
+        rows = [
+            {
+                "year": year,
+                "driverId": data["_id"]["driverId"],
+                "constructorId": data["_id"]["constructorId"],
+                "totalPoints": data["totalPoints"],
+                "racesCount": data["racesCount"],
+                "wins": data["wins"]
+            }
+            for data in self.race_collection.aggregate(pipeline)
+        ]
+
+        self.collection.delete_many({"year": year})
+        if rows:
+            self.collection.insert_many(rows)
+
+        constructor_rows = self._constructor_rows(year)
+        self.constructor_collection.delete_many({"year": year})
+        if constructor_rows:
+            self.constructor_collection.insert_many(constructor_rows)
+        self._invalidate([year])
+
+    def delete_year(self, year: int) -> None:
+        self.collection.delete_many({"year": year})
+        self.constructor_collection.delete_many({"year": year})
+        self._invalidate([year])
+
+    def find_driver_standing(self, year: Optional[int]) -> List[dict]:
+        if year is None:
+            return []
+
+        # Sola lettura: le stagioni mancanti vengono materializzate dalle migrazioni, non qui
+        rows = list(self.secondary_collection.find({"year": year}, {"_id": 0}).sort("totalPoints", -1))
+        return self.enrich_driver_standing(rows)
+
+    @staticmethod
+    def enrich_driver_standing(rows: List[dict], drivers: Optional[dict] = None,
+                               constructors: Optional[dict] = None) -> List[dict]:
+        """Add driver and constructor names to (driverId, constructorId) standing rows."""
+        drivers = drivers if drivers is not None else DimensionCache().get_all("drivers")
+        constructors = constructors if constructors is not None else DimensionCache().get_all("constructors")
+
+        standing = []
+        for row in rows:
+            driver = drivers.get(row["driverId"])
+            constructor = constructors.get(row["constructorId"])
+            if not driver or not constructor:
+                continue
+            standing.append({
+                "driverId": row["driverId"],
+                "forename": driver["forename"],
+                "surname": driver["surname"],
+                "constructorId": row["constructorId"],
+                "constructorName": constructor["name"],
+                "totalPoints": row["totalPoints"],
+                "racesCount": row["racesCount"],
+                "wins": row["wins"]
+            })
+
+        return standing
+
+    def find_constructor_standing(self, year: Optional[int]) -> List[dict]:
+        if year is None:
+            return []
+
+        # Come per i piloti: nessuna ricostruzione in lettura, le stagioni mancanti le crea la migrazione 3
+        rows = list(self.secondary_constructor_collection.find({"year": year}, {"_id": 0}).sort("points", -1))
+        return self.enrich_constructor_standing(rows)
+
+    @staticmethod
+    def enrich_constructor_standing(rows: List[dict], constructors: Optional[dict] = None) -> List[dict]:
+        """Add constructor names to (year, constructorId) summary rows."""
+        constructors = constructors if constructors is not None else DimensionCache().get_all("constructors")
+
+        standing = []
+        for row in rows:
+            constructor = constructors.get(row["constructorId"])
+            if not constructor:
+                continue
+            standing.append({
+                "constructorId": row["constructorId"],
+                "constructorName": constructor["name"],
+                "points": row["points"],
+                "wins": row["wins"],
+                "podiums": row["podiums"],
+                "bestFinish": row["bestFinish"]
+            })
+
+        return standing
@@ -0,0 +1,195 @@
+"""
+Log delle query lente di MongoDB.
+
+Un CommandListener registrato sul MongoClient di Database misura ogni find/aggregate/count/distinct:
+quelle che superano SLOW_QUERY_THRESHOLD_MS diventano una voce con il metodo del service che le ha
+eseguite (vedi metrics.instrumented), i parametri, la durata e i documenti restituiti nel primo batch.
+Le ultime voci sono su /api/slow-queries; con SLOW_QUERY_STDOUT (default) ognuna viene anche stampata
+come una riga JSON con prefisso "SLOW QUERY".
+
+Una frazione delle query lente (SLOW_QUERY_EXPLAIN_SAMPLE_RATE) viene rieseguita con explain
+"executionStats" in un thread separato, mai nel thread della richiesta: la voce riporta allora
+il piano vincente, i documenti e le chiavi esaminati. Se il thread è già occupato il campione
+viene scartato, così il costo resta trascurabile anche quando molte query sono lente.
+Le pipeline che scrivono ($merge/$out) sono spiegate solo con "queryPlanner", senza eseguirle.
+"""
+import json
+import queue
+import random
+import threading
+import time
+from collections import deque
+from typing import Optional
+from pymongo import monitoring
+from config import Config
+from metrics import current_service_method
+
+MONITORED_COMMANDS = {'find', 'aggregate', 'count', 'distinct'}
+PARAMETER_FIELDS = ('filter', 'query', 'pipeline', 'sort', 'projection', 'limit', 'skip', 'key', 'hint')
+# Campi del comando originale che non vanno ripetuti dentro explain (sessione, transazione, read preference)
+_SESSION_FIELDS = {'lsid', 'txnNumber', 'startTransaction', 'autocommit', 'readConcern', 'writeConcern'}
+
+
+def _to_json(value) -> str:
+    return json.dumps(value, default=str, separators=(',', ':'))
+
+
+def _plan_stages(plan: Optional[dict]) -> str:
+    """Compact form of a winning plan, from the leaves up: "IXSCAN(year_1) > FETCH > SORT"."""
+    if not plan:
+        return ''
+    plan = plan.get('queryPlan', plan)  # motore SBE: l'albero classico è sotto queryPlan
+    children = [plan['inputStage']] if 'inputStage' in plan else plan.get('inputStages', [])
+    stage = plan.get('stage', '?')
+    if plan.get('indexName'):
+        stage += f"({plan['indexName']})"
+    inputs = ' + '.join(filter(None, (_plan_stages(child) for child in children)))
+    return f'{inputs} > {stage}' if inputs else stage
+
+
+def summarize_explain(explain: dict) -> dict:
+    """Winning plan and execution counters of a find or aggregate explain."""
+    if 'stages' in explain:  # pipeline non interamente spinta nel motore di query: il piano è nel primo stage
+        cursor = explain['stages'][0].get('$cursor', {})
+    else:
+        cursor = explain
+    winning = cursor.get('queryPlanner', {}).get('winningPlan')
+    stats = cursor.get('executionStats', {})
+    summary = {'plan': _plan_stages(winning), 'winningPlan': winning}
+    if stats:
+        summary.update({
+            'docsExamined': stats.get('totalDocsExamined'),
+            'keysExamined': stats.get('totalKeysExamined'),
+            'nReturned': stats.get('nReturned'),
+            'explainTimeMs': stats.get('executionTimeMillis'),
+        })
+    if 'stages' in explain:
+        summary['pipelineStages'] = [next(iter(stage)) for stage in explain['stages']]
+    return summary
+
+
+class SlowQueryLog(monitoring.CommandListener):
+    """Log the MongoDB reads slower than SLOW_QUERY_THRESHOLD_MS, with a sampled explain plan."""
+
+    def __init__(self, threshold_ms: float = None, sample_rate: float = None, keep: int = 100,
+                 stdout: bool = None):
+        self.threshold_ms = Config.SLOW_QUERY_THRESHOLD_MS if threshold_ms is None else threshold_ms
+        self.sample_rate = Config.SLOW_QUERY_EXPLAIN_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.stdout = Config.SLOW_QUERY_STDOUT if stdout is None else stdout
+        self.entries = deque(maxlen=keep)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._explains = queue.Queue(maxsize=1)
+        self._worker = None
+        self._counters = {'slow': 0, 'explained': 0, 'explainSkipped': 0, 'explainErrors': 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms >= 0
+
+    def started(self, event):
+        if not self.enabled or event.command_name not in MONITORED_COMMANDS:
+            return
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                dict(event.command), event.database_name, current_service_method.get()
+            )
+
+    def _finish(self, event):
+        with self._lock:
+            return self._pending.pop((event.connection_id, event.request_id), None)
+
+    def succeeded(self, event):
+        started = self._finish(event)
+        if started is not None and event.duration_micros / 1000 >= self.threshold_ms:
+            self._record(event, started, returned=self._returned(event.reply))
+
+    def failed(self, event):
+        started = self._finish(event)
+        if started is not None and event.duration_micros / 1000 >= self.threshold_ms:
+            self._record(event, started, error=str(event.failure.get('errmsg', event.failure)))
+
+    @staticmethod
+    def _returned(reply: dict) -> Optional[int]:
+        if 'cursor' in reply:
+            return len(reply['cursor'].get('firstBatch', []))
+        if 'n' in reply:
+            return reply['n']
+        if 'values' in reply:
+            return len(reply['values'])
+        return None
+
+    def _record(self, event, started, returned=None, error=None) -> None:
+        command, database_name, service = started
+        entry = {
+            'at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'service': service,
+            'command': event.command_name,
+            'collection': command.get(event.command_name),
+            'durationMs': round(event.duration_micros / 1000, 1),
+            'parameters': {field: command[field] for field in PARAMETER_FIELDS if field in command},
+        }
+        if returned is not None:
+            entry['returnedFirstBatch'] = returned
+        if error is not None:
+            entry['error'] = error
+        with self._lock:
+            self._counters['slow'] += 1
+
+        if error is None and random.random() < self.sample_rate:
+            try:
+                self._explains.put_nowait((entry, command, database_name))
+                self._ensure_worker()
+                return  # la voce viene scritta dal thread di explain, con il piano
+            except queue.Full:
+                with self._lock:
+                    self._counters['explainSkipped'] += 1
+        self._emit(entry)
+
+    def _emit(self, entry: dict) -> None:
+        self.entries.append(entry)
+        if self.stdout:
+            print(f"SLOW QUERY {_to_json(entry)}")
+
+    def _ensure_worker(self) -> None:
+        # Avviato al primo campione: con gunicorn ogni worker (dopo il fork) ha il suo thread
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._explain_loop, name='slow-query-explain', daemon=True)
+                self._worker.start()
+
+    def _explain_loop(self) -> None:
+        from database import Database
+
+        while True:
+            entry, command, database_name = self._explains.get()
+            try:
+                entry['explain'] = summarize_explain(self.explain(Database().get_client(), command, database_name))
+                with self._lock:
+                    self._counters['explained'] += 1
+            except Exception as e:
+                entry['explainError'] = str(e)
+                with self._lock:
+                    self._counters['explainErrors'] += 1
+            self._emit(entry)
+
+    @staticmethod
+    def explain(client, command: dict, database_name: str) -> dict:
+        """Re-run a captured read command under explain."""
+        target = {key: value for key, value in command.items()
+                  if not key.startswith('$') and key not in _SESSION_FIELDS}
+        writes = any(stage.keys() & {'$merge', '$out'} for stage in target.get('pipeline', []))
+        verbosity = 'queryPlanner' if writes else 'executionStats'
+        return client[database_name].command({'explain': target, 'verbosity': verbosity})
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'thresholdMs': self.threshold_ms,
+                'explainSampleRate': self.sample_rate,
+                **self._counters,
+                'recent': list(self.entries),
+            }
+
+
+slow_query_log = SlowQueryLog()
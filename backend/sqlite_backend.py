@@ -0,0 +1,432 @@
+"""
+Backend di storage SQLite, in sola lettura, costruito dai CSV di dataset/cleaned.
+
+Con STORAGE_BACKEND=sqlite, Database restituisce queste collezioni al posto di quelle di
+MongoDB: espongono il sottoinsieme dell'API di pymongo usato dai percorsi di lettura dei
+service (find/find_one con filtri, proiezioni, sort e limit; distinct; count_documents;
+aggregate con $match/$group/$sort/$limit/$skip/$project), quindi i service non cambiano.
+Il primo $match di un filtro o di una pipeline diventa una WHERE sugli indici dichiarati
+in migrations.INDEXES; il resto della pipeline è valutato in Python.
+
+Il database si costruisce in memoria all'avvio oppure una volta su file (dalla cartella backend):
+    python sqlite_backend.py build f1.sqlite
+"""
+import csv
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Iterable, List, Optional
+from migrations import INDEXES
+
+DEFAULT_DATASET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dataset', 'cleaned')
+
+# Colonne di ogni collezione: (nome, tipo SQLite). '_id' è sempre la chiave primaria.
+SCHEMA = {
+    'circuits': [('circuitRef', 'TEXT'), ('name', 'TEXT'), ('location', 'TEXT'), ('country', 'TEXT'), ('url', 'TEXT')],
+    'constructors': [('constructorRef', 'TEXT'), ('name', 'TEXT'), ('nationality', 'TEXT'), ('url', 'TEXT')],
+    'drivers': [('driverRef', 'TEXT'), ('forename', 'TEXT'), ('surname', 'TEXT'), ('dob', 'TEXT'),
+                ('nationality', 'TEXT'), ('url', 'TEXT')],
+    'races': [('year', 'INTEGER'), ('round', 'INTEGER'), ('circuitId', 'INTEGER'), ('name', 'TEXT'),
+              ('date', 'TEXT'), ('url', 'TEXT')],
+    'results': [('raceId', 'INTEGER'), ('driverId', 'INTEGER'), ('constructorId', 'INTEGER'), ('grid', 'INTEGER'),
+                ('positionText', 'TEXT'), ('positionOrder', 'INTEGER'), ('points', 'REAL'), ('laps', 'INTEGER'),
+                ('statusId', 'INTEGER'), ('year', 'INTEGER'), ('round', 'INTEGER'), ('circuitId', 'INTEGER')],
+    'driver_standings': [('year', 'INTEGER'), ('driverId', 'INTEGER'), ('constructorId', 'INTEGER'),
+                         ('totalPoints', 'REAL'), ('racesCount', 'INTEGER'), ('wins', 'INTEGER')],
+    'constructor_standings': [('year', 'INTEGER'), ('constructorId', 'INTEGER'), ('points', 'REAL'),
+                              ('wins', 'INTEGER'), ('podiums', 'INTEGER'), ('bestFinish', 'INTEGER')],
+    'collection_versions': [('epoch', 'TEXT'), ('v', 'INTEGER')],
+}
+
+# Collezioni caricate dai CSV e relativa colonna id (in ordine: 'results' usa le gare già caricate)
+CSV_SOURCES = [
+    ('circuits', 'circuitId'),
+    ('constructors', 'constructorId'),
+    ('drivers', 'driverId'),
+    ('races', 'raceId'),
+    ('results', 'resultId'),
+]
+
+_CONVERTERS = {'INTEGER': int, 'REAL': float, 'TEXT': str}
+
+
+class ReadOnlyStorageError(RuntimeError):
+    """Raised by every write on the SQLite backend."""
+
+
+class UnsupportedQueryError(RuntimeError):
+    """Raised for a filter operator, pipeline stage or expression the SQLite backend does not translate."""
+
+
+def build(path: str = ':memory:', dataset_dir: str = DEFAULT_DATASET_DIR) -> sqlite3.Connection:
+    """Create the tables and indexes, load the CSVs and materialize the standings."""
+    conn = sqlite3.connect(path, check_same_thread=False)
+    for table, columns in SCHEMA.items():
+        conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+        definition = ', '.join(f'"{name}" {kind}' for name, kind in columns)
+        conn.execute(f'CREATE TABLE "{table}" ("_id" {"TEXT" if table == "collection_versions" else "INTEGER"} PRIMARY KEY, {definition})')
+
+    race_fields = {}
+    for table, id_field in CSV_SOURCES:
+        columns = SCHEMA[table]
+        with open(os.path.join(dataset_dir, f'{table}_cleaned.csv'), newline='', encoding='utf-8') as f:
+            rows = []
+            for record in csv.DictReader(f):
+                row = [int(record[id_field])]
+                for name, kind in columns:
+                    value = record.get(name)
+                    row.append(_CONVERTERS[kind](value) if value not in (None, '') else None)
+                rows.append(row)
+
+        if table == 'races':
+            race_fields = {row[0]: row[1:4] for row in rows}
+        elif table == 'results':
+            # year, round e circuitId denormalizzati come in migrations.denormalize_race_fields
+            for row in rows:
+                row[-3:] = race_fields.get(row[1], (None, None, None))
+
+        placeholders = ', '.join('?' * (len(columns) + 1))
+        conn.executemany(f'INSERT INTO "{table}" VALUES ({placeholders})', rows)
+
+    # Classifiche materializzate, come le costruisce setup_db
+    conn.execute('''
+        INSERT INTO driver_standings (year, driverId, constructorId, totalPoints, racesCount, wins)
+        SELECT year, driverId, constructorId, SUM(points), COUNT(*), SUM(positionText = '1')
+        FROM results WHERE year IS NOT NULL GROUP BY year, driverId, constructorId
+    ''')
+    conn.execute('''
+        INSERT INTO constructor_standings (year, constructorId, points, wins, podiums, bestFinish)
+        SELECT year, constructorId, SUM(points), SUM(positionText = '1'),
+               SUM(positionText IN ('1', '2', '3')), MIN(positionOrder)
+        FROM results WHERE year IS NOT NULL GROUP BY year, constructorId
+    ''')
+
+    for table, indexes in INDEXES.items():
+        for keys, options in indexes:
+            name = f"{table}_{'_'.join(field for field, _ in keys)}"
+            columns = ', '.join(f'"{field}" {"DESC" if direction < 0 else "ASC"}' for field, direction in keys)
+            unique = 'UNIQUE ' if options.get('unique') else ''
+            conn.execute(f'CREATE {unique}INDEX "{name}" ON "{table}" ({columns})')
+
+    conn.commit()
+    conn.execute('ANALYZE')
+    return conn
+
+
+class SQLiteDatabase:
+    """Dict-like database handle: db['results'] returns a read-only collection."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.lock = threading.Lock()
+        self.columns = {
+            table: [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+            for (table,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        }
+
+    @classmethod
+    def open(cls, path: str = '', dataset_dir: str = DEFAULT_DATASET_DIR) -> 'SQLiteDatabase':
+        """Open an existing database file, or build one (in memory when `path` is empty)."""
+        if path and os.path.exists(path):
+            return cls(sqlite3.connect(path, check_same_thread=False))
+        return cls(build(path or ':memory:', dataset_dir))
+
+    def __getitem__(self, name: str) -> 'SQLiteCollection':
+        return SQLiteCollection(self, name)
+
+    def get_collection(self, name: str, **kwargs) -> 'SQLiteCollection':
+        return self[name]
+
+    def query(self, sql: str, params: Iterable = ()) -> List[tuple]:
+        # Una sola connessione condivisa tra i thread del server: le letture sono serializzate
+        with self.lock:
+            return self.conn.execute(sql, list(params)).fetchall()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def _where(filter: Optional[dict], columns: List[str]) -> tuple:
+    """Translate a MongoDB filter into (SQL condition, parameters)."""
+    clauses, params = [], []
+    for field, condition in (filter or {}).items():
+        if field in ('$or', '$and'):
+            parts = [_where(sub, columns) for sub in condition]
+            joiner = ' OR ' if field == '$or' else ' AND '
+            clauses.append('(' + (joiner.join(f'({sql})' for sql, _ in parts) or '1') + ')')
+            for _, sub_params in parts:
+                params.extend(sub_params)
+            continue
+
+        # Un campo che la tabella non ha vale sempre NULL, come un campo mancante in MongoDB
+        column = f'"{field}"' if field in columns else 'NULL'
+        operators = condition if isinstance(condition, dict) and any(k.startswith('$') for k in condition) else {'$eq': condition}
+        for operator, value in operators.items():
+            if operator == '$eq':
+                if value is None:
+                    clauses.append(f'{column} IS NULL')
+                else:
+                    clauses.append(f'{column} = ?')
+                    params.append(value)
+            elif operator == '$ne':
+                if value is None:
+                    clauses.append(f'{column} IS NOT NULL')
+                else:
+                    clauses.append(f'({column} IS NULL OR {column} != ?)')
+                    params.append(value)
+            elif operator in ('$gt', '$gte', '$lt', '$lte'):
+                sql_operator = {'$gt': '>', '$gte': '>=', '$lt': '<', '$lte': '<='}[operator]
+                clauses.append(f'{column} {sql_operator} ?')
+                params.append(value)
+            elif operator in ('$in', '$nin'):
+                values = list(value)
+                if not values:
+                    clauses.append('0' if operator == '$in' else '1')
+                    continue
+                negate = 'NOT ' if operator == '$nin' else ''
+                clauses.append(f'{column} {negate}IN ({", ".join("?" * len(values))})')
+                params.extend(values)
+            else:
+                raise UnsupportedQueryError(f"Operatore {operator} non supportato dal backend SQLite")
+    return ' AND '.join(clauses) or '1', params
+
+
+def _order_by(sort: Optional[list], columns: List[str]) -> str:
+    if not sort:
+        return ''
+    terms = [f'"{field}" {"DESC" if direction < 0 else "ASC"}' for field, direction in sort if field in columns]
+    return ' ORDER BY ' + ', '.join(terms) if terms else ''
+
+
+def _normalize_sort(key_or_list, direction=None) -> list:
+    if key_or_list is None:
+        return []
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction if direction is not None else 1)]
+    if isinstance(key_or_list, dict):
+        return list(key_or_list.items())
+    return list(key_or_list)
+
+
+class SQLiteCursor:
+    """Lazy cursor: the query runs on first iteration, like a pymongo Cursor."""
+
+    def __init__(self, collection: 'SQLiteCollection', filter: Optional[dict], projection: Optional[dict],
+                 sort=None, limit: int = 0):
+        self._collection = collection
+        self._filter = filter
+        self._projection = projection
+        self._sort = _normalize_sort(sort)
+        self._limit = limit
+        self._rows = None
+
+    def sort(self, key_or_list, direction=None) -> 'SQLiteCursor':
+        self._sort = _normalize_sort(key_or_list, direction)
+        return self
+
+    def limit(self, limit: int) -> 'SQLiteCursor':
+        self._limit = int(limit)
+        return self
+
+    def batch_size(self, batch_size: int) -> 'SQLiteCursor':
+        return self
+
+    def close(self) -> None:
+        self._rows = iter(())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self):
+        if self._rows is None:
+            self._rows = iter(self._collection._select(self._filter, self._projection, self._sort, self._limit))
+        return self._rows
+
+    def __next__(self):
+        return next(iter(self))
+
+
+class SQLiteCollection:
+    def __init__(self, database: SQLiteDatabase, name: str):
+        self.database = database
+        self.name = name
+        self.columns = database.columns.get(name)
+
+    def with_options(self, **kwargs) -> 'SQLiteCollection':
+        # Read preference e write concern non hanno senso su un database locale
+        return self
+
+    def _fields(self, projection: Optional[dict]) -> List[str]:
+        if not projection:
+            return list(self.columns)
+        # Inclusione se almeno un campo vale 1, anche solo {'_id': 1}; _id è incluso salvo {'_id': 0}
+        if any(projection.values()):
+            fields = [field for field, value in projection.items()
+                      if value and field != '_id' and field in self.columns]
+            return (['_id'] if projection.get('_id', 1) else []) + fields
+        return [field for field in self.columns if field not in projection]
+
+    def _select(self, filter: Optional[dict], projection: Optional[dict], sort=None, limit: int = 0) -> List[dict]:
+        if self.columns is None:
+            return []
+        fields = self._fields(projection)
+        where, params = _where(filter, self.columns)
+        selected = ', '.join(f'"{field}"' for field in fields) or '1'
+        sql = f'SELECT {selected} FROM "{self.name}" WHERE {where}'
+        sql += _order_by(sort, self.columns)
+        if limit:
+            sql += f' LIMIT {int(limit)}'
+        return [dict(zip(fields, row)) for row in self.database.query(sql, params)]
+
+    def find(self, filter: Optional[dict] = None, projection: Optional[dict] = None, sort=None, limit: int = 0,
+             **kwargs) -> SQLiteCursor:
+        return SQLiteCursor(self, filter, projection, sort, limit)
+
+    def find_one(self, filter: Optional[dict] = None, projection: Optional[dict] = None, sort=None,
+                 **kwargs) -> Optional[dict]:
+        rows = self._select(filter, projection, _normalize_sort(sort), 1)
+        return rows[0] if rows else None
+
+    def count_documents(self, filter: Optional[dict] = None, **kwargs) -> int:
+        if self.columns is None:
+            return 0
+        where, params = _where(filter, self.columns)
+        return self.database.query(f'SELECT COUNT(*) FROM "{self.name}" WHERE {where}', params)[0][0]
+
+    def estimated_document_count(self, **kwargs) -> int:
+        return self.count_documents({})
+
+    def distinct(self, key: str, filter: Optional[dict] = None, **kwargs) -> list:
+        if self.columns is None or key not in self.columns:
+            return []
+        where, params = _where(filter, self.columns)
+        return [row[0] for row in self.database.query(f'SELECT DISTINCT "{key}" FROM "{self.name}" WHERE {where}', params)]
+
+    def aggregate(self, pipeline: List[dict], **kwargs):
+        stages = list(pipeline)
+        match = stages.pop(0)['$match'] if stages and '$match' in stages[0] else None
+        documents = self._select(match, None)
+        for stage in stages:
+            (operator, spec), = stage.items()
+            if operator == '$group':
+                documents = _group(documents, spec)
+            elif operator == '$sort':
+                documents = _sort(documents, list(spec.items()))
+            elif operator == '$limit':
+                documents = documents[:int(spec)]
+            elif operator == '$skip':
+                documents = documents[int(spec):]
+            elif operator == '$project':
+                documents = [_project(doc, spec) for doc in documents]
+            else:
+                raise UnsupportedQueryError(f"Stage {operator} non supportato dal backend SQLite")
+        return iter(documents)
+
+    def _read_only(self, *args, **kwargs):
+        raise ReadOnlyStorageError(f"Il backend SQLite è in sola lettura: scrittura su '{self.name}' non consentita")
+
+    insert_one = insert_many = update_one = update_many = replace_one = _read_only
+    delete_one = delete_many = find_one_and_delete = find_one_and_update = find_one_and_replace = _read_only
+    bulk_write = create_index = drop = _read_only
+
+
+def _value(doc: dict, expression):
+    """Evaluate an aggregation expression ('$field', literal, $cond, $eq, $in) on a document."""
+    if isinstance(expression, str) and expression.startswith('$'):
+        value = doc
+        for part in expression[1:].split('.'):
+            value = value.get(part) if isinstance(value, dict) else None
+        return value
+    if isinstance(expression, dict):
+        if len(expression) == 1:
+            (operator, args), = expression.items()
+            if operator == '$cond':
+                condition, then, otherwise = args if isinstance(args, list) else (args['if'], args['then'], args['else'])
+                return _value(doc, then) if _value(doc, condition) else _value(doc, otherwise)
+            if operator == '$eq':
+                return _value(doc, args[0]) == _value(doc, args[1])
+            if operator == '$in':
+                return _value(doc, args[0]) in _value(doc, args[1])
+            if operator.startswith('$'):
+                raise UnsupportedQueryError(f"Espressione {operator} non supportata dal backend SQLite")
+        return {key: _value(doc, sub) for key, sub in expression.items()}
+    return expression
+
+
+def _group(documents: List[dict], spec: dict) -> List[dict]:
+    groups = {}
+    accumulators = {field: next(iter(acc.items())) for field, acc in spec.items() if field != '_id'}
+    for doc in documents:
+        key = _value(doc, spec['_id'])
+        hashable = tuple(sorted(key.items())) if isinstance(key, dict) else key
+        group = groups.get(hashable)
+        if group is None:
+            group = groups[hashable] = {'_id': key}
+            for field, (operator, _) in accumulators.items():
+                group[field] = 0 if operator == '$sum' else [] if operator in ('$push', '$addToSet') else None
+        for field, (operator, expression) in accumulators.items():
+            value = _value(doc, expression)
+            if operator == '$sum':
+                # Come in MongoDB, i valori non numerici vengono ignorati
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    group[field] += value
+            elif operator in ('$min', '$max'):
+                current = group[field]
+                if value is not None and (current is None or (value < current if operator == '$min' else value > current)):
+                    group[field] = value
+            elif operator == '$push' or (operator == '$addToSet' and value not in group[field]):
+                group[field].append(value)
+            elif operator != '$addToSet':
+                raise UnsupportedQueryError(f"Accumulatore {operator} non supportato dal backend SQLite")
+    return list(groups.values())
+
+
+def _sort(documents: List[dict], keys: list) -> List[dict]:
+    # Ordinamenti stabili dall'ultima chiave alla prima; null prima dei valori, come in MongoDB
+    for field, direction in reversed(keys):
+        documents = sorted(
+            documents,
+            key=lambda doc: (doc.get(field) is not None, doc.get(field) if doc.get(field) is not None else 0),
+            reverse=direction < 0
+        )
+    return documents
+
+
+def _project(doc: dict, spec: dict) -> dict:
+    projected = {}
+    if spec.get('_id', 1) and '_id' in doc:
+        projected['_id'] = doc['_id']
+    for field, value in spec.items():
+        if field == '_id':
+            continue
+        if value == 1 or value is True:
+            if field in doc:
+                projected[field] = doc[field]
+        elif value not in (0, False):
+            projected[field] = _value(doc, value)
+    return projected
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] != 'build':
+        print("Uso: python sqlite_backend.py build <file.sqlite> [cartella_csv]")
+        sys.exit(1)
+    path = sys.argv[2]
+    if os.path.exists(path):
+        os.remove(path)
+    start = time.perf_counter()
+    conn = build(path, sys.argv[3] if len(sys.argv) > 3 else DEFAULT_DATASET_DIR)
+    counts = {table: conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0] for table in SCHEMA}
+    conn.close()
+    print(f"Database SQLite creato in {time.perf_counter() - start:.2f}s: {path}")
+    for table, count in counts.items():
+        print(f"  {table:<24} {count:>8} righe")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Tempo di avvio dell'app: import di app.py e create_app(), con MongoDB raggiungibile
+e con MongoDB lento/irraggiungibile, per ogni modalità di MIGRATIONS_ON_STARTUP.
+
+Ogni misura gira in un processo nuovo. Uso (dalla cartella backend):
+    python startup_bench.py
+    python startup_bench.py --slow-uri mongodb://10.255.255.1:27017 --timeout-ms 5000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PROBE = """
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+try:
+    app.create_app()
+    error = None
+except Exception as e:
+    error = type(e).__name__
+created = time.perf_counter()
+print(json.dumps({'import': imported - start, 'create_app': created - imported, 'error': error}))
+"""
+
+
+def measure(env: dict, timeout: float) -> str:
+    try:
+        completed = subprocess.run(
+            [sys.executable, '-c', PROBE], cwd=os.path.dirname(os.path.abspath(__file__)),
+            env=env, capture_output=True, text=True, timeout=timeout
+        )
+    except subprocess.TimeoutExpired:
+        return f"oltre {timeout:.0f}s"
+    lines = [line for line in completed.stdout.splitlines() if line.startswith('{')]
+    if completed.returncode != 0 or not lines:
+        error = (completed.stderr.strip().splitlines() or ['errore'])[-1]
+        return f"errore: {error[:80]}"
+    timings = json.loads(lines[-1])
+    outcome = f"   fallito: {timings['error']}" if timings['error'] else ''
+    return f"import {timings['import'] * 1000:>8.1f} ms   create_app {timings['create_app'] * 1000:>8.1f} ms{outcome}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo di avvio di F1 Archive")
+    parser.add_argument('--uri', default=os.getenv('MONGODB_URI', 'mongodb://localhost:27017'))
+    # Indirizzo non instradabile: ogni operazione attende il timeout di selezione del server
+    parser.add_argument('--slow-uri', default='mongodb://10.255.255.1:27017')
+    parser.add_argument('--timeout-ms', type=int, default=5000)
+    args = parser.parse_args()
+
+    for label, uri in (('raggiungibile', args.uri), ('lento', args.slow_uri)):
+        for mode in ('sync', 'background'):
+            env = {
+                **os.environ,
+                'MONGODB_URI': uri,
+                'MIGRATIONS_ON_STARTUP': mode,
+                'MONGO_SERVER_SELECTION_TIMEOUT_MS': str(args.timeout_ms),
+                'MONGO_CONNECT_TIMEOUT_MS': str(args.timeout_ms),
+            }
+            print(f"  MongoDB {label:<14} {mode:<11} {measure(env, args.timeout_ms / 1000 * 10)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,312 @@
+"""
+Fixture comuni: MongoDB sostituito da mongomock, caricato con un sottoinsieme di dataset/cleaned
+(tutte le tabelle dimensionali, gare e risultati delle stagioni SEASONS).
+"""
+import asyncio
+import csv
+import itertools
+import os
+from types import SimpleNamespace
+
+# Prima di importare config: niente migrazioni all'avvio dell'app, tutto su MongoDB
+os.environ['MIGRATIONS_ON_STARTUP'] = 'off'
+os.environ['ANALYTICS_ENGINE'] = ''
+
+import mongomock
+import pymongo
+import pytest
+from pymongo import InsertOne, ReplaceOne, UpdateOne
+from pymongo.errors import PyMongoError
+import database
+import versions
+from analytics import AnalyticsEngine
+from cache import service_cache
+from config import Config
+from database import Database
+from dimension_cache import DimensionCache
+from lazy import LazyService
+from service.counter_service import CounterService
+
+DATASET = os.path.join(os.path.dirname(__file__), '..', '..', 'dataset', 'cleaned')
+SEASONS = (2009, 2010)
+ID_FIELDS = {'circuits': 'circuitId', 'constructors': 'constructorId', 'drivers': 'driverId',
+             'races': 'raceId', 'results': 'resultId'}
+INTEGER_FIELDS = {'circuitId', 'constructorId', 'driverId', 'raceId', 'resultId', 'year', 'round',
+                  'grid', 'positionOrder', 'laps', 'statusId'}
+
+
+def _bulk_write(self, requests, ordered=True, session=None, **kwargs):
+    # bulk_write di mongomock non è compatibile con le operazioni di pymongo 4: una chiamata per operazione
+    for op in requests:
+        if isinstance(op, InsertOne):
+            self.insert_one(op._doc, session=session)
+        elif isinstance(op, UpdateOne):
+            self.update_one(op._filter, op._doc, upsert=op._upsert, session=session)
+        elif isinstance(op, ReplaceOne):
+            self.replace_one(op._filter, op._doc, upsert=op._upsert, session=session)
+        else:
+            raise TypeError(f"operazione non supportata: {op!r}")
+
+
+mongomock.collection.Collection.bulk_write = _bulk_write
+# Client reale, per i test che richiedono un server (atomicità, piani di esecuzione)
+RealMongoClient = pymongo.MongoClient
+database.MongoClient = mongomock.MongoClient
+
+
+class ListenedCollection:
+    """
+    mongomock collection that reports its reads to the CommandListeners of the Database client,
+    as pymongo does, each one lasting duration_ms (mongomock publishes no command events).
+    """
+    READS = {'find': 'find', 'find_one': 'find', 'aggregate': 'aggregate',
+             'count_documents': 'aggregate', 'distinct': 'distinct'}
+    _request_ids = itertools.count(1)
+
+    def __init__(self, collection, listeners, duration_ms: float):
+        self._collection = collection
+        self._listeners = listeners
+        self._duration_ms = duration_ms
+
+    def with_options(self, **kwargs):
+        return ListenedCollection(self._collection.with_options(**kwargs), self._listeners, self._duration_ms)
+
+    def __getattr__(self, name):
+        method = getattr(self._collection, name)
+        command_name = self.READS.get(name)
+        if command_name is None:
+            return method
+
+        def listened(*args, **kwargs):
+            command = {command_name: self._collection.name, 'filter': args[0] if args else {}}
+            ids = {'connection_id': ('mongomock', 27017), 'request_id': next(self._request_ids)}
+            for listener in self._listeners:
+                listener.started(SimpleNamespace(command_name=command_name, command=command,
+                                                 database_name=self._collection.database.name, **ids))
+            result = method(*args, **kwargs)
+            for listener in self._listeners:
+                listener.succeeded(SimpleNamespace(command_name=command_name, reply={'n': 1},
+                                                   duration_micros=int(self._duration_ms * 1000), **ids))
+            return result
+        return listened
+
+
+@pytest.fixture
+def listen_to_reads(monkeypatch):
+    """Call with some CommandListeners to route the collections handed out by Database through ListenedCollection."""
+    get_collection = Database.get_collection
+
+    def listen(listeners, duration_ms: float = 1.0) -> None:
+        monkeypatch.setattr(Database, 'get_collection', lambda self, name=None: ListenedCollection(
+            get_collection(self, name), listeners, duration_ms))
+        reset_state()
+    return listen
+
+
+def read_csv(name: str) -> list:
+    with open(os.path.join(DATASET, f'{name}_cleaned.csv'), newline='', encoding='utf-8') as f:
+        rows = []
+        for row in csv.DictReader(f):
+            doc = {field: int(value) if field in INTEGER_FIELDS else value for field, value in row.items()}
+            if 'points' in doc:
+                doc['points'] = float(doc['points'])
+            doc['_id'] = doc.pop(ID_FIELDS[name])
+            rows.append(doc)
+        return rows
+
+
+def reset_state() -> None:
+    """Forget every per-process cache and the services already built by the route modules."""
+    service_cache.clear()
+    versions.expire_snapshot()
+    DimensionCache().invalidate()
+    AnalyticsEngine().invalidate()
+    CounterService._seeded.clear()
+    from routes import (circuit_routes, constructor_routes, driver_routes, race_routes,
+                        result_route, season_routes)
+    from service import driver_service
+    for module in (circuit_routes, constructor_routes, driver_routes, race_routes, result_route, season_routes,
+                   driver_service):
+        for value in vars(module).values():
+            if isinstance(value, LazyService):
+                value._instance = None
+
+
+@pytest.fixture
+def mongo(monkeypatch):
+    """Empty mongomock database behind the Database singleton."""
+    monkeypatch.setattr(Config, 'STORAGE_BACKEND', 'mongo')
+    Database().close()
+    db = Database().connect()
+    for name in db.list_collection_names():
+        db.drop_collection(name)
+    Database()._supports_transactions = False
+    reset_state()
+    yield db
+    reset_state()
+    Database().close()
+
+
+@pytest.fixture
+def real_mongo(monkeypatch):
+    """
+    Scratch database on the MongoDB server at MONGODB_URI behind the Database singleton
+    (mongomock is not atomic across threads). Skipped when no server answers.
+    """
+    client = RealMongoClient(Config.MONGODB_URI, serverSelectionTimeoutMS=500)
+    try:
+        client.admin.command('ping')
+    except PyMongoError:
+        client.close()
+        pytest.skip(f"nessun MongoDB raggiungibile su {Config.MONGODB_URI}")
+
+    name = f'{Config.DATABASE_NAME}_test'
+    client.drop_database(name)
+    monkeypatch.setattr(Config, 'STORAGE_BACKEND', 'mongo')
+    Database().close()
+    Database()._client = client
+    Database()._db = client[name]
+    reset_state()
+    yield client[name]
+    reset_state()
+    Database().reset_after_fork()
+    client.drop_database(name)
+    client.close()
+
+
+def load_seasons(db) -> None:
+    """
+    Load the dimensions and the SEASONS races and results, denormalized like migration 2,
+    into the database behind the Database singleton, then materialize their standings.
+    """
+    from service.standing_service import StandingService
+
+    for name in ('circuits', 'constructors', 'drivers'):
+        db[name].insert_many(read_csv(name))
+    races = {race['_id']: race for race in read_csv('races') if race['year'] in SEASONS}
+    db['races'].insert_many(list(races.values()))
+    results = []
+    for result in read_csv('results'):
+        race = races.get(result['raceId'])
+        if race is not None:
+            result.update(year=race['year'], round=race['round'], circuitId=race['circuitId'])
+            results.append(result)
+    db['results'].insert_many(results)
+
+    standing_service = StandingService()
+    for year in SEASONS:
+        standing_service.rebuild(year)
+    reset_state()
+
+
+@pytest.fixture
+def seeded(mongo):
+    """mongomock database with the SEASONS results, denormalized like migration 2, and their standings."""
+    load_seasons(mongo)
+    return mongo
+
+
+@pytest.fixture
+def seeded_real_mongo(real_mongo):
+    """The scratch MongoDB database of real_mongo, loaded like seeded."""
+    load_seasons(real_mongo)
+    return real_mongo
+
+
+@pytest.fixture
+def client(seeded):
+    """Flask test client of the app on the seeded mongomock database."""
+    from app import create_app
+
+    return create_app().test_client()
+
+
+@pytest.fixture(scope='session')
+def sqlite_file(tmp_path_factory):
+    """SQLite database built once from dataset/cleaned, shared by the tests of the session."""
+    from sqlite_backend import build
+
+    path = str(tmp_path_factory.mktemp('sqlite') / 'f1.sqlite')
+    build(path).close()
+    return path
+
+
+class AsgiTestClient:
+    """
+    Synchronous facade over the Quart test client, with the get/post/get_json surface of the
+    Flask one used by the API tests. The app runs on its own event loop, started like uvicorn does.
+    """
+
+    def __init__(self, app):
+        self._loop = asyncio.new_event_loop()
+        self._test_app = app.test_app()
+        self._loop.run_until_complete(self._test_app.startup())
+        self._client = self._test_app.test_client()
+
+    def _call(self, method: str, path: str, **kwargs):
+        from flask import Response
+
+        response = self._loop.run_until_complete(getattr(self._client, method)(path, **kwargs))
+        body = self._loop.run_until_complete(response.get_data())
+        return Response(body, status=response.status_code, headers=list(response.headers.items()))
+
+    def get(self, path: str, headers=None):
+        return self._call('get', path, headers=headers or {})
+
+    def post(self, path: str, json):
+        return self._call('post', path, json=json)
+
+    def close(self) -> None:
+        self._loop.run_until_complete(self._test_app.shutdown())
+        self._loop.close()
+
+
+def reset_async_state() -> None:
+    """Forget the Motor client, the async dimension maps and the async services of the route modules."""
+    from async_database import AsyncDatabase, AsyncDimensionCache
+    from async_routes import (circuit_routes, constructor_routes, driver_routes, race_routes,
+                              result_routes, season_routes)
+    from async_service import driver_service
+
+    AsyncDatabase().close()
+    AsyncDimensionCache._instance = None
+    for module in (circuit_routes, constructor_routes, driver_routes, race_routes, result_routes, season_routes,
+                   driver_service):
+        for value in vars(module).values():
+            if isinstance(value, LazyService):
+                value._instance = None
+
+
+@pytest.fixture(params=['mongo', 'sqlite', 'asgi'])
+def api(request, monkeypatch):
+    """
+    Test client of each API variant: the Flask app on seeded mongomock and on the read-only SQLite
+    database, then the async app (asgi.py) on a scratch MongoDB database seeded the same way.
+    The last one is skipped without Quart or without a MongoDB server.
+    """
+    from app import create_app
+
+    if request.param == 'mongo':
+        request.getfixturevalue('seeded')
+    elif request.param == 'sqlite':
+        monkeypatch.setattr(Config, 'STORAGE_BACKEND', 'sqlite')
+        monkeypatch.setattr(Config, 'SQLITE_PATH', request.getfixturevalue('sqlite_file'))
+        Database().close()
+        reset_state()
+    else:
+        pytest.importorskip('quart')
+        db = request.getfixturevalue('real_mongo')
+        load_seasons(db)
+        # Motor apre il proprio client sullo stesso database di prova
+        monkeypatch.setattr(Config, 'DATABASE_NAME', db.name)
+        import asgi
+        reset_async_state()
+    client = AsgiTestClient(asgi.create_app()) if request.param == 'asgi' else create_app().test_client()
+    client.backend = request.param
+    yield client
+    if request.param == 'sqlite':
+        reset_state()
+        Database().close()
+    elif request.param == 'asgi':
+        client.close()
+        reset_async_state()
@@ -0,0 +1,45 @@
+"""Parità tra il motore NumPy e le aggregazioni MongoDB, in sola lettura sulle collezioni materializzate."""
+import pytest
+from analytics import AnalyticsEngine, LEADERBOARD_METRICS
+from service.driver_service import DriverService, MAX_LEADERBOARD_SIZE
+from service.standing_service import StandingService
+
+pytest.importorskip('numpy')
+
+
+def rounded(rows, field):
+    return sorted(repr({**row, field: round(row[field], 6)}) for row in rows)
+
+
+def test_standings_match_the_materialized_collections(seeded):
+    standing_service = StandingService()
+    engine = AnalyticsEngine()
+
+    for year in seeded['races'].distinct('year'):
+        drivers = list(standing_service.collection.find({'year': year}, {'_id': 0}))
+        constructors = list(standing_service.constructor_collection.find({'year': year}, {'_id': 0}))
+
+        assert drivers and constructors
+        assert rounded(engine.driver_standing(year), 'totalPoints') == rounded(drivers, 'totalPoints')
+        assert rounded(engine.constructor_standing(year), 'points') == rounded(constructors, 'points')
+
+
+def test_careers_match_mongo(seeded):
+    driver_service = DriverService()
+    engine = AnalyticsEngine()
+
+    for driver_id in seeded['results'].distinct('driverId'):
+        assert rounded([engine.driver_career(driver_id)], 'points') == rounded([driver_service._mongo_career(driver_id)], 'points')
+
+
+@pytest.mark.parametrize('metric', LEADERBOARD_METRICS)
+def test_leaderboards_match_mongo(seeded, metric):
+    mongo_top = [row['driverId'] for row in DriverService()._mongo_leaderboard(metric, 20)]
+    engine_top = [row['driverId'] for row in AnalyticsEngine().driver_leaderboard(metric, 20)]
+
+    assert engine_top == mongo_top
+
+
+@pytest.mark.parametrize('limit, expected', [(0, 1), (-5, 1), (3, 3), (10_000, MAX_LEADERBOARD_SIZE)])
+def test_leaderboard_limit_is_clamped(seeded, limit, expected):
+    assert len(DriverService().find_leaderboard('races', limit=limit)) == min(expected, len(seeded['results'].distinct('driverId')))
@@ -0,0 +1,146 @@
+"""
+Route dell'API eseguite su entrambi i backend di storage dell'app Flask (mongomock e SQLite)
+e sull'app asincrona di asgi.py (fixture api).
+"""
+import json
+import pytest
+
+
+def test_season_lists_the_races_with_their_winners(api):
+    season = api.get('/api/season/2010').get_json()
+
+    assert season['raceCount'] == 19
+    assert season['races'][0]['name'] == 'Bahrain Grand Prix'
+    assert season['races'][0]['winner'] == 'Fernando Alonso'
+
+
+def test_driver_standing(api):
+    standing = api.get('/api/season/standing?year=2010').get_json()
+
+    assert (standing[0]['surname'], standing[0]['totalPoints']) == ('Vettel', 256.0)
+
+
+def test_constructor_standing(api):
+    standing = api.get('/api/season/constructor-standing?year=2009').get_json()
+
+    assert standing[0]['constructorName'] == 'Brawn'
+
+
+def test_standings_of_a_season_without_results_are_empty(api):
+    assert api.get('/api/season/standing?year=1900').get_json() == []
+    assert api.get('/api/season/constructor-standing?year=1900').get_json() == []
+
+
+def test_driver_profile_and_results(api):
+    profile = api.get('/api/driver/1/profile').get_json()
+    results = api.get('/api/driver/find_results/1?year=2010').get_json()
+
+    assert profile['driver']['surname'] == 'Hamilton'
+    assert len(results['results']) == 19
+
+
+def test_leaderboard(api):
+    leaderboard = api.get('/api/driver/leaderboard?metric=wins&limit=3&from_year=2009&to_year=2010').get_json()
+
+    assert len(leaderboard) == 3
+    assert leaderboard[0]['surname'] == 'Vettel'
+
+
+def test_race_classification(api):
+    race = api.get('/api/season/2010').get_json()['races'][0]
+    classification = api.get(f"/api/result/standings/{race['raceId']}").get_json()
+
+    assert classification[0]['driverName'] == 'Fernando Alonso'
+
+
+def test_etag_revalidation(api):
+    if api.backend == 'asgi':
+        pytest.skip("l'app asincrona non espone ETag")
+    first = api.get('/api/season/standing?year=2010')
+    second = api.get('/api/season/standing?year=2010', headers={'If-None-Match': first.headers['ETag']})
+
+    assert second.status_code == 304
+
+
+def test_writes_depend_on_the_backend(api):
+    driver = {'driverRef': 'nuovo', 'forename': 'Nuovo', 'surname': 'Pilota', 'dob': '2000-01-01',
+              'nationality': 'Italian', 'url': ''}
+    response = api.post('/api/driver', json=driver)
+
+    if api.backend in ('sqlite', 'asgi'):
+        assert response.status_code == 405
+        assert 'sola lettura' in response.get_json()['error']
+    else:
+        assert response.status_code == 201
+
+
+def test_lookups_by_id(api):
+    race = api.get('/api/season/2010').get_json()['races'][0]
+    result = api.get(f"/api/result/standings/{race['raceId']}").get_json()[0]
+
+    assert api.get(f"/api/race/{race['raceId']}").get_json()['name'] == 'Bahrain Grand Prix'
+    assert api.get(f"/api/result/{result['resultId']}").get_json()['driverId'] == result['driverId']
+    assert api.get('/api/circuit/1').get_json()['name'] == 'Albert Park Grand Prix Circuit'
+    assert api.get('/api/constructor/1').get_json()['name'] == 'McLaren'
+    assert api.get('/api/race/0').status_code == 404
+
+
+def test_races_constructor_results_and_career(api):
+    races = api.get('/api/race/all').get_json()['races']
+    constructor = api.get('/api/constructor/find_results/6?year=2010').get_json()
+    career = api.get('/api/driver/1/career').get_json()
+    results = api.get('/api/driver/find_results/1').get_json()['results']
+
+    assert 'Bahrain Grand Prix' in {race['name'] for race in races}
+    assert constructor['name'] == 'Ferrari' and len(constructor['results']) == 38
+    # SQLite contiene tutte le stagioni, mongomock solo SEASONS: la carriera si confronta con i risultati
+    assert career['races'] == len(results)
+    assert career['wins'] == sum(r['positionText'] == '1' for r in results)
+
+
+def result_ids(api) -> list:
+    return [row['_id'] for row in api.get('/api/result/all').get_json()['results']]
+
+
+def test_keyset_pages_cover_every_result_once(api):
+    ids, after = [], None
+    while True:
+        query = '/api/result/all?limit=1000' + (f'&after={after}' if after is not None else '')
+        page = api.get(query).get_json()
+        ids += [row['_id'] for row in page['results']]
+        after = page['next_after']
+        if after is None:
+            break
+
+    assert ids == sorted(result_ids(api))
+
+
+def test_cursor_at_the_end_of_the_data(api):
+    last = max(result_ids(api))
+    before_last = api.get(f'/api/result/all?limit=5&after={last - 1}').get_json()
+
+    assert [row['_id'] for row in before_last['results']] == [last]
+    assert before_last['next_after'] is None
+    assert api.get(f'/api/result/all?limit=5&after={last}').get_json() == {'results': [], 'next_after': None}
+
+
+@pytest.mark.parametrize('query', ['after=abc', 'after=', 'after=abc&format=ndjson'])
+def test_invalid_cursor_is_rejected(api, query):
+    response = api.get(f'/api/result/all?limit=5&{query}')
+
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Invalid cursor'}
+
+
+def test_ndjson_stream(api):
+    page = api.get('/api/result/all?limit=3&after=100').get_json()['results']
+    # Il corpo in streaming va letto prima della richiesta successiva
+    response = api.get('/api/result/all?format=ndjson&limit=3&after=100')
+    body = response.get_data(as_text=True)
+    negotiated = api.get('/api/result/all?limit=3&after=100', headers={'Accept': 'application/x-ndjson'})
+
+    assert response.mimetype == 'application/x-ndjson'
+    # Un documento JSON per riga, ciascuna terminata da \n
+    assert body.endswith('\n') and len(body.splitlines()) == 3
+    assert [json.loads(line) for line in body.splitlines()] == page
+    assert negotiated.mimetype == 'application/x-ndjson' and negotiated.get_data(as_text=True) == body
@@ -0,0 +1,180 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import versions
+from analytics import AnalyticsEngine
+from cache import SingleFlight, memoize, service_cache, single_flight
+from config import Config
+from dimension_cache import DimensionCache
+from models.result import ResultModel
+from service.result_service import ResultService
+from service.season_service import SeasonService
+from versions import VERSIONS_COLLECTION
+
+
+def bump_from_another_worker(db, collection, year=None):
+    # Come versions.bump, ma senza toccare lo snapshot di questo processo
+    scope = {'all': 1} if year is None else {f'years.{year}': 1}
+    db[VERSIONS_COLLECTION].update_one({'_id': collection}, {'$inc': {'v': 1, **scope}}, upsert=True)
+
+
+def test_service_cache_drops_entries_written_by_another_worker(seeded, monkeypatch):
+    monkeypatch.setattr(Config, 'VERSION_CHECK_SECONDS', 0)
+    season_service = SeasonService()
+    assert season_service.find(year=2010)[0].raceCount == 19
+
+    seeded['races'].insert_one({'_id': 9999, 'year': 2010, 'round': 20, 'circuitId': 1, 'name': 'Extra'})
+    assert season_service.find(year=2010)[0].raceCount == 19  # nessuna nuova versione: voce ancora valida
+
+    bump_from_another_worker(seeded, 'races')
+    assert season_service.find(year=2010)[0].raceCount == 20
+
+
+def test_writes_to_one_season_keep_the_other_seasons_cached(seeded, monkeypatch):
+    monkeypatch.setattr(Config, 'VERSION_CHECK_SECONDS', 0)
+    # Contatori già presenti, come in un database in uso: la loro creazione cambia l'epoch
+    versions.bump('results', years=[])
+    season_service = SeasonService()
+    season_service.find_driver_standing(2009)
+    season_service.find_season(2009)
+    season_service.find_season(2010)
+
+    race = seeded['races'].find_one({'year': 2010, 'round': 1})
+    used = {r['driverId'] for r in seeded['results'].find({'raceId': race['_id']})}
+    driver_id = next(d['_id'] for d in seeded['drivers'].find() if d['_id'] not in used)
+    ResultService().save(ResultModel(
+        raceId=race['_id'], driverId=driver_id, constructorId=1, grid=99, positionText='99',
+        positionOrder=99, points=0.0, laps=0, statusId=1
+    ))
+    before = service_cache.stats()
+    season_service.find_driver_standing(2009)
+    season_service.find_season(2009)
+    after = service_cache.stats()
+    assert (after['hits'] - before['hits'], after['stale'] - before['stale']) == (2, 0)
+
+    # Anche la scrittura di un altro worker su 2010 lascia valide le voci del 2009
+    bump_from_another_worker(seeded, 'results', 2010)
+    season_service.find_season(2009)
+    season_service.find_season(2010)
+    final = service_cache.stats()
+    assert (final['hits'] - after['hits'], final['misses'] - after['misses']) == (1, 1)
+
+
+def test_dimension_cache_reloads_when_the_version_changes(seeded, monkeypatch):
+    monkeypatch.setattr(Config, 'VERSION_CHECK_SECONDS', 0)
+    assert DimensionCache().get('drivers', 9999) is None
+
+    seeded['drivers'].insert_one({'_id': 9999, 'forename': 'Nuovo', 'surname': 'Pilota'})
+    bump_from_another_worker(seeded, 'drivers')
+    assert DimensionCache().get('drivers', 9999)['surname'] == 'Pilota'
+
+
+def test_version_snapshot_is_reread_only_after_the_check_interval(seeded, monkeypatch):
+    monkeypatch.setattr(Config, 'VERSION_CHECK_SECONDS', 3600)
+    season_service = SeasonService()
+    season_service.find(year=2010)
+
+    seeded['races'].insert_one({'_id': 9999, 'year': 2010, 'round': 20, 'circuitId': 1, 'name': 'Extra'})
+    bump_from_another_worker(seeded, 'races')
+    assert season_service.find(year=2010)[0].raceCount == 19
+
+
+def test_analytics_engine_reloads_when_results_change(seeded, monkeypatch):
+    pytest.importorskip('numpy')
+    monkeypatch.setattr(Config, 'VERSION_CHECK_SECONDS', 0)
+    leader = AnalyticsEngine().driver_standing(2010)[0]
+    race = seeded['races'].find_one({'year': 2010})
+
+    seeded['results'].insert_one({
+        '_id': 99999, 'raceId': race['_id'], 'driverId': leader['driverId'], 'constructorId': leader['constructorId'],
+        'grid': 99, 'positionText': '99', 'positionOrder': 99, 'points': 100.0, 'laps': 0, 'statusId': 1,
+        'year': 2010, 'round': race['round'], 'circuitId': race['circuitId']
+    })
+    bump_from_another_worker(seeded, 'results')
+    assert AnalyticsEngine().driver_standing(2010)[0]['totalPoints'] == leader['totalPoints'] + 100
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condizione non raggiunta"
+        time.sleep(0.001)
+
+
+def test_single_flight_runs_concurrent_identical_calls_once():
+    single_flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(threading.current_thread().name)
+        started.set()
+        release.wait(5)
+        return 'value'
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        leader = executor.submit(single_flight.do, 'key', compute)
+        started.wait(5)
+        waiters = [executor.submit(single_flight.do, 'key', compute) for _ in range(7)]
+        wait_until(lambda: single_flight.stats()['coalesced'] == 7)
+        release.set()
+        values = [leader.result(5)] + [waiter.result(5) for waiter in waiters]
+
+    assert values == ['value'] * 8
+    assert len(calls) == 1
+    assert single_flight.stats() == {'inFlight': 0, 'computed': 1, 'coalesced': 7}
+
+
+def test_single_flight_propagates_the_leader_exception_to_the_waiters():
+    single_flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def compute():
+        started.set()
+        release.wait(5)
+        raise LookupError('boom')
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        leader = executor.submit(single_flight.do, 'key', compute)
+        started.wait(5)
+        waiters = [executor.submit(single_flight.do, 'key', compute) for _ in range(3)]
+        wait_until(lambda: single_flight.stats()['coalesced'] == 3)
+        release.set()
+        for future in [leader] + waiters:
+            with pytest.raises(LookupError, match='boom'):
+                future.result(5)
+
+    # Il fallimento non resta in memoria: la chiamata successiva ricalcola
+    assert single_flight.do('key', lambda: 'retry') == 'retry'
+
+
+def test_concurrent_misses_run_a_memoized_method_once(seeded):
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    class RaceCounter:
+        @memoize('races', year_arg='year')
+        def count(self, year):
+            calls.append(year)
+            started.set()
+            release.wait(5)
+            return seeded['races'].count_documents({'year': year})
+
+    service = RaceCounter()
+    coalesced = single_flight.stats()['coalesced']
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        leader = executor.submit(service.count, 2010)
+        started.wait(5)
+        waiters = [executor.submit(service.count, year=2010) for _ in range(7)]
+        wait_until(lambda: single_flight.stats()['coalesced'] == coalesced + 7)
+        release.set()
+        values = [leader.result(5)] + [waiter.result(5) for waiter in waiters]
+
+    assert values == [19] * 8
+    assert calls == [2010]
+    # Il risultato condiviso è anche in cache: le chiamate successive non rieseguono il metodo
+    assert service.count(2010) == 19 and calls == [2010]
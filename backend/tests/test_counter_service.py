@@ -0,0 +1,32 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from service.counter_service import CounterService
+
+
+def test_reserve_starts_after_the_highest_existing_id(mongo):
+    mongo['drivers'].insert_many([{'_id': 7}, {'_id': 42}])
+
+    assert CounterService().reserve('drivers', 3) == 43
+    assert CounterService().next_id('drivers') == 46
+
+
+def test_reserve_rejects_empty_blocks(mongo):
+    with pytest.raises(ValueError):
+        CounterService().reserve('drivers', 0)
+
+
+def test_concurrent_reservations_never_overlap(real_mongo):
+    real_mongo['results'].insert_one({'_id': 100})
+    sizes = [1, 2, 5, 10] * 50
+
+    def reserve(count):
+        # Un'istanza per thread, come i worker che creano i propri service
+        first = CounterService().reserve('results', count)
+        return list(range(first, first + count))
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        blocks = list(executor.map(reserve, sizes))
+
+    ids = [id for block in blocks for id in block]
+    assert len(ids) == len(set(ids))
+    assert sorted(ids) == list(range(101, 101 + sum(sizes)))
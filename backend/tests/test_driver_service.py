@@ -0,0 +1,87 @@
+import contextvars
+from types import SimpleNamespace
+import pytest
+from database import Database
+from service import driver_service
+from service.circuit_service import CircuitService
+from service.constructor_service import ConstructorService
+from service.driver_service import DriverService
+from service.race_service import RaceService
+
+request_label = contextvars.ContextVar('request_label', default=None)
+
+
+def test_find_profile_returns_every_section(seeded):
+    profile = DriverService().find_profile(1)
+
+    assert profile['driver']['surname'] == 'Hamilton'
+    assert {race['year'] for race in profile['races']} == {2009, 2010}
+    assert profile['constructors'] and profile['circuits']
+    assert set(profile['timings']) == {'driver', 'races', 'constructors', 'circuits', 'total'}
+
+
+def test_find_profile_reuses_the_section_services(seeded):
+    DriverService().find_profile(1)
+    race_service = driver_service._race_service._get()
+    DriverService().find_profile(1)
+
+    assert driver_service._race_service._get() is race_service
+
+
+def test_find_profile_sections_run_in_the_caller_context(seeded, monkeypatch):
+    seen = []
+
+    def find_by_driver_id(id):
+        seen.append(request_label.get())
+        return []
+
+    monkeypatch.setattr(driver_service, '_circuit_service', SimpleNamespace(find_by_driverId=find_by_driver_id))
+    token = request_label.set('GET /api/driver/1/profile')
+    try:
+        DriverService().find_profile(1)
+    finally:
+        request_label.reset(token)
+
+    assert seen == ['GET /api/driver/1/profile']
+
+
+def baseline_joins(db, driver_id: int) -> tuple:
+    """Races, constructors and circuits of a driver, joined from the results as the $lookup pipelines did."""
+    results = list(db['results'].find({'driverId': driver_id}))
+    races = {r['raceId'] for r in results}
+    circuits = {race['circuitId'] for race in db['races'].find({'_id': {'$in': list(races)}})}
+    return races, {r['constructorId'] for r in results}, circuits
+
+
+@pytest.mark.parametrize('driver_id', [1, 4, 20, 9999])
+def test_participation_lookups_match_the_joins(seeded, driver_id):
+    races = RaceService().find_all_races_by_driverId(driver_id)
+    constructors = ConstructorService().find_constructors_by_driverId(driver_id)
+    circuits = CircuitService().find_by_driverId(driver_id)
+
+    found = ({r.id for r in races}, {c.id for c in constructors}, {c.id for c in circuits})
+    assert found == baseline_joins(seeded, driver_id)
+    assert len(races) == len(found[0]) and len(constructors) == len(found[1]) and len(circuits) == len(found[2])
+
+
+def test_participation_lookups_read_the_secondary_handle(seeded, monkeypatch):
+    handles = []
+    get_collection = Database.get_collection
+
+    def primary(self, name=None):
+        handles.append(('primary', name))
+        return get_collection(self, name)
+
+    def secondary(self, name):
+        handles.append(('secondary', name))
+        return get_collection(self, name)  # mongomock ignora la read preference
+    monkeypatch.setattr(Database, 'get_collection', primary)
+    monkeypatch.setattr(Database, 'get_secondary_collection', secondary)
+    services = RaceService(), ConstructorService(), CircuitService()
+    handles.clear()
+
+    services[0].find_all_races_by_driverId(1)
+    services[1].find_constructors_by_driverId(1)
+    services[2].find_by_driverId(1)
+
+    assert [handle for handle in handles if handle[1] == 'results'] == [('secondary', 'results')] * 3
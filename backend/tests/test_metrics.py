@@ -0,0 +1,45 @@
+import metrics
+
+
+def test_request_records_mongo_latency_against_the_service_method(client, listen_to_reads):
+    listen_to_reads([metrics.command_metrics], duration_ms=3)
+    labels = ('find', 'constructors', 'ConstructorService.find_by_id')
+    before = metrics.mongo_duration.count(*labels)
+
+    assert client.get('/api/constructor/1').status_code == 200
+
+    assert metrics.mongo_duration.count(*labels) == before + 1
+
+
+def test_metrics_endpoint(client, listen_to_reads):
+    listen_to_reads([metrics.command_metrics])
+    client.get('/api/constructor/1')
+
+    response = client.get('/api/metrics')
+    lines = response.get_data(as_text=True).splitlines()
+
+    assert response.mimetype == 'text/plain'
+    assert '# TYPE f1_http_request_duration_seconds histogram' in lines
+    assert '# TYPE f1_mongo_command_failures_total counter' in lines
+    request_count = 'f1_http_request_duration_seconds_count{endpoint="constructor.find_by_constructor_id",' \
+                    'method="GET",status="200"}'
+    assert any(line.startswith(request_count + ' ') for line in lines)
+    assert any(line.startswith('f1_mongo_command_duration_seconds_bucket{command="find",collection="constructors",'
+                               'service="ConstructorService.find_by_id",le="0.001"}') for line in lines)
+    # La richiesta conclusa non è più in corso, quella a /api/metrics sì
+    assert 'f1_http_requests_in_flight{endpoint="constructor.find_by_constructor_id"} 0' in lines
+    assert 'f1_http_requests_in_flight{endpoint="prometheus_metrics"} 1' in lines
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.Histogram('test_seconds', 'Prova', ('name',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, 'a"b')
+
+    assert histogram.render()[2:] == [
+        'test_seconds_bucket{name="a\\"b",le="0.1"} 1',
+        'test_seconds_bucket{name="a\\"b",le="1.0"} 2',
+        'test_seconds_bucket{name="a\\"b",le="+Inf"} 3',
+        'test_seconds_sum{name="a\\"b"} 5.55',
+        'test_seconds_count{name="a\\"b"} 3',
+    ]
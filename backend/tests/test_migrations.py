@@ -0,0 +1,94 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pymongo import ASCENDING
+import migrations
+from migrations import (INDEXES, LOCK_COLLECTION, SUPERSEDED_INDEXES, apply_migrations, drop_superseded_indexes,
+                        ensure_indexes, migration_lock)
+
+
+def counting_migrations(monkeypatch, delay=0.0):
+    """Replace MIGRATIONS with two migrations that record every run."""
+    runs = []
+
+    def migrate(db):
+        runs.append(threading.current_thread().name)
+        time.sleep(delay)
+
+    monkeypatch.setattr(migrations, 'MIGRATIONS', [(1, 'prima', migrate), (2, 'seconda', migrate)])
+    monkeypatch.setattr(migrations, 'ensure_indexes', lambda db: None)
+    return runs
+
+
+def test_second_holder_waits_for_the_release(mongo):
+    acquired = threading.Event()
+    order = []
+
+    def second():
+        acquired.wait(5)
+        with migration_lock(mongo, poll_seconds=0.01):
+            order.append('second')
+
+    thread = threading.Thread(target=second)
+    thread.start()
+    with migration_lock(mongo):
+        acquired.set()
+        time.sleep(0.1)
+        order.append('first')
+    thread.join(5)
+
+    assert order == ['first', 'second']
+    assert mongo[LOCK_COLLECTION].count_documents({}) == 0
+
+
+def test_expired_lease_is_taken_over(mongo):
+    mongo[LOCK_COLLECTION].insert_one({
+        '_id': 'migrations', 'owner': 'worker morto',
+        'expiresAt': datetime.now(timezone.utc) - timedelta(seconds=1)
+    })
+
+    with migration_lock(mongo, poll_seconds=0.01) as owner:
+        assert mongo[LOCK_COLLECTION].find_one({'_id': 'migrations'})['owner'] == owner
+
+
+def test_applied_migrations_are_not_run_again(mongo, monkeypatch):
+    runs = counting_migrations(monkeypatch)
+
+    assert apply_migrations(mongo) == [1, 2]
+    assert apply_migrations(mongo) == []
+    assert len(runs) == 2
+
+
+def test_concurrent_workers_run_each_migration_once(real_mongo, monkeypatch):
+    runs = counting_migrations(monkeypatch, delay=0.2)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        executed = list(executor.map(lambda _: apply_migrations(real_mongo), range(4)))
+
+    assert len(runs) == 2
+    assert sorted(executed, key=len) == [[], [], [], [1, 2]]
+
+
+def test_superseded_indexes_are_prefixes_of_declared_ones():
+    for collection_name, names in SUPERSEDED_INDEXES.items():
+        declared = ['_'.join(f'{field}_{direction}' for field, direction in keys)
+                    for keys, _ in INDEXES[collection_name]]
+        for name in names:
+            assert any(index.startswith(name + '_') for index in declared), name
+
+
+def test_superseded_indexes_are_dropped(mongo):
+    results = mongo['results']
+    for name in SUPERSEDED_INDEXES['results']:
+        fields = name.split('_')[::2]
+        results.create_index([(field, ASCENDING) for field in fields])
+    ensure_indexes(mongo)
+
+    drop_superseded_indexes(mongo)
+    drop_superseded_indexes(mongo)  # già eliminati: nessun errore
+
+    remaining = set(results.index_information())
+    assert not remaining & set(SUPERSEDED_INDEXES['results'])
+    assert 'driverId_1_year_1_raceId_1_constructorId_1_circuitId_1' in remaining
+    assert 'constructorId_1_year_1' in remaining
@@ -0,0 +1,34 @@
+import pytest
+from pymongo import MongoClient
+import plan_check
+from cache import service_cache
+from config import Config
+from database import Database
+from migrations import apply_migrations
+
+
+@pytest.fixture
+def loaded_mongo(seeded_real_mongo, monkeypatch):
+    """
+    The scratch database of real_mongo, seeded with the SEASONS data and migrated (indexes included),
+    behind the Database singleton through a client with a plan_check recorder. real_mongo drops it
+    at teardown. Skipped when no server answers.
+    """
+    apply_migrations(seeded_real_mongo)
+    recorder = plan_check.QueryRecorder()
+    # conftest sostituisce solo database.MongoClient: questo è il client reale
+    client = MongoClient(Config.MONGODB_URI, serverSelectionTimeoutMS=500, event_listeners=[recorder])
+    monkeypatch.setattr(service_cache, 'max_entries', 0)
+    previous = Database()._client
+    Database()._client = client
+    Database()._db = client[seeded_real_mongo.name]
+    try:
+        yield recorder
+    finally:
+        Database()._client = previous
+        Database()._db = seeded_real_mongo
+        client.close()
+
+
+def test_service_queries_use_indexes(loaded_mongo):
+    assert plan_check.run(loaded_mongo)
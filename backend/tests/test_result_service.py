@@ -0,0 +1,96 @@
+import pytest
+from pymongo.collection import Collection
+from pymongo.errors import PyMongoError
+from database import Database
+from models.result import ResultModel
+from service.result_service import ResultService
+
+# Collezioni scritte da save/save_many, ripristinate tra i due percorsi del confronto
+WRITTEN = ('results', 'driver_standings', 'constructor_standings', 'counters', 'collection_versions')
+
+
+def batch(db):
+    """Two new results in the first 2010 race, one in the first 2009 race and a points change of an existing row."""
+    rows = []
+    for year, count in ((2010, 2), (2009, 1)):
+        race = db['races'].find_one({'year': year, 'round': 1})
+        used = set(db['results'].distinct('driverId', {'raceId': race['_id']}))
+        drivers = [d['_id'] for d in db['drivers'].find({}, {'_id': 1}).sort('_id', 1) if d['_id'] not in used]
+        rows += [
+            ResultModel(raceId=race['_id'], driverId=driver_id, constructorId=1, grid=90 + i,
+                        positionText=str(90 + i), positionOrder=90 + i, points=3.0, laps=10, statusId=1)
+            for i, driver_id in enumerate(drivers[:count])
+        ]
+    winner = db['results'].find_one({'year': 2010, 'positionText': '1'})
+    rows.append(ResultModel(**{**winner, 'points': winner['points'] + 7}))
+    return rows
+
+
+def standings(db) -> list:
+    return sorted(
+        db['driver_standings'].find({}, {'_id': 0}),
+        key=lambda row: (row['year'], row['driverId'], row['constructorId'])
+    ) + sorted(
+        db['constructor_standings'].find({}, {'_id': 0}),
+        key=lambda row: (row['year'], row['constructorId'])
+    )
+
+
+def test_save_many_matches_saving_row_by_row(seeded):
+    saved = {name: list(seeded[name].find()) for name in WRITTEN}
+    rows = batch(seeded)
+
+    for result in rows:
+        ResultService().save(result)
+    row_by_row = standings(seeded), seeded['results'].count_documents({})
+
+    for name, docs in saved.items():
+        seeded[name].delete_many({})
+        if docs:
+            seeded[name].insert_many(docs)
+    ResultService().save_many(rows)
+
+    assert (standings(seeded), seeded['results'].count_documents({})) == row_by_row
+
+
+@pytest.mark.parametrize('change, message', [
+    (lambda rows: {'driverId': rows[1].driverId, 'grid': 80, 'positionOrder': 80}, 'pilota'),  # nel batch
+    (lambda rows: {'grid': 1}, 'starting position'),  # già salvata
+    (lambda rows: {'_id': 999999}, 'not found'),  # aggiornamento di un id inesistente
+])
+def test_invalid_batches_write_nothing(seeded, change, message):
+    rows = batch(seeded)
+    rows[0] = ResultModel(**{**rows[0].model_dump(by_alias=True), **change(rows)})
+    before = standings(seeded), seeded['results'].count_documents({})
+
+    with pytest.raises(ValueError, match=message):
+        ResultService().save_many(rows)
+
+    assert (standings(seeded), seeded['results'].count_documents({})) == before
+
+
+def test_failed_batch_is_rolled_back_in_a_transaction(real_mongo, monkeypatch):
+    if not Database().supports_transactions():
+        pytest.skip("MongoDB senza replica set: niente transazioni")
+    real_mongo['races'].insert_one({'_id': 1, 'year': 2010, 'round': 1, 'circuitId': 1})
+    real_mongo['results'].insert_one({'_id': 1, 'raceId': 1, 'driverId': 1, 'constructorId': 1, 'grid': 1,
+                                      'positionText': '1', 'positionOrder': 1, 'points': 25.0, 'laps': 50,
+                                      'statusId': 1, 'year': 2010, 'round': 1, 'circuitId': 1})
+    bulk_write = Collection.bulk_write
+
+    def write_then_fail(self, *args, **kwargs):
+        bulk_write(self, *args, **kwargs)
+        raise PyMongoError('interrotto dopo la scrittura')
+
+    monkeypatch.setattr(Collection, 'bulk_write', write_then_fail)
+    rows = [
+        ResultModel(raceId=1, driverId=2, constructorId=1, grid=2, positionText='2', positionOrder=2,
+                    points=18.0, laps=50, statusId=1),
+        ResultModel(_id=1, raceId=1, driverId=1, constructorId=1, grid=1, positionText='1', positionOrder=1,
+                    points=0.0, laps=50, statusId=1),
+    ]
+
+    with pytest.raises(PyMongoError):
+        ResultService().save_many(rows)
+
+    assert list(real_mongo['results'].find({}, {'_id': 1, 'points': 1})) == [{'_id': 1, 'points': 25.0}]
@@ -0,0 +1,12 @@
+from service.season_service import SeasonService
+
+
+def test_shared_drive_shows_the_first_winning_row(seeded):
+    race = seeded['races'].find_one({'year': 2010, 'round': 1})
+    winner = seeded['results'].find_one({'raceId': race['_id'], 'positionText': '1'})
+    # Guida condivisa come nelle gare 780, 784 e 828: due righe vincenti per la stessa gara
+    seeded['results'].insert_one({**winner, '_id': 99999, 'driverId': 1})
+
+    season = SeasonService().find_season(2010)
+
+    assert season.races[0]['winner'] == 'Fernando Alonso'
@@ -0,0 +1,111 @@
+import time
+from collections import deque
+import pytest
+from service.constructor_service import ConstructorService
+from slow_queries import SlowQueryLog, slow_query_log, summarize_explain
+
+EXPLAIN = {
+    'queryPlanner': {'winningPlan': {'stage': 'FETCH', 'inputStage': {'stage': 'IXSCAN', 'indexName': '_id_'}}},
+    'executionStats': {'totalDocsExamined': 1, 'totalKeysExamined': 1, 'nReturned': 1, 'executionTimeMillis': 0},
+}
+
+
+def wait_for_entries(log: SlowQueryLog, count: int) -> list:
+    # Le voci campionate vengono scritte dal thread di explain
+    deadline = time.monotonic() + 5
+    while len(log.entries) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return list(log.entries)
+
+
+@pytest.mark.parametrize('duration_ms, threshold_ms, logged', [
+    (10, 5, True),
+    (5, 5, True),  # la soglia è inclusa
+    (1, 5, False),
+    (10, -1, False),  # soglia negativa: log disattivato
+])
+def test_threshold(seeded, listen_to_reads, duration_ms, threshold_ms, logged):
+    log = SlowQueryLog(threshold_ms=threshold_ms, sample_rate=0, stdout=False)
+    listen_to_reads([log], duration_ms=duration_ms)
+
+    ConstructorService().find_by_id(1)
+
+    assert len(log.entries) == logged
+    if logged:
+        entry = log.entries[0]
+        assert (entry['service'], entry['command'], entry['collection']) == \
+            ('ConstructorService.find_by_id', 'find', 'constructors')
+        assert entry['parameters'] == {'filter': {'_id': 1}}
+        assert entry['durationMs'] == duration_ms
+        assert 'explain' not in entry
+
+
+def test_sampled_queries_are_explained_off_the_request_thread(seeded, listen_to_reads, monkeypatch):
+    log = SlowQueryLog(threshold_ms=0, sample_rate=1, stdout=False)
+    explained = []
+
+    def explain(client, command, database_name):
+        explained.append(command)
+        return EXPLAIN
+    monkeypatch.setattr(log, 'explain', explain)
+    listen_to_reads([log])
+
+    ConstructorService().find_by_id(1)
+    entries = wait_for_entries(log, 1)
+
+    assert explained == [{'find': 'constructors', 'filter': {'_id': 1}}]
+    assert entries[0]['explain']['plan'] == 'IXSCAN(_id_) > FETCH'
+    assert entries[0]['explain']['docsExamined'] == 1
+    assert log.stats()['explained'] == 1
+
+
+def test_explain_failures_are_counted(seeded, listen_to_reads, monkeypatch):
+    log = SlowQueryLog(threshold_ms=0, sample_rate=1, stdout=False)
+
+    def explain(client, command, database_name):
+        raise RuntimeError('explain non supportato')
+    monkeypatch.setattr(log, 'explain', explain)
+    listen_to_reads([log])
+
+    ConstructorService().find_by_id(1)
+    entries = wait_for_entries(log, 1)
+
+    assert entries[0]['explainError'] == 'explain non supportato'
+    assert log.stats()['explainErrors'] == 1
+
+
+@pytest.mark.parametrize('stdout', [True, False])
+def test_stdout_can_be_switched_off(seeded, listen_to_reads, capsys, stdout):
+    log = SlowQueryLog(threshold_ms=0, sample_rate=0, stdout=stdout)
+    listen_to_reads([log])
+
+    ConstructorService().find_by_id(1)
+
+    printed = [line for line in capsys.readouterr().out.splitlines() if line.startswith('SLOW QUERY {')]
+    assert len(printed) == stdout
+    assert len(log.entries) == 1
+
+
+def test_summarize_explain_of_an_aggregate():
+    explain = {'stages': [{'$cursor': EXPLAIN}, {'$group': {}}, {'$sort': {}}]}
+
+    summary = summarize_explain(explain)
+
+    assert summary['plan'] == 'IXSCAN(_id_) > FETCH'
+    assert summary['pipelineStages'] == ['$cursor', '$group', '$sort']
+
+
+def test_slow_queries_endpoint(client, listen_to_reads, monkeypatch):
+    monkeypatch.setattr(slow_query_log, 'threshold_ms', 0)
+    monkeypatch.setattr(slow_query_log, 'sample_rate', 0)
+    monkeypatch.setattr(slow_query_log, 'stdout', False)
+    monkeypatch.setattr(slow_query_log, 'entries', deque(maxlen=100))
+    listen_to_reads([slow_query_log])
+
+    client.get('/api/constructor/1')
+    stats = client.get('/api/slow-queries').get_json()
+
+    assert (stats['thresholdMs'], stats['explainSampleRate']) == (0, 0)
+    assert {'slow', 'explained', 'explainSkipped', 'explainErrors'} <= stats.keys()
+    services = [entry['service'] for entry in stats['recent']]
+    assert 'ConstructorService.find_by_id' in services
@@ -0,0 +1,52 @@
+import pytest
+from config import Config
+from models.result import ResultModel
+from service.result_service import ResultService
+from service.season_service import SeasonService
+from service.standing_service import StandingService
+
+
+def leader_result(db, year):
+    """A result of the season leader, to be rewritten with more points."""
+    leader = SeasonService().find_driver_standing(year)[0]
+    race_ids = [race['_id'] for race in db['races'].find({'year': year})]
+    result = db['results'].find_one({'raceId': {'$in': race_ids}, 'driverId': leader['driverId'],
+                                     'constructorId': leader['constructorId']})
+    return leader, result
+
+
+@pytest.mark.parametrize('engine', ['', 'driver_standing'])
+def test_read_during_a_result_write_is_not_cached(seeded, monkeypatch, engine):
+    monkeypatch.setattr(Config, 'ANALYTICS_ENGINE', engine)
+    leader, result = leader_result(seeded, 2010)
+    reads = []
+    apply_driver_deltas = StandingService._apply_driver_deltas
+
+    def read_then_apply(self, results, years, sign):
+        # Una richiesta concorrente legge mentre la scrittura è in corso
+        reads.append(SeasonService().find_driver_standing(2010)[0]['totalPoints'])
+        apply_driver_deltas(self, results, years, sign)
+
+    monkeypatch.setattr(StandingService, '_apply_driver_deltas', read_then_apply)
+    ResultService().save(ResultModel(**{**result, 'points': result['points'] + 100}))
+
+    assert reads
+    assert SeasonService().find_driver_standing(2010)[0]['totalPoints'] == leader['totalPoints'] + 100
+
+
+def test_etag_is_bumped_after_the_standings_are_written(seeded, client, monkeypatch):
+    leader, result = leader_result(seeded, 2010)
+    window = []
+    apply_driver_deltas = StandingService._apply_driver_deltas
+
+    def get_then_apply(self, results, years, sign):
+        # Un client chiede la classifica mentre la scrittura è in corso
+        window.append(client.get('/api/season/standing?year=2010'))
+        apply_driver_deltas(self, results, years, sign)
+
+    monkeypatch.setattr(StandingService, '_apply_driver_deltas', get_then_apply)
+    ResultService().save(ResultModel(**{**result, 'points': result['points'] + 100}))
+
+    response = client.get('/api/season/standing?year=2010', headers={'If-None-Match': window[0].headers['ETag']})
+    assert response.status_code == 200
+    assert response.get_json()[0]['totalPoints'] == leader['totalPoints'] + 100
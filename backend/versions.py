@@ -0,0 +1,126 @@
+"""
+Contatori di versione per collezione e GET condizionali (ETag / If-None-Match).
+
+Ogni percorso di scrittura dei service incrementa la versione delle collezioni che modifica;
+l'ETag di una risposta deriva dalle versioni delle collezioni da cui dipende, quindi un
+If-None-Match ancora valido riceve 304 senza chiamare il service.
+I contatori stanno in MongoDB così da essere condivisi da tutti i processi del server.
+
+Le cache in memoria di ogni processo (ServiceCache, DimensionCache, AnalyticsEngine) confrontano
+le proprie voci con snapshot(): una copia locale dei contatori riletta al più ogni
+VERSION_CHECK_SECONDS, così una scrittura eseguita da un altro worker le rende obsolete
+entro quell'intervallo invece che alla scadenza del TTL.
+Oltre al contatore della collezione ogni documento tiene un contatore per anno ('years') e uno
+delle scritture non legate a un anno ('all'): una voce di un anno resta valida finché non
+cambiano questi due, come l'invalidazione locale per (collezione, anno) di ServiceCache.
+"""
+import hashlib
+import threading
+import time
+import uuid
+from functools import wraps
+from typing import Optional
+from flask import make_response, request
+from config import Config
+from database import Database
+
+VERSIONS_COLLECTION = 'collection_versions'
+
+# Copia locale dei contatori di tutte le collezioni (vedi snapshot)
+_snapshot = {'versions': {}, 'expires_at': float('-inf')}
+_snapshot_lock = threading.Lock()
+
+
+def bump(*collections: str, years=None, db=None) -> None:
+    """
+    Increment the version of each collection (creating the counter with a random epoch if missing).
+    `years` scopes the write to those seasons; without it the write may touch every year.
+    `db` defaults to the application database (migrations pass the one they run on).
+    """
+    versions = db[VERSIONS_COLLECTION] if db is not None else Database().get_collection(VERSIONS_COLLECTION)
+    increments = {'v': 1}
+    if years is None:
+        increments['all'] = 1
+    else:
+        increments.update({f'years.{year}': 1 for year in years})
+    for collection in collections:
+        versions.update_one(
+            {'_id': collection},
+            {'$inc': increments, '$setOnInsert': {'epoch': uuid.uuid4().hex}},
+            upsert=True
+        )
+    # Le scritture di questo processo sono visibili subito alle sue cache
+    expire_snapshot()
+
+
+def version_label(doc: dict, year: Optional[int] = None) -> str:
+    """
+    'epoch:version' of a collection_versions document; for a year, 'epoch:all:year version',
+    which changes only with writes to that year or to no year in particular.
+    """
+    if year is None:
+        return f"{doc.get('epoch', '')}:{doc.get('v', 0)}"
+    return f"{doc.get('epoch', '')}:{doc.get('all', 0)}:{doc.get('years', {}).get(str(year), 0)}"
+
+
+def snapshot() -> dict:
+    """
+    Return {collection: collection_versions document} for every collection, re-read from the
+    database at most every VERSION_CHECK_SECONDS (one query per process, whatever the number of callers).
+    """
+    if _snapshot['expires_at'] > time.monotonic():
+        return _snapshot['versions']
+    with _snapshot_lock:
+        if _snapshot['expires_at'] <= time.monotonic():
+            cursor = Database().get_collection(VERSIONS_COLLECTION).find({})
+            _snapshot['versions'] = {doc['_id']: doc for doc in cursor}
+            _snapshot['expires_at'] = time.monotonic() + Config.VERSION_CHECK_SECONDS
+        return _snapshot['versions']
+
+
+def stamp(collections, year: Optional[int] = None) -> tuple:
+    """
+    Versions of the given collections in the local snapshot, scoped to `year` when given:
+    a cached value is valid while its stamp is unchanged.
+    """
+    versions = snapshot()
+    return tuple(version_label(versions.get(name, {}), year) for name in collections)
+
+
+def expire_snapshot() -> None:
+    with _snapshot_lock:
+        _snapshot['expires_at'] = float('-inf')
+
+
+def current(collections) -> dict:
+    """Return {collection: 'epoch:version'} with a single query."""
+    cursor = Database().get_collection(VERSIONS_COLLECTION).find({'_id': {'$in': list(collections)}})
+    return {doc['_id']: version_label(doc) for doc in cursor}
+
+
+def compute_etag(collections) -> str:
+    versions = current(collections)
+    state = '|'.join(f"{name}={versions.get(name, '0')}" for name in sorted(collections))
+    return hashlib.sha1(state.encode()).hexdigest()
+
+
+def conditional(*collections: str):
+    """
+    Route decorator: add ETag and Cache-Control to successful responses and answer 304
+    to a matching If-None-Match without running the view.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = compute_etag(collections)
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = Config.HTTP_CACHE_CONTROL
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,7 @@
+"""
+Entry point WSGI di produzione:
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+from app import create_app
+
+app = create_app()
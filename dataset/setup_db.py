@@ -1,14 +1,35 @@
 import asyncio
 import os
+import sys
+import time
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
 import pandas as pd
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from migrations import apply_migrations
+
 MONGODB_URI = "mongodb://localhost:27017"
 DATABASE_NAME = "F1_DB"
 PATH_DATASET = './dataset/cleaned'
 
 id_fields = {'constructors': 'constructorId', 'drivers': 'driverId', 'races': 'raceId', 'results': 'resultId', 'circuits': 'circuitId'}
 
+# Tipi espliciti: evitano l'inferenza di pandas e restano coerenti tra un chunk e l'altro
+# (es. positionText contiene sia numeri che 'R', 'D', ...)
+dtypes = {
+    'circuits': {'circuitId': 'int64', 'circuitRef': str, 'name': str, 'location': str, 'country': str, 'url': str},
+    'constructors': {'constructorId': 'int64', 'constructorRef': str, 'name': str, 'nationality': str, 'url': str},
+    'drivers': {'driverId': 'int64', 'driverRef': str, 'forename': str, 'surname': str, 'dob': str, 'nationality': str, 'url': str},
+    'races': {'raceId': 'int64', 'year': 'int64', 'round': 'int64', 'circuitId': 'int64', 'name': str, 'date': str, 'url': str},
+    'results': {
+        'resultId': 'int64', 'raceId': 'int64', 'driverId': 'int64', 'constructorId': 'int64', 'grid': 'int64',
+        'positionText': str, 'positionOrder': 'int64', 'points': 'float64', 'laps': 'int64', 'statusId': 'int64'
+    }
+}
+
+CHUNK_SIZE = 5000
+
 def find_files():
      # Verifica se la cartella esiste
     if not os.path.exists(PATH_DATASET):
@@ -41,45 +62,60 @@ def find_files():
     except Exception as e:
         print(f"Errore imprevisto: {e}")
     
+def chunk_to_records(chunk, id_field):
+    """Converte un chunk del CSV in documenti pronti per MongoDB"""
+    # Converti NaN in None per MongoDB
+    chunk = chunk.astype(object).where(pd.notnull(chunk), None)
+    if id_field and id_field in chunk.columns:
+        chunk = chunk.rename(columns={id_field: '_id'})
+    return chunk.to_dict('records')
+
 async def load_csv_to_mongodb(client, db, file_path, collection_name):
-    """Carica un singolo file CSV in MongoDB"""
+    """Carica un singolo file CSV in MongoDB a chunk, con insert_many non ordinati"""
     try:
-        print(f"\nCaricamento {file_path} nella collezione '{collection_name}'...")
-        
-        # Leggi il CSV
-        df = pd.read_csv(file_path)
-        print(f"Righe nel CSV: {len(df)}")
-        print(f"Colonne: {list(df.columns)}")
-        
-        # Converti NaN in None per MongoDB
-        df = df.where(pd.notnull(df), None)
+        print(f"Caricamento {file_path} nella collezione '{collection_name}'...")
+        start = time.perf_counter()
 
-        id_field = id_fields.get(collection_name)
-        if id_field and id_field in df.columns:
-            df.rename(columns={id_field: '_id'}, inplace=True)
-        
-        # Converti DataFrame in lista di dizionari
-        records = df.to_dict('records')
-        
-        # Ottieni la collezione
+        # Ottieni la collezione ed elimina quella esistente se presente
         collection = db[collection_name]
-        
-        # Elimina la collezione esistente se presente
         await collection.drop()
-        print(f"Collezione '{collection_name}' eliminata se esistente")
-        
-        # Inserisci i dati
-        if records:
-            result = await collection.insert_many(records)
-            print(f"Inseriti {len(result.inserted_ids)} documenti in '{collection_name}'")            
-            return True
-        else:
+
+        id_field = id_fields.get(collection_name)
+        reader = pd.read_csv(file_path, dtype=dtypes.get(collection_name), chunksize=CHUNK_SIZE)
+
+        # Il parsing del chunk successivo (in un thread) si sovrappone all'inserimento del precedente
+        inserted = 0
+        pending = None
+        while True:
+            chunk = await asyncio.to_thread(next, reader, None)
+            if pending is not None:
+                result = await pending
+                inserted += len(result.inserted_ids)
+            if chunk is None:
+                break
+            records = chunk_to_records(chunk, id_field)
+            pending = asyncio.ensure_future(collection.insert_many(records, ordered=False))
+
+        elapsed = time.perf_counter() - start
+        if not inserted:
             print(f"Nessun record da inserire per '{collection_name}'")
-            return False
-            
+            return 0
+
+        print(f"Inseriti {inserted} documenti in '{collection_name}' in {elapsed:.2f}s ({inserted / elapsed:,.0f} righe/s)")
+        return inserted
+
     except Exception as e:
         print(f"Errore durante il caricamento di {file_path}: {e}")
-        return False
+        return 0
+
+def run_migrations():
+    """Applica indici e migrazioni del backend sui dati appena caricati"""
+    sync_client = MongoClient(MONGODB_URI)
+    try:
+        executed = apply_migrations(sync_client[DATABASE_NAME], reset=True)
+        print(f"Indici creati, migrazioni eseguite: {executed}")
+    finally:
+        sync_client.close()
 
 async def setup_database():
     print("Connessione a MongoDB...")
@@ -97,16 +133,27 @@ async def setup_database():
         files = find_files()
         print(f"\nInizio caricamento di {len(files)} file CSV...")
         
-        # Carica ogni file CSV
-        success_count = 0
-        for filename in files:
-            file_path = os.path.join(PATH_DATASET, filename)
-            collection_name = filename.split('_')[0]
-            
-            success = await load_csv_to_mongodb(client, db, file_path, collection_name)
-            if success:
-                success_count += 1
-        
+        # Carica i file CSV in parallelo
+        start = time.perf_counter()
+        counts = await asyncio.gather(*[
+            load_csv_to_mongodb(client, db, os.path.join(PATH_DATASET, filename), filename.split('_')[0])
+            for filename in files
+        ])
+        success_count = sum(1 for count in counts if count)
+        elapsed = time.perf_counter() - start
+        total = sum(counts)
+        print(f"\nTotale: {total} documenti in {elapsed:.2f}s ({total / elapsed:,.0f} righe/s)")
+
+        # Classifiche dei dati precedenti: la migrazione 3 le materializza di nuovo dai risultati caricati
+        await db["driver_standings"].drop()
+        await db["constructor_standings"].drop()
+
+        # Nuovi dati: i contatori di versione ripartono con un nuovo epoch, invalidando gli ETag
+        await db["collection_versions"].drop()
+
+        # Indici secondari e migrazioni, dopo il caricamento massivo
+        await asyncio.to_thread(run_migrations)
+
         print(f"\n{'='*50}")
         print(f"Caricamento completato!")
         print(f"File elaborati con successo: {success_count}/{len(files)}")
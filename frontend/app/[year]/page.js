@@ -1,7 +1,7 @@
 "use client";
 
 import React, { useState, useEffect, useMemo, useCallback } from "react";
-import { Users, MapPin } from "lucide-react";
+import { Users, MapPin, Trophy } from "lucide-react";
 import { useParams, useRouter } from "next/navigation";
 import Link from "next/link";
 import toast from "react-hot-toast";
@@ -12,17 +12,22 @@ import AddRaceResultsModal from "@/components/AddRaceResultsModal";
 import ConfirmDeleteModal from "@/components/ConfirmDeleteModal";
 import LoadingSpinner from "@/components/LoadingSpinner";
 import DriverStandingsTable from "@/components/DriverStandingsTable";
+import ConstructorStandingsTable from "@/components/ConstructorStandingsTable";
 import HeroSectionSeason from "@/components/HeroSectionSeason";
 import SeasonStats from "@/components/SeasonStats";
 import RaceCalendarTable from "@/components/RaceCalendarTable";
 
-import { findSeason, findSeasonDriverStanding } from "@/lib/season";
+import {
+  findSeason,
+  findSeasonDriverStanding,
+  findSeasonConstructorStanding,
+} from "@/lib/season";
 import { deleteRace, findRace } from "@/lib/race";
 import { deleteResult, findResult, getRaceStandigs } from "@/lib/result";
 
 /**
  * SeasonDetail
- * Displays season overview, driver standings, and race calendar.
+ * Displays season overview, driver and constructor standings, and race calendar.
  * Handles CRUD operations for races and race results.
  */
 const SeasonDetail = () => {
@@ -32,6 +37,7 @@ const SeasonDetail = () => {
   // Data
   const [seasonData, setSeasonData] = useState(null);
   const [driverStandings, setDriverStandings] = useState([]);
+  const [constructorStandings, setConstructorStandings] = useState([]);
   const [races, setRaces] = useState([]);
   const [raceResults, setRaceResults] = useState({});
 
@@ -56,7 +62,7 @@ const SeasonDetail = () => {
   const [raceToUpdate, setRaceToUpdate] = useState(null);
 
   /**
-   * Fetch season info and driver standings.
+   * Fetch season info, driver and constructor standings.
    */
   const loadSeasonData = useCallback(async () => {
     setLoading(true);
@@ -66,10 +72,14 @@ const SeasonDetail = () => {
         toast.error("Season not found.");
         return router.back();
       }
-      const standings = await findSeasonDriverStanding(year);
+      const [standings, teamStandings] = await Promise.all([
+        findSeasonDriverStanding(year),
+        findSeasonConstructorStanding(year),
+      ]);
       setSeasonData(season);
       setRaces(season.races);
       setDriverStandings(standings);
+      setConstructorStandings(teamStandings);
     } catch (error) {
       console.error("Failed to load season data:", error);
       toast.error("Failed to load season data.");
@@ -285,7 +295,7 @@ const SeasonDetail = () => {
       />
       <SeasonStats seasonStats={seasonStats} />
 
-      {/* Drivers vs Races Tabs */}
+      {/* Drivers, Constructors and Races Tabs */}
       <section className="py-12">
         <div className="max-w-7xl mx-auto px-4">
           <div className="flex border-b mb-8">
@@ -300,6 +310,17 @@ const SeasonDetail = () => {
               <Users className="w-4 h-4 inline mr-2" />
               Driver Standings
             </button>
+            <button
+              onClick={() => setActiveTab("constructors")}
+              className={`px-6 py-3 font-medium text-sm border-b-2 transition ${
+                activeTab === "constructors"
+                  ? "border-red-600 text-red-600"
+                  : "border-transparent text-gray-500 hover:text-gray-700"
+              }`}
+            >
+              <Trophy className="w-4 h-4 inline mr-2" />
+              Constructor Standings
+            </button>
             <button
               onClick={() => setActiveTab("races")}
               className={`px-6 py-3 font-medium text-sm border-b-2 transition ${
@@ -315,6 +336,10 @@ const SeasonDetail = () => {
 
           {activeTab === "drivers" ? (
             <DriverStandingsTable driverStandings={driverStandings} />
+          ) : activeTab === "constructors" ? (
+            <ConstructorStandingsTable
+              constructorStandings={constructorStandings}
+            />
           ) : (
             <RaceCalendarTable
               year={year}
@@ -9,13 +9,10 @@ import {
   X,
 } from "lucide-react";
 import Header from "@/components/Header";
-import { findDriverResults } from "@/lib/driver";
+import { findDriverProfile } from "@/lib/driver";
 import { useRouter, useParams } from "next/navigation";
 import toast from "react-hot-toast";
 import FlagByNationality from "@/components/FlagByNationality";
-import { findRacesByDriverId } from "@/lib/race";
-import { findConstructorsByDriverId } from "@/lib/constructor";
-import { findCircuitsByDriverId } from "@/lib/circuit";
 
 const DriverDetailsPage = () => {
   const router = useRouter();
@@ -57,13 +54,12 @@ const DriverDetailsPage = () => {
     const fetchDriverData = async () => {
       setLoading(true);
       try {
-        const driverData = await findDriverResults(driverId);
-        const [driverRaces, driverConstructors, driverCircuits] =
-          await Promise.all([
-            findRacesByDriverId(driverId),
-            findConstructorsByDriverId(driverId),
-            findCircuitsByDriverId(driverId),
-          ]);
+        const {
+          driver: driverData,
+          races: driverRaces,
+          constructors: driverConstructors,
+          circuits: driverCircuits,
+        } = await findDriverProfile(driverId);
 
         setDriver(driverData);
         setResults(driverData.results);
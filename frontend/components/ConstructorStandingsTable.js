@@ -0,0 +1,94 @@
+import React from "react";
+import { Medal } from "lucide-react";
+
+/**
+ * Get position styling classes based on championship position
+ */
+const getPositionStyle = (pos) => {
+  switch (pos) {
+    case 1:
+      return "bg-yellow-100 border-yellow-400 text-yellow-800";
+    case 2:
+      return "bg-gray-100 border-gray-400 text-gray-800";
+    case 3:
+      return "bg-orange-100 border-orange-400 text-orange-800";
+    default:
+      return "bg-white border-gray-200 text-gray-700";
+  }
+};
+
+/**
+ * Get medal icon for top 3 positions
+ */
+const getPositionIcon = (pos) =>
+  pos <= 3 ? <Medal className="w-5 h-5" /> : null;
+
+/**
+ * Constructor standings table: points, wins, podiums and best finish of each team
+ */
+const ConstructorStandingsTable = ({ constructorStandings }) => {
+  return (
+    <div className="bg-white rounded-lg shadow border overflow-hidden">
+      {/* Table Header */}
+      <div className="px-6 py-4 border-b bg-gray-50">
+        <h2 className="text-xl font-semibold text-neutral-800">
+          Constructor Standings
+        </h2>
+      </div>
+
+      {/* Table Content */}
+      <div className="overflow-x-auto">
+        <table className="min-w-full divide-y">
+          <thead className="bg-gray-50 text-xs text-gray-500 uppercase">
+            <tr>
+              <th className="px-6 py-3 text-left">Position</th>
+              <th className="px-6 py-3 text-left">Team</th>
+              <th className="px-6 py-3 text-left">Points</th>
+              <th className="px-6 py-3 text-left">Wins</th>
+              <th className="px-6 py-3 text-left">Podiums</th>
+              <th className="px-6 py-3 text-left">Best Finish</th>
+            </tr>
+          </thead>
+          <tbody className="divide-y">
+            {constructorStandings.map((constructor, index) => {
+              const position = index + 1;
+
+              return (
+                <tr key={constructor.constructorId} className="hover:bg-gray-50">
+                  {/* Position */}
+                  <td className="px-6 py-4">
+                    <span
+                      className={`inline-flex items-center px-3 py-1 rounded-full border ${getPositionStyle(
+                        position
+                      )}`}
+                    >
+                      {getPositionIcon(position)}
+                      <span className="ml-1 font-semibold">{position}</span>
+                    </span>
+                  </td>
+
+                  {/* Team */}
+                  <td className="px-6 py-4 text-gray-900 font-medium">
+                    {constructor.constructorName}
+                  </td>
+
+                  {/* Points */}
+                  <td className="px-6 py-4 font-semibold text-red-600">
+                    {constructor.points}
+                  </td>
+
+                  {/* Wins, podiums and best finish */}
+                  <td className="px-6 py-4 text-gray-900">{constructor.wins}</td>
+                  <td className="px-6 py-4 text-gray-900">{constructor.podiums}</td>
+                  <td className="px-6 py-4 text-gray-900">{constructor.bestFinish}</td>
+                </tr>
+              );
+            })}
+          </tbody>
+        </table>
+      </div>
+    </div>
+  );
+};
+
+export default ConstructorStandingsTable;
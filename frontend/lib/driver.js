@@ -44,6 +44,18 @@ export async function findDriverResults(id) {
   }
 }
 
+export async function findDriverProfile(id) {
+  try {
+    const response = await axios.get(BASE_URL + `/${id}/profile`);
+    if (response.status === 200) {
+      return response.data;
+    }
+  } catch (error) {
+    console.error("Errore nella richiesta Axios:", error);
+    return null;
+  }
+}
+
 export async function findNationalities() {
   try {
     let url = "/find_nationalities";
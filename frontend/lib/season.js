@@ -50,6 +50,25 @@ export async function findSeasonDriverStanding(year) {
   }
 }
 
+/**
+ * Fetches constructor standings for a given season year.
+ * @param {number|null} year - Year of the season.
+ * @returns {Promise<Array>} - Constructor standings or empty array on error.
+ */
+export async function findSeasonConstructorStanding(year) {
+  if (year === null) return [];
+  try {
+    const response = await axios.get(
+      `${BASE_URL}/constructor-standing?year=${year}`
+    );
+    return response.data;
+  } catch (error) {
+    console.error("Axios request error:", error);
+    toast.error("Failed to fetch constructor standings.");
+    return [];
+  }
+}
+
 /**
  * Fetches details for a specific season.
  * @param {number|null} year - Year of the season.